@@ -3,10 +3,19 @@
 set -e
 
 LOGLEVEL=${CELERY_LOGLEVEL:-INFO}
+# comma separated queues to consume, see bptl.camunda.routing
+QUEUES=${CELERY_WORKER_QUEUES:-celery}
+# defaults to the number of CPUs
+CONCURRENCY=${CELERY_WORKER_CONCURRENCY:+--concurrency $CELERY_WORKER_CONCURRENCY}
+# execution pool, e.g. threads for the I/O bound completion queue
+POOL=${CELERY_WORKER_POOL:+--pool $CELERY_WORKER_POOL}
 
 echo "Starting celery worker"
 celery worker \
     --app bptl \
     -l $LOGLEVEL \
     --workdir src \
+    -Q $QUEUES \
+    $CONCURRENCY \
+    $POOL \
     -O fair \
@@ -24,6 +24,10 @@ done
 >&2 echo "Apply database migrations"
 python src/manage.py migrate
 
+# Render the task documentation ahead of the requests showing it
+>&2 echo "Render task documentation"
+python src/manage.py render_task_documentation
+
 # Start server
 >&2 echo "Starting server"
 uwsgi \
@@ -0,0 +1,6 @@
+#!/bin/bash
+
+set -e
+
+echo "Starting Camunda long polling fetcher"
+python src/manage.py run_fetcher
@@ -1,3 +1,6 @@
+from django.conf import settings
+from django.utils.translation import ugettext_lazy as _
+
 from rest_framework import serializers
 
 from ..models import ServiceTask
@@ -6,9 +9,54 @@ from ..models import ServiceTask
 class WorkUnitSerializer(serializers.ModelSerializer):
     class Meta:
         model = ServiceTask
-        fields = ("topic", "vars", "resultVars")
+        fields = ("topic", "vars", "resultVars", "callbackUrl")
         extra_kwargs = {
             "topic": {"source": "topic_name"},
             "vars": {"source": "variables"},
             "resultVars": {"source": "result_variables", "read_only": True},
+            "callbackUrl": {"source": "callback_url", "write_only": True},
+        }
+
+
+class WorkUnitBatchItemSerializer(WorkUnitSerializer):
+    def validate_callbackUrl(self, value):
+        # the outcome of a batch is in the response
+        if value:
+            raise serializers.ValidationError(
+                _("Batches are executed within the request, without callback."),
+                code="callback-not-supported",
+            )
+        return value
+
+
+class WorkUnitBatchSerializer(serializers.ListSerializer):
+    child = WorkUnitBatchItemSerializer()
+
+    def validate(self, attrs):
+        max_size = settings.WORK_UNIT_BATCH_MAX_SIZE
+        if len(attrs) > max_size:
+            raise serializers.ValidationError(
+                _("A batch can contain at most {max_size} work units.").format(
+                    max_size=max_size
+                ),
+                code="max-size",
+            )
+        return attrs
+
+
+class WorkUnitStatusSerializer(serializers.ModelSerializer):
+    error = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ServiceTask
+        fields = ("topic", "vars", "status", "resultVars", "error")
+        extra_kwargs = {
+            "topic": {"source": "topic_name"},
+            "vars": {"source": "variables"},
+            "resultVars": {"source": "result_variables"},
         }
+        read_only_fields = fields
+
+    def get_error(self, obj) -> str:
+        error_lines = obj.execution_error.splitlines()
+        return error_lines[-1] if error_lines else ""
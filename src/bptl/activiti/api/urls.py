@@ -7,7 +7,7 @@ from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 from rest_framework.settings import api_settings
 
-from .views import WorkUnitView
+from .views import WorkUnitBatchView, WorkUnitStatusView, WorkUnitView
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -30,6 +30,16 @@ urlpatterns = [
                 path("", RedirectView.as_view(pattern_name="schema-redoc")),
                 # real api
                 path("work-unit", WorkUnitView.as_view(), name="work-unit"),
+                path(
+                    "work-unit/batch",
+                    WorkUnitBatchView.as_view(),
+                    name="work-unit-batch",
+                ),
+                path(
+                    "work-unit/<int:pk>",
+                    WorkUnitStatusView.as_view(),
+                    name="work-unit-detail",
+                ),
                 # OAS
                 re_path(
                     r"^openapi(?P<format>\.json|\.yaml)$",
@@ -1,14 +1,35 @@
+from concurrent import futures
+from contextlib import ExitStack
+from typing import List
+
+from django.conf import settings
+from django.db import connection
 from django.utils.translation import ugettext_lazy as _
 
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
 from rest_framework.exceptions import ValidationError
-from rest_framework.generics import CreateAPIView
+from rest_framework.generics import CreateAPIView, GenericAPIView, RetrieveAPIView
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.settings import api_settings
-from timeline_logger.models import TimelineLog
 
+from bptl.camunda.routing import get_queue
 from bptl.tasks.api import execute
+from bptl.tasks.mapping_cache import get_task_mapping
+from bptl.utils.constants import Statuses
+from bptl.utils.decorators import checkpoint, transition
 
 from ..models import ServiceTask
-from .serializers import WorkUnitSerializer
+from ..tasks import task_execute
+from .serializers import (
+    WorkUnitBatchSerializer,
+    WorkUnitSerializer,
+    WorkUnitStatusSerializer,
+)
+
+RESPOND_ASYNC = "respond-async"
 
 
 class WorkUnitView(CreateAPIView):
@@ -19,14 +40,28 @@ class WorkUnitView(CreateAPIView):
     Execute task
 
     Execute external task with specific ``topic``.
+
+    By default the task is executed within the request. Send the header
+    ``Prefer: respond-async`` to have it executed in the background instead: the
+    response (``202 Accepted``) then refers to the status of the task in its
+    ``Location`` header. The optional ``callbackUrl`` is notified with the status
+    when the task is finished.
     """
 
     queryset = ServiceTask.objects.all()
     serializer_class = WorkUnitSerializer
     task = None
 
+    @property
+    def respond_async(self) -> bool:
+        preferences = self.request.META.get("HTTP_PREFER", "").split(",")
+        return RESPOND_ASYNC in {preference.strip() for preference in preferences}
+
     @staticmethod
     def execute_task(task: ServiceTask):
+        # the task was just created by this request, nothing else can run it
+        transition(task, Statuses.in_progress)
+
         try:
             execute(task)
         except Exception as exc:
@@ -41,10 +76,120 @@ class WorkUnitView(CreateAPIView):
 
     def perform_create(self, serializer):
         task = serializer.save()
+        self.execute_task(task)
 
-        # initial logging
-        TimelineLog.objects.create(
-            content_object=task, extra_data={"status": task.status}
+    def schedule_task(self, task: ServiceTask) -> str:
+        status_url = reverse(
+            "work-unit-detail", kwargs={"pk": task.pk}, request=self.request
+        )
+        task_execute.apply_async(
+            (task.id, status_url), queue=get_queue(get_task_mapping(task.topic_name))
         )
+        return status_url
 
-        self.execute_task(task)
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "Prefer",
+                openapi.IN_HEADER,
+                description=f"Set to `{RESPOND_ASYNC}` to execute the task "
+                "asynchronously.",
+                type=openapi.TYPE_STRING,
+                required=False,
+            )
+        ],
+        responses={
+            status.HTTP_201_CREATED: WorkUnitSerializer,
+            status.HTTP_202_ACCEPTED: WorkUnitStatusSerializer,
+        },
+    )
+    def post(self, request, *args, **kwargs):
+        return super().post(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        if not self.respond_async:
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        task = serializer.save()
+        status_url = self.schedule_task(task)
+
+        data = {"url": status_url, **WorkUnitStatusSerializer(task).data}
+        return Response(
+            data, status=status.HTTP_202_ACCEPTED, headers={"Location": status_url}
+        )
+
+
+class WorkUnitStatusView(RetrieveAPIView):
+    """
+    Retrieve the status of a task.
+
+    get:
+    Task status
+
+    Retrieve the status of a task that is executed asynchronously, and its result
+    variables once it's performed.
+    """
+
+    queryset = ServiceTask.objects.all()
+    serializer_class = WorkUnitStatusSerializer
+
+
+def _execute(task: ServiceTask) -> None:
+    try:
+        execute(task)
+    except Exception:
+        # the error is recorded on the task
+        pass
+    finally:
+        # the thread is done with its database connection
+        connection.close()
+
+
+class WorkUnitBatchView(GenericAPIView):
+    """
+    Execute a batch of external tasks.
+
+    post:
+    Execute tasks
+
+    Execute a list of external tasks, each with a specific ``topic``. The tasks are
+    executed concurrently. The response lists the outcome of every task, in the order
+    of the request - a failed task does not affect the others. A ``callbackUrl`` is
+    not supported, the outcome is in the response.
+    """
+
+    queryset = ServiceTask.objects.all()
+    serializer_class = WorkUnitBatchSerializer
+
+    def execute_tasks(self, tasks: List[ServiceTask]) -> None:
+        # the status changes are collected and written from the request thread
+        with ExitStack() as stack:
+            for task in tasks:
+                stack.enter_context(checkpoint(task))
+
+            max_workers = min(settings.WORK_UNIT_BATCH_CONCURRENCY, len(tasks))
+            with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(_execute, tasks))
+
+    @swagger_auto_schema(
+        request_body=WorkUnitBatchSerializer,
+        responses={status.HTTP_201_CREATED: WorkUnitStatusSerializer(many=True)},
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        tasks = ServiceTask.objects.bulk_create_tasks(
+            [ServiceTask(**item) for item in serializer.validated_data]
+        )
+        claimed = [task for task in tasks if ServiceTask.objects.claim(task)]
+        if claimed:
+            self.execute_tasks(claimed)
+
+        data = WorkUnitStatusSerializer(tasks, many=True).data
+        for task, item in zip(tasks, data):
+            if task not in claimed:
+                item["error"] = _("The task {} has been already run.").format(task)
+        return Response(data, status=status.HTTP_201_CREATED)
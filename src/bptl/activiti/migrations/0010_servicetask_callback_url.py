@@ -0,0 +1,22 @@
+# Generated by Django 2.2.14 on 2020-07-28 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activiti", "0009_auto_20200226_1716"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="servicetask",
+            name="callback_url",
+            field=models.URLField(
+                blank=True,
+                help_text="URL to notify when the task is executed asynchronously and finished.",
+                verbose_name="callback URL",
+            ),
+        ),
+    ]
@@ -42,6 +42,14 @@ class ServiceTask(BaseTask):
     A single activiti task which request bptl API
     """
 
+    callback_url = models.URLField(
+        _("callback URL"),
+        blank=True,
+        help_text=_(
+            "URL to notify when the task is executed asynchronously and finished."
+        ),
+    )
+
     class Meta:
         verbose_name = _("service task")
         verbose_name_plural = _("service tasks")
@@ -0,0 +1,82 @@
+""" celery tasks to execute activiti service tasks asynchronously """
+import requests
+from celery.utils.log import get_task_logger
+
+from bptl.camunda.completion import CALLBACK_RETRY_POLICY, call_callback
+from bptl.tasks.api import execute
+
+from ..celery import app
+from .api.serializers import WorkUnitStatusSerializer
+from .models import ServiceTask
+
+logger = get_task_logger(__name__)
+
+__all__ = ("task_execute", "task_notify")
+
+
+@app.task()
+def task_execute(service_task_id: int, status_url: str = ""):
+    service_task = ServiceTask.objects.get(id=service_task_id)
+
+    # claim the task - a redelivered message may be processed at the same time
+    if not ServiceTask.objects.claim(service_task):
+        logger.warning("Task %r has been already run", service_task_id)
+        return
+
+    try:
+        execute(service_task)
+    except Exception as exc:
+        logger.warning(
+            "Task %r has failed during execution with error: %r",
+            service_task_id,
+            exc,
+            exc_info=True,
+        )
+    else:
+        logger.info("Task %r is executed", service_task_id)
+
+    if service_task.callback_url:
+        _notify(service_task, status_url)
+
+
+@app.task(bind=True)
+def task_notify(self, service_task_id: int, status_url: str = ""):
+    service_task = ServiceTask.objects.get(id=service_task_id)
+    _notify(service_task, status_url, self)
+
+
+def notify(service_task: ServiceTask, status_url: str = "") -> None:
+    """
+    Post the outcome of an asynchronously executed task to its callback URL.
+    """
+    data = {"url": status_url, **WorkUnitStatusSerializer(service_task).data}
+    response = call_callback(service_task.callback_url, json=data)
+    response.raise_for_status()
+
+
+def _notify(service_task: ServiceTask, status_url: str, celery_task=None) -> None:
+    """
+    Notify the callback URL, and try again later if it's temporarily unavailable.
+
+    Within :func:`task_notify` (``celery_task``), that task is retried. Otherwise, the
+    notification is handed off to it.
+    """
+    try:
+        notify(service_task, status_url)
+    except requests.RequestException as exc:
+        logger.warning(
+            "Callback of task %r has failed with error: %r",
+            service_task.id,
+            exc,
+            exc_info=True,
+        )
+        retries = celery_task.request.retries if celery_task is not None else 0
+        if not CALLBACK_RETRY_POLICY.should_retry(exc, retries):
+            return
+
+        if celery_task is not None:
+            raise CALLBACK_RETRY_POLICY.retry_task(celery_task, exc)
+        task_notify.apply_async(
+            (service_task.id, status_url),
+            countdown=CALLBACK_RETRY_POLICY.get_delay(retries),
+        )
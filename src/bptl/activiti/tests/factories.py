@@ -0,0 +1,9 @@
+import factory
+import factory.fuzzy
+
+
+class ServiceTaskFactory(factory.django.DjangoModelFactory):
+    topic_name = factory.fuzzy.FuzzyChoice(["initialize-zaak", "set-zaak-status"])
+
+    class Meta:
+        model = "activiti.ServiceTask"
@@ -0,0 +1,102 @@
+from unittest.mock import ANY, patch
+
+from django.test import TestCase
+
+import requests_mock
+from celery.exceptions import Retry
+
+from bptl.utils.constants import Statuses
+
+from ..models import ServiceTask
+from ..tasks import task_execute, task_notify
+
+STATUS_URL = "http://testserver/api/v1/work-unit/1"
+
+
+@requests_mock.Mocker()
+class ExecuteTaskTests(TestCase):
+    @patch("bptl.activiti.tasks.execute")
+    def test_execute_and_notify(self, m, m_execute):
+        service_task = ServiceTask.objects.create(
+            topic_name="zaak-initialize",
+            variables={"someOtherVar": 123},
+            callback_url="https://some.callback.nl/",
+        )
+        m.post("https://some.callback.nl/")
+
+        task_execute(service_task.id, STATUS_URL)
+
+        m_execute.assert_called_once_with(service_task)
+        self.assertEqual(
+            m.last_request.json(),
+            {
+                "url": STATUS_URL,
+                "topic": "zaak-initialize",
+                "vars": {"someOtherVar": 123},
+                "status": Statuses.in_progress,
+                "resultVars": {},
+                "error": "",
+            },
+        )
+
+    @patch("bptl.activiti.tasks.task_notify.apply_async")
+    @patch("bptl.activiti.tasks.execute", side_effect=Exception("This is fine"))
+    def test_notify_failure(self, m, m_execute, m_notify_async):
+        service_task = ServiceTask.objects.create(
+            topic_name="zaak-initialize", callback_url="https://some.callback.nl/"
+        )
+        m.post("https://some.callback.nl/", status_code=500)
+
+        # neither the failed execution nor the failed callback are raised
+        task_execute(service_task.id, STATUS_URL)
+
+        self.assertEqual(m.call_count, 1)
+        self.assertEqual(m.last_request.timeout, 10)
+        # the callback is tried again later
+        m_notify_async.assert_called_once_with(
+            (service_task.id, STATUS_URL), countdown=ANY
+        )
+
+    @patch("bptl.activiti.tasks.task_notify.apply_async")
+    @patch("bptl.activiti.tasks.execute")
+    def test_notify_client_error(self, m, m_execute, m_notify_async):
+        service_task = ServiceTask.objects.create(
+            topic_name="zaak-initialize", callback_url="https://some.callback.nl/"
+        )
+        m.post("https://some.callback.nl/", status_code=400)
+
+        task_execute(service_task.id, STATUS_URL)
+
+        self.assertEqual(m.call_count, 1)
+        m_notify_async.assert_not_called()
+
+    @patch("bptl.activiti.tasks.task_notify.retry", side_effect=Retry)
+    def test_notify_retry(self, m, m_retry):
+        service_task = ServiceTask.objects.create(
+            topic_name="zaak-initialize", callback_url="https://some.callback.nl/"
+        )
+        m.post("https://some.callback.nl/", status_code=503)
+
+        with self.assertRaises(Retry):
+            task_notify(service_task.id, STATUS_URL)
+
+        m_retry.assert_called_once_with(exc=ANY, countdown=ANY, max_retries=3)
+
+    @patch("bptl.activiti.tasks.execute")
+    def test_no_callback(self, m, m_execute):
+        service_task = ServiceTask.objects.create(topic_name="zaak-initialize")
+
+        task_execute(service_task.id, STATUS_URL)
+
+        m_execute.assert_called_once_with(service_task)
+        self.assertFalse(m.called)
+
+    @patch("bptl.activiti.tasks.execute")
+    def test_already_claimed(self, m, m_execute):
+        service_task = ServiceTask.objects.create(
+            topic_name="zaak-initialize", status=Statuses.in_progress
+        )
+
+        task_execute(service_task.id, STATUS_URL)
+
+        m_execute.assert_not_called()
@@ -1,6 +1,7 @@
 from unittest.mock import patch
 
 from django.conf import settings
+from django.test import override_settings
 from django.urls import reverse
 
 from rest_framework import status
@@ -8,6 +9,7 @@ from rest_framework.test import APITestCase
 
 from bptl.tasks.models import TaskMapping
 from bptl.utils.constants import Statuses
+from bptl.utils.decorators import transition
 
 from ..models import ServiceTask
 from .utils import TokenAuthMixin
@@ -36,6 +38,10 @@ class WorkUnitTestCase(TokenAuthMixin, APITestCase):
 
         self.assertEqual(service_task.topic_name, "zaak-initialize")
         self.assertEqual(service_task.status, Statuses.performed)
+        self.assertEqual(
+            [entry[0] for entry in service_task.status_history],
+            [Statuses.initial, Statuses.in_progress, Statuses.performed],
+        )
         self.assertEqual(service_task.variables, {"someOtherVar": 123})
 
         data_response = response.json()
@@ -59,3 +65,197 @@ class WorkUnitTestCase(TokenAuthMixin, APITestCase):
         data = response.json()
 
         self.assertTrue(data["non_field_errors"].strip().endswith("This is fine"))
+
+
+class AsyncWorkUnitTestCase(TokenAuthMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse(
+            "work-unit", args=(settings.REST_FRAMEWORK["DEFAULT_VERSION"],)
+        )
+
+    @patch("bptl.activiti.api.views.task_execute.apply_async")
+    def test_post_workunit_async(self, m_apply_async):
+        data = {
+            "topic": "zaak-initialize",
+            "vars": {"someOtherVar": 123},
+            "callbackUrl": "https://some.callback.nl/",
+        }
+
+        response = self.client.post(self.url, data, HTTP_PREFER="respond-async")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        service_task = ServiceTask.objects.get()
+        status_url = f"http://testserver{self.url}/{service_task.pk}"
+
+        self.assertEqual(service_task.status, Statuses.initial)
+        self.assertEqual(service_task.callback_url, "https://some.callback.nl/")
+        self.assertEqual(response["Location"], status_url)
+        self.assertEqual(
+            response.json(),
+            {
+                "url": status_url,
+                "topic": "zaak-initialize",
+                "vars": {"someOtherVar": 123},
+                "status": Statuses.initial,
+                "resultVars": {},
+                "error": "",
+            },
+        )
+        m_apply_async.assert_called_once_with((service_task.id, status_url), queue=None)
+
+    @patch("bptl.activiti.api.views.execute")
+    @patch("bptl.activiti.api.views.task_execute.apply_async")
+    def test_post_workunit_sync_by_default(self, m_apply_async, m_execute):
+        data = {"topic": "zaak-initialize", "vars": {"someOtherVar": 123}}
+
+        response = self.client.post(self.url, data)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        m_execute.assert_called_once()
+        m_apply_async.assert_not_called()
+
+    def test_get_workunit_status(self):
+        service_task = ServiceTask.objects.create(
+            topic_name="zaak-initialize",
+            variables={"someOtherVar": 123},
+            status=Statuses.failed,
+            execution_error="Traceback\nValueError: This is fine",
+        )
+
+        response = self.client.get(f"{self.url}/{service_task.pk}")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            {
+                "topic": "zaak-initialize",
+                "vars": {"someOtherVar": 123},
+                "status": Statuses.failed,
+                "resultVars": {},
+                "error": "ValueError: This is fine",
+            },
+        )
+
+
+def perform(task):
+    if task.variables.get("fail"):
+        transition(task, Statuses.failed, execution_error="Traceback\nValueError: Boom")
+        raise ValueError("Boom")
+    transition(task, Statuses.performed, result_variables={"zaakUrl": "zaak_url"})
+
+
+class WorkUnitBatchTestCase(TokenAuthMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse(
+            "work-unit-batch", args=(settings.REST_FRAMEWORK["DEFAULT_VERSION"],)
+        )
+
+    @patch("bptl.activiti.api.views.execute", side_effect=perform)
+    def test_post_batch(self, m_execute):
+        data = [
+            {"topic": "zaak-initialize", "vars": {"someOtherVar": 1}},
+            {"topic": "zaak-initialize", "vars": {"fail": True}},
+            {"topic": "zaak-initialize", "vars": {"someOtherVar": 3}},
+        ]
+
+        response = self.client.post(self.url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(m_execute.call_count, 3)
+        self.assertEqual(
+            response.json(),
+            [
+                {
+                    "topic": "zaak-initialize",
+                    "vars": {"someOtherVar": 1},
+                    "status": Statuses.performed,
+                    "resultVars": {"zaakUrl": "zaak_url"},
+                    "error": "",
+                },
+                {
+                    "topic": "zaak-initialize",
+                    "vars": {"fail": True},
+                    "status": Statuses.failed,
+                    "resultVars": {},
+                    "error": "ValueError: Boom",
+                },
+                {
+                    "topic": "zaak-initialize",
+                    "vars": {"someOtherVar": 3},
+                    "status": Statuses.performed,
+                    "resultVars": {"zaakUrl": "zaak_url"},
+                    "error": "",
+                },
+            ],
+        )
+        # the outcome of the tasks is stored
+        statuses = ServiceTask.objects.order_by("pk").values_list("status", flat=True)
+        self.assertEqual(
+            list(statuses), [Statuses.performed, Statuses.failed, Statuses.performed]
+        )
+
+    @patch("bptl.activiti.api.views.execute", side_effect=perform)
+    def test_post_batch_already_claimed(self, m_execute):
+        data = [
+            {"topic": "zaak-initialize", "vars": {"someOtherVar": 1}},
+            {"topic": "zaak-initialize", "vars": {"someOtherVar": 2}},
+        ]
+
+        # another process got hold of the second task first
+        with patch.object(ServiceTask.objects, "claim", side_effect=[True, False]):
+            response = self.client.post(self.url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(m_execute.call_count, 1)
+        first, second = response.json()
+        self.assertEqual(first["status"], Statuses.performed)
+        self.assertEqual(first["error"], "")
+        self.assertIn("has been already run", second["error"])
+
+    @patch("bptl.activiti.api.views.execute")
+    def test_post_batch_callback_url(self, m_execute):
+        data = [
+            {
+                "topic": "zaak-initialize",
+                "vars": {},
+                "callbackUrl": "https://callback.example.com/foo",
+            }
+        ]
+
+        response = self.client.post(self.url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("callbackUrl", response.json()[0])
+        self.assertFalse(ServiceTask.objects.exists())
+        m_execute.assert_not_called()
+
+    @patch("bptl.activiti.api.views.execute")
+    def test_post_empty_batch(self, m_execute):
+        response = self.client.post(self.url, [], format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json(), [])
+        m_execute.assert_not_called()
+
+    @override_settings(WORK_UNIT_BATCH_MAX_SIZE=1)
+    @patch("bptl.activiti.api.views.execute")
+    def test_post_batch_too_large(self, m_execute):
+        data = [{"topic": "zaak-initialize", "vars": {}}] * 2
+
+        response = self.client.post(self.url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ServiceTask.objects.exists())
+        m_execute.assert_not_called()
+
+    def test_post_batch_invalid_item(self):
+        data = [{"topic": "zaak-initialize", "vars": {}}, {"vars": {}}]
+
+        response = self.client.post(self.url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()[0], {})
+        self.assertIn("topic", response.json()[1])
@@ -2,11 +2,13 @@
 Expose the public API to manage camunda external tasks.
 """
 
+from typing import Callable, Optional
+
 from bptl.utils.constants import Statuses
 from bptl.utils.decorators import save_and_log
 
 from .models import ExternalTask
-from .utils import complete_task
+from .utils import CAMUNDA_RETRY_POLICY, complete_task, send_completion
 
 __all__ = [
     "TaskNotPerformed",
@@ -19,11 +21,16 @@ class TaskNotPerformed(Exception):
 
 
 @save_and_log(status=Statuses.completed)
-def complete(task: ExternalTask):
+def complete(
+    task: ExternalTask, reschedule: Optional[Callable[[Exception], None]] = None
+):
     """
     Send the result of a fetched task into Camunda.
 
     :param task: A :class:`ExternalTask` instance, that has been already performed.
+    :param reschedule: Called with Camunda's optimistic locking conflicts instead of
+      retrying them in-process. It raises :class:`celery.exceptions.Retry` to try the
+      completion again later, which leaves the task performed.
     :raises: :class:`TaskNotPerformed` if the task status is not "performed", this exception is
       raised.
     """
@@ -32,4 +39,13 @@ def complete(task: ExternalTask):
             f"The task {task} is {task.status}. The task should be performed before sending results"
         )
 
-    complete_task(task, variables=task.result_variables)
+    if reschedule is None:
+        complete_task(task, variables=task.result_variables)
+        return
+
+    try:
+        send_completion(task, variables=task.result_variables)
+    except Exception as exc:
+        if CAMUNDA_RETRY_POLICY.is_retryable(exc):
+            reschedule(exc)
+        raise
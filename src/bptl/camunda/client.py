@@ -0,0 +1,87 @@
+"""
+Camunda REST API client sending its requests over a pooled HTTP session.
+
+:class:`django_camunda.client.Camunda` opens a new connection for every request. At
+high volumes of tasks, the connections to Camunda are kept alive instead, see
+``settings.CAMUNDA_CLIENT_CLASS``.
+"""
+import logging
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urljoin
+
+import requests
+from django_camunda.client import Camunda
+from django_camunda.utils import underscoreize
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_session = None
+
+
+def get_session() -> requests.Session:
+    """
+    Get the HTTP session of the process, shared by all threads.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+            # the session is shared between tasks - never carry cookies over
+            _session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return _session
+
+
+class CamundaClient(Camunda):
+    def request(self, path: str, method="GET", *args, **kwargs):
+        """
+        Mirrors :meth:`django_camunda.client.Camunda.request`, on the pooled session.
+        """
+        assert not path.startswith("/"), "Provide relative API paths"
+        url = urljoin(self.root_url, path)
+
+        do_underscoreize = kwargs.pop("underscoreize", True)
+
+        headers = kwargs.pop("headers", {})
+        headers.update(self.auth)
+        headers.update(self.get_extra_headers(headers))
+        kwargs["headers"] = headers
+
+        json = kwargs.get("json")
+        if json:
+            self.preprocess_json(json)
+
+        _ref = self.before_request(method, url, *args, **kwargs)
+
+        response = get_session().request(method, url, *args, **kwargs)
+        response_data = None
+
+        try:
+            response.raise_for_status()
+            if response.content:
+                # json is the default Content-Type
+                content_type = response.headers.get("Content-Type", "application/json")
+                if content_type.startswith("application/json"):
+                    response_data = response.json()
+
+                    if isinstance(response_data, (dict, list)):
+                        self.postprocess_response_data(response_data)
+
+                    if do_underscoreize:
+                        response_data = underscoreize(response_data)
+                else:
+                    # binary content
+                    response_data = response.content
+
+            return response_data
+        except Exception:
+            try:
+                # see if we can grab any extra output
+                response_data = response.json()
+            except Exception:
+                pass
+            logger.exception("Error: %r", response_data)
+            raise
+        finally:
+            self.after_request(_ref, response, response_data)
@@ -0,0 +1,126 @@
+"""
+The completion stage of external tasks.
+
+Once a task is performed, its result is sent to Camunda and its callback URL is called.
+With ``settings.COMPLETION_QUEUE`` set, this happens in a separate Celery task on that
+queue, so that completion round trips do not occupy the workers executing tasks. The
+completion workers are I/O bound and can run with a high (thread or gevent) concurrency.
+
+Both Camunda and the callbacks are called over pooled HTTP sessions, the callbacks with
+``settings.CALLBACK_TIMEOUT``. The throughput and latency of the completions are kept
+in the cache, per minute.
+"""
+import time
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+import requests
+
+from bptl.utils.constants import Statuses
+from bptl.utils.decorators import RetryPolicy
+
+from .client import get_session
+from .models import ExternalTask
+
+METRICS_CACHE_KEY = "camunda:completion-metrics:{minute}:{name}"
+METRICS_TIMEOUT = 60 * 60 * 24
+METRICS = ("completed", "failed", "duration", "latency")
+# tasks are kept locked for this many times the recent latency while they're queued
+LATENCY_MARGIN = 2
+
+
+# callbacks are tried again on connection and server errors, not on client errors
+CALLBACK_RETRY_POLICY = RetryPolicy(
+    times=3,
+    exceptions=(requests.ConnectionError, requests.Timeout, requests.HTTPError),
+    condition=lambda exc: exc.response is None or exc.response.status_code >= 500,
+    delay=5,
+    max_delay=60,
+)
+
+
+def call_callback(url: str, json: Optional[dict] = None) -> requests.Response:
+    """
+    Notify the callback URL of a task about its completion.
+    """
+    return get_session().post(url, json=json, timeout=settings.CALLBACK_TIMEOUT)
+
+
+def _get_performed_at(task: ExternalTask) -> Optional[str]:
+    for status, timestamp in reversed(task.status_history):
+        if status == Statuses.performed:
+            return timestamp
+    return None
+
+
+def _incr(minute: int, name: str, delta: int) -> None:
+    key = METRICS_CACHE_KEY.format(minute=minute, name=name)
+    cache.add(key, 0, METRICS_TIMEOUT)
+    try:
+        cache.incr(key, delta)
+    except ValueError:  # expired in the meantime
+        cache.set(key, delta, METRICS_TIMEOUT)
+
+
+def record_completion(task: ExternalTask, start: float, success: bool) -> None:
+    """
+    Record the outcome and timing of a completion, started at (monotonic) ``start``.
+
+    The duration is the time spent completing the task, the latency is the time between
+    performing and completing it.
+    """
+    now = timezone.now()
+    minute = int(now.timestamp() // 60)
+
+    _incr(minute, "completed" if success else "failed", 1)
+    _incr(minute, "duration", int((time.monotonic() - start) * 1000))
+
+    performed_at = _get_performed_at(task)
+    if performed_at:
+        latency = now - parse_datetime(performed_at)
+        _incr(minute, "latency", int(latency.total_seconds() * 1000))
+
+
+def get_completion_metrics(minutes: int = 15) -> dict:
+    """
+    Summarize the completions of the last ``minutes``.
+
+    Durations and latencies are averages, in seconds. The throughput is the number of
+    completed tasks per minute.
+    """
+    now = timezone.now()
+    current = int(now.timestamp() // 60)
+    keys = [
+        METRICS_CACHE_KEY.format(minute=minute, name=name)
+        for minute in range(current - minutes + 1, current + 1)
+        for name in METRICS
+    ]
+    values = cache.get_many(keys)
+    totals = {
+        name: sum(value for key, value in values.items() if key.endswith(f":{name}"))
+        for name in METRICS
+    }
+
+    total = totals["completed"] + totals["failed"]
+    return {
+        "since": now - timedelta(minutes=minutes),
+        "completed": totals["completed"],
+        "failed": totals["failed"],
+        "throughput": totals["completed"] / minutes,
+        "average_duration": totals["duration"] / total / 1000 if total else None,
+        "average_latency": totals["latency"] / total / 1000 if total else None,
+    }
+
+
+def get_expected_latency() -> float:
+    """
+    Estimate how long (in seconds) a performed task waits to be completed.
+
+    Based on the average latency of the recent completions, zero if there are none.
+    """
+    return get_completion_metrics()["average_latency"] or 0
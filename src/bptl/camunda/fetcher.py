@@ -0,0 +1,77 @@
+"""
+Long-running fetcher for Camunda external tasks.
+
+Instead of polling Camunda periodically from Celery beat, the fetcher keeps a
+``fetchAndLock`` request open using Camunda's long polling (``asyncResponseTimeout``).
+Camunda responds as soon as tasks are available, after which they are immediately
+scheduled on the workers.
+
+The number of tasks requested is sized to the available worker capacity, see
+:mod:`bptl.camunda.throttling`. When there is no capacity or a poll comes back empty or
+fails, the fetcher backs off before polling again. The delay doubles with every
+consecutive empty poll, up to a configured maximum, and is reset as soon as tasks are
+received.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .tasks import schedule_tasks
+from .throttling import get_max_tasks
+from .utils import fetch_and_lock
+
+logger = logging.getLogger(__name__)
+
+
+def get_backoff(empty_polls: int) -> float:
+    """
+    Determine how long to wait (in seconds) after a number of empty polls.
+    """
+    if empty_polls < 1:
+        return 0
+    backoff = settings.LONG_POLLING_BACKOFF * 2 ** (empty_polls - 1)
+    return min(backoff, settings.LONG_POLLING_MAX_BACKOFF)
+
+
+def fetch_and_schedule(long_polling_timeout: int) -> int:
+    """
+    Perform a single long polling request and schedule the fetched tasks.
+    """
+    max_tasks = get_max_tasks()
+    if not max_tasks:
+        logger.debug("No capacity available, skipping fetch and lock")
+        return 0
+
+    worker_id, num_tasks, tasks = fetch_and_lock(
+        max_tasks, long_polling_timeout=long_polling_timeout
+    )
+    logger.info("fetched %r tasks with %r", num_tasks, worker_id)
+    schedule_tasks(tasks)
+    return num_tasks
+
+
+def run_fetcher(stop: threading.Event, long_polling_timeout: int = None) -> None:
+    """
+    Keep fetching and scheduling tasks until ``stop`` is set.
+    """
+    if long_polling_timeout is None:
+        long_polling_timeout = settings.LONG_POLLING_TIMEOUT
+
+    empty_polls = 0
+    while not stop.is_set():
+        # this process lives long - don't hold on to stale/broken connections
+        close_old_connections()
+
+        try:
+            num_tasks = fetch_and_schedule(long_polling_timeout)
+        except Exception:
+            logger.exception("Fetching and locking tasks failed")
+            num_tasks = 0
+
+        empty_polls = 0 if num_tasks else empty_polls + 1
+        backoff = get_backoff(empty_polls)
+        if backoff:
+            logger.debug("No tasks received, backing off for %.1fs", backoff)
+            stop.wait(backoff)
@@ -0,0 +1,88 @@
+"""
+Keep the lock of external tasks alive while they are being processed.
+
+A work unit running past the lock expiry would be handed out to another worker by
+Camunda. While a task is executed and completed, a background thread periodically
+extends the lock, halfway through the remaining lock duration every time.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.db import connection
+from django.utils import timezone
+
+import requests
+
+from bptl.tasks.mapping_cache import get_task_mapping
+
+from .models import ExternalTask
+from .utils import LOCK_DURATION, extend_lock, get_lock_duration
+
+logger = logging.getLogger(__name__)
+
+MIN_INTERVAL = 1  # seconds
+
+
+class LockHeartbeat(threading.Thread):
+    def __init__(self, task: ExternalTask, lock_duration: int):
+        super().__init__(name=f"lock-heartbeat-{task.task_id}", daemon=True)
+        self.task = task
+        self.lock_duration = lock_duration
+        self.finished = threading.Event()
+
+    def get_interval(self) -> float:
+        if self.task.lock_expires_at is None:
+            remaining = self.lock_duration
+        else:
+            remaining = (self.task.lock_expires_at - timezone.now()).total_seconds()
+        return max(remaining / 2, MIN_INTERVAL)
+
+    def run(self):
+        try:
+            while not self.finished.wait(self.get_interval()):
+                try:
+                    extend_lock(self.task, self.lock_duration)
+                except requests.HTTPError as exc:
+                    # the task is gone or locked by another worker - no point in
+                    # trying again
+                    logger.warning(
+                        "Could not extend the lock of task %r: %r", self.task, exc
+                    )
+                    break
+                except Exception:
+                    logger.exception("Could not extend the lock of task %r", self.task)
+                else:
+                    logger.debug(
+                        "Extended lock of task %r until %s",
+                        self.task,
+                        self.task.lock_expires_at,
+                    )
+        finally:
+            # the thread has its own database connection
+            connection.close()
+
+    def stop(self):
+        self.finished.set()
+        self.join()
+
+
+def get_task_lock_duration(task: ExternalTask) -> int:
+    """
+    Determine the lock duration (in seconds) of the topic of ``task``.
+    """
+    mapping = get_task_mapping(task.topic_name)
+    return get_lock_duration(mapping) if mapping else LOCK_DURATION
+
+
+@contextmanager
+def lock_heartbeat(task: ExternalTask):
+    """
+    Extend the lock of ``task`` in the background for the duration of the block.
+    """
+    heartbeat = LockHeartbeat(task, get_task_lock_duration(task))
+    heartbeat.start()
+    try:
+        yield heartbeat
+    finally:
+        heartbeat.stop()
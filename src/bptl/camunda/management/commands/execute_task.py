@@ -4,6 +4,7 @@ from django.core.management import BaseCommand, CommandError
 from django.utils import timezone
 
 from bptl.utils.constants import Statuses
+from bptl.utils.decorators import transition
 
 from ...models import ExternalTask
 from ...tasks import task_execute_and_complete
@@ -36,9 +37,12 @@ class Command(BaseCommand):
             raise CommandError("Could not find this task.")
 
         if options["force"]:
-            task.status = Statuses.initial
-            task.lock_expires_at = timezone.now() + timedelta(seconds=10 * 60)
-            task.save()
+            transition(
+                task,
+                Statuses.initial,
+                force=True,
+                lock_expires_at=timezone.now() + timedelta(seconds=10 * 60),
+            )
 
         self.stdout.write("Executing task %s" % task)
         task_execute_and_complete(task_id)
@@ -0,0 +1,37 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from ...fetcher import run_fetcher
+
+
+class Command(BaseCommand):
+    help = (
+        "Continuously fetch and lock external tasks using long polling and schedule "
+        "them on the workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--timeout",
+            type=int,
+            default=settings.LONG_POLLING_TIMEOUT,
+            help="Number of seconds Camunda holds a fetch request open.",
+        )
+
+    def handle(self, **options):
+        stop = threading.Event()
+
+        def shutdown(signum, frame):
+            self.stdout.write("Stopping fetcher...")
+            stop.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        self.stdout.write(
+            f"Fetching tasks with a long polling timeout of {options['timeout']}s"
+        )
+        run_fetcher(stop, long_polling_timeout=options["timeout"])
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.14 on 2020-07-24 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("camunda", "0012_auto_20200226_1716"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="externaltask",
+            name="retries",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="The number of retries left, as reported by Camunda. Empty if the task did not fail before.",
+                null=True,
+                verbose_name="retries",
+            ),
+        ),
+    ]
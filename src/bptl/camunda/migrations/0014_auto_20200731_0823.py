@@ -0,0 +1,27 @@
+# Generated by Django 2.2.14 on 2020-07-31 08:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("camunda", "0013_externaltask_retries"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="externaltask",
+            name="lock_expires_at",
+            field=models.DateTimeField(
+                blank=True, db_index=True, null=True, verbose_name="lock expires at"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="externaltask",
+            name="task_id",
+            field=models.CharField(
+                db_index=True, max_length=50, verbose_name="task id"
+            ),
+        ),
+    ]
@@ -39,8 +39,19 @@ class ExternalTask(BaseTask):
         ),
     )
     priority = models.PositiveIntegerField(_("priority"), null=True, blank=True)
-    task_id = models.CharField(_("task id"), max_length=50)
-    lock_expires_at = models.DateTimeField(_("lock expires at"), null=True, blank=True)
+    task_id = models.CharField(_("task id"), max_length=50, db_index=True)
+    lock_expires_at = models.DateTimeField(
+        _("lock expires at"), null=True, blank=True, db_index=True
+    )
+    retries = models.PositiveIntegerField(
+        _("retries"),
+        null=True,
+        blank=True,
+        help_text=_(
+            "The number of retries left, as reported by Camunda. Empty if the task "
+            "did not fail before."
+        ),
+    )
 
     class Meta:
         verbose_name = _("external task")
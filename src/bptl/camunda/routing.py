@@ -0,0 +1,93 @@
+"""
+Route external tasks to worker queues.
+
+Tasks of slow topics can starve tasks of fast topics if they share a single queue.
+Each task mapping can therefore route its tasks to a dedicated queue, which is consumed
+by dedicated workers (see ``bin/celery_worker.sh``). Alternatively, queues can be
+configured per callback with ``settings.CALLBACK_QUEUES``.
+
+The Camunda priority of the external task is mapped onto the broker priority, and the
+number of tasks of a topic executed at the same time can be capped.
+"""
+from contextlib import contextmanager
+from typing import Optional, Set
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from bptl.tasks.models import TaskMapping
+from bptl.utils.constants import Statuses
+
+from ..celery import app
+from .models import ExternalTask
+
+MAX_BROKER_PRIORITY = 9
+
+
+def get_queue(mapping: Optional[TaskMapping]) -> Optional[str]:
+    """
+    Determine the queue for tasks of a topic, ``None`` meaning the default queue.
+    """
+    if mapping is None:
+        return None
+    return mapping.queue or settings.CALLBACK_QUEUES.get(mapping.callback) or None
+
+
+def get_queues() -> Set[str]:
+    """
+    Collect all the queues external tasks can be routed to.
+    """
+    queues = {app.conf.task_default_queue, *settings.CALLBACK_QUEUES.values()}
+    queues.update(
+        TaskMapping.objects.filter(active=True)
+        .exclude(queue="")
+        .values_list("queue", flat=True)
+    )
+    return queues
+
+
+def get_broker_priority(priority: Optional[int]) -> int:
+    """
+    Map the Camunda priority (higher is more important) onto the broker priority.
+    """
+    priority = min(max(priority or 0, 0), MAX_BROKER_PRIORITY)
+    # the Redis transport consumes the lowest priority first, as opposed to AMQP
+    if app.conf.broker_url.startswith("redis"):
+        return MAX_BROKER_PRIORITY - priority
+    return priority
+
+
+def concurrency_exceeded(task: ExternalTask, mapping: Optional[TaskMapping]) -> bool:
+    """
+    Check if the maximum number of running tasks for the topic is reached.
+    """
+    if mapping is None or not mapping.max_concurrency:
+        return False
+
+    running = ExternalTask.objects.filter(
+        topic_name=task.topic_name,
+        status=Statuses.in_progress,
+        lock_expires_at__gt=timezone.now(),
+    ).count()
+    return running >= mapping.max_concurrency
+
+
+@contextmanager
+def concurrency_lock(mapping: Optional[TaskMapping]):
+    """
+    Serialize the concurrency check and the claim of the tasks of a capped topic.
+
+    Without it, concurrent workers can all see a free slot and all claim a task. The
+    transaction scoped advisory lock is released once the claim is committed.
+    """
+    if mapping is None or not mapping.max_concurrency:
+        yield
+        return
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(hashtext(%s))", [mapping.topic_name]
+            )
+        yield
@@ -1,50 +1,178 @@
 """ celery tasks to process camunda external tasks"""
+import math
+import time
+from typing import List
+
 from django.conf import settings
+from django.db import transaction
 
+import requests
+from celery.exceptions import Retry
 from celery.utils.log import get_task_logger
-from timeline_logger.models import TimelineLog
 
 from bptl.camunda.api import complete
 from bptl.camunda.models import ExternalTask
 from bptl.camunda.utils import fetch_and_lock
 from bptl.tasks.api import execute
+from bptl.tasks.mapping_cache import get_task_mapping
+from bptl.tasks.models import StatusCount
 from bptl.utils.constants import Statuses
+from bptl.utils.decorators import RetryPolicy, checkpoint, flush
 
 from ..celery import app
-from .utils import fail_task
+from .completion import LATENCY_MARGIN, get_expected_latency, record_completion
+from .heartbeat import get_task_lock_duration, lock_heartbeat
+from .routing import (
+    concurrency_exceeded,
+    concurrency_lock,
+    get_broker_priority,
+    get_queue,
+)
+from .throttling import get_max_tasks
+from .utils import (
+    CAMUNDA_RETRY_POLICY,
+    extend_lock,
+    get_failure_retries,
+    get_lock_duration,
+    send_failure,
+    unlock,
+)
 
 logger = get_task_logger(__name__)
 
-__all__ = ("task_fetch_and_lock", "task_execute_and_complete")
+__all__ = (
+    "task_fetch_and_lock",
+    "task_execute_and_complete",
+    "task_complete",
+    "task_fail",
+    "schedule_tasks",
+)
 
 
-@app.task()
-def task_fetch_and_lock():
-    worker_id, num_tasks, tasks = fetch_and_lock(settings.MAX_TASKS)
+def schedule_tasks(tasks: List[ExternalTask]) -> None:
+    """
+    Hand off freshly fetched and locked tasks to the workers.
 
-    logger.info("fetched %r tasks with %r", num_tasks, worker_id)
+    Tasks are routed to the queue configured for their topic, with their Camunda
+    priority as broker priority.
 
+    The tasks are already persisted by :func:`bptl.camunda.utils.fetch_and_lock`.
+    """
     for task in tasks:
-        # initial logging
-        TimelineLog.objects.create(
-            content_object=task, extra_data={"status": task.status}
+        task_execute_and_complete.apply_async(
+            (task.id,),
+            queue=get_queue(get_task_mapping(task.topic_name)),
+            priority=get_broker_priority(task.priority),
         )
 
-        task_execute_and_complete.delay(task.id)
+
+@app.task()
+def task_fetch_and_lock():
+    max_tasks = get_max_tasks()
+    if not max_tasks:
+        logger.info("No capacity available, skipping fetch and lock")
+        return 0
+
+    worker_id, num_tasks, tasks = fetch_and_lock(max_tasks)
+
+    logger.info("fetched %r tasks with %r", num_tasks, worker_id)
+
+    schedule_tasks(tasks)
     return num_tasks
 
 
-@app.task()
-def task_execute_and_complete(fetched_task_id):
-    fetched_task = ExternalTask.objects.get(id=fetched_task_id)
+@app.task(bind=True)
+def task_execute_and_complete(self, fetched_task_id):
+    fetched_task = ExternalTask.objects.filter(id=fetched_task_id).first()
+
+    # make task idempotent - a released task is removed
+    if fetched_task is None or fetched_task.status != Statuses.initial:
+        logger.warning("Task %r has been already run", fetched_task_id)
+        return
+
+    # respect the maximum concurrency of the topic, and claim the task - a redelivered
+    # message may be processed at the same time
+    mapping = get_task_mapping(fetched_task.topic_name)
+    with concurrency_lock(mapping):
+        exceeded = concurrency_exceeded(fetched_task, mapping)
+        claimed = not exceeded and ExternalTask.objects.claim(fetched_task)
+
+    if exceeded:
+        postpone(self, fetched_task, mapping)
+        return
 
-    # make task idempotent
-    if fetched_task.status != Statuses.initial:
+    if not claimed:
         logger.warning("Task %r has been already run", fetched_task_id)
         return
 
-    fetched_task.status = Statuses.in_progress
-    fetched_task.save(update_fields=["status"])
+    # keep the task locked for as long as it takes, and write the outcome of execution
+    # and completion at once
+    with lock_heartbeat(fetched_task), checkpoint(fetched_task):
+        _execute_and_complete(fetched_task)
+
+
+def postpone(celery_task, fetched_task: ExternalTask, mapping) -> None:
+    """
+    Try the task again later, keeping it locked in Camunda in the meantime.
+
+    After ``settings.CONCURRENCY_MAX_RETRIES`` attempts, or if the lock can't be
+    extended, the task is released to Camunda instead, to be fetched again later.
+    """
+    retries = celery_task.request.retries
+    if retries >= settings.CONCURRENCY_MAX_RETRIES:
+        logger.warning(
+            "Maximum concurrency of topic %r still reached, releasing task %r",
+            fetched_task.topic_name,
+            fetched_task.id,
+        )
+        release(fetched_task)
+        return
+
+    logger.info(
+        "Maximum concurrency reached for topic %r, postponing task %r",
+        fetched_task.topic_name,
+        fetched_task.id,
+    )
+    policy = RetryPolicy(delay=settings.CONCURRENCY_RETRY_DELAY, max_delay=60)
+    countdown = policy.get_delay(retries)
+    # Camunda would hand out the task again if the lock expires while it waits
+    try:
+        extend_lock(fetched_task, math.ceil(countdown) + get_lock_duration(mapping))
+    except requests.RequestException as exc:
+        logger.warning(
+            "Could not extend the lock of task %r, releasing it: %r",
+            fetched_task.id,
+            exc,
+        )
+        release(fetched_task)
+        return
+
+    raise celery_task.retry(countdown=countdown, max_retries=None)
+
+
+def release(fetched_task: ExternalTask) -> None:
+    """
+    Hand a task that never ran back to Camunda.
+
+    Camunda offers the task again, and it's fetched as a new task - the row of the
+    released one is removed rather than marked failed.
+    """
+    try:
+        unlock(fetched_task)
+    except requests.RequestException as exc:
+        # the lock expires on its own
+        logger.warning("Could not unlock task %r: %r", fetched_task.id, exc)
+
+    with transaction.atomic():
+        StatusCount.objects.add_changes(
+            fetched_task.polymorphic_ctype_id,
+            [(fetched_task.status, fetched_task.status_changed_at, -1)],
+        )
+        fetched_task.delete()
+
+
+def _execute_and_complete(fetched_task: ExternalTask) -> None:
+    fetched_task_id = fetched_task.id
 
     # execute
     try:
@@ -56,14 +184,142 @@ def task_execute_and_complete(fetched_task_id):
             exc,
             exc_info=True,
         )
-        fail_task(fetched_task)
+        retries, retry_timeout = get_failure_retries(fetched_task, exc)
+        ExternalTask.objects.filter(pk=fetched_task.pk).update(retries=retries)
+        fetched_task.retries = retries
+        try:
+            send_failure(fetched_task, retries=retries, retry_timeout=retry_timeout)
+        except Exception as failure_exc:
+            if not CAMUNDA_RETRY_POLICY.is_retryable(failure_exc):
+                raise
+            # try again later, rather than blocking the worker
+            _extend_lock_for_completion(
+                fetched_task, delay=CAMUNDA_RETRY_POLICY.max_delay
+            )
+            task_fail.apply_async(
+                (fetched_task_id,),
+                {"retries": retries, "retry_timeout": retry_timeout},
+                queue=settings.COMPLETION_QUEUE,
+                countdown=CAMUNDA_RETRY_POLICY.get_delay(0),
+            )
         return
 
     logger.info("Task %r is executed", fetched_task_id)
 
-    # complete
+    # hand the completion off to the completion workers
+    if settings.COMPLETION_QUEUE:
+        flush(fetched_task)
+        _extend_lock_for_completion(fetched_task)
+        task_complete.apply_async(
+            (fetched_task_id,),
+            queue=settings.COMPLETION_QUEUE,
+            priority=get_broker_priority(fetched_task.priority),
+        )
+        return
+
+    try:
+        _complete(
+            fetched_task, reschedule=lambda exc: _reschedule_complete(fetched_task, exc)
+        )
+    except Retry:
+        # task_complete takes over
+        pass
+
+
+def _extend_lock_for_completion(fetched_task: ExternalTask, delay: float = 0) -> None:
+    """
+    Keep the task locked while it waits in the completion queue.
+
+    The lock heartbeat stops once the completion is handed off, and resumes when a
+    completion worker picks it up. A ``delay`` (in seconds) before the completion is
+    tried again extends the lock as well.
+    """
+    expected_wait = math.ceil(get_expected_latency() * LATENCY_MARGIN + delay)
+    duration = get_task_lock_duration(fetched_task) + expected_wait
+    try:
+        extend_lock(fetched_task, duration)
+    except requests.RequestException as exc:
+        logger.warning("Could not extend the lock of task %r: %r", fetched_task.id, exc)
+
+
+def _reschedule_complete(fetched_task: ExternalTask, exc: Exception, celery_task=None):
+    """
+    Try the completion again later, rather than blocking the worker during the delay.
+
+    Within :func:`task_complete` (``celery_task``), that task is retried. Otherwise,
+    the completion is handed off to it. Raises :class:`celery.exceptions.Retry`, or
+    fails the task in Camunda (see :func:`task_fail`) and raises the exception if the retries are spent.
+    """
+    retries = celery_task.request.retries if celery_task is not None else 0
+    if not CAMUNDA_RETRY_POLICY.should_retry(exc, retries):
+        logger.error("Task didn't succeed after %d retries", retries)
+        task_fail.apply_async(
+            (fetched_task.id,),
+            {"reason": exc.args[0]},
+            queue=settings.COMPLETION_QUEUE,
+        )
+        raise exc
+
+    flush(fetched_task)
+    _extend_lock_for_completion(fetched_task, delay=CAMUNDA_RETRY_POLICY.max_delay)
+    if celery_task is not None:
+        raise CAMUNDA_RETRY_POLICY.retry_task(celery_task, exc)
+
+    countdown = CAMUNDA_RETRY_POLICY.get_delay(retries)
+    task_complete.apply_async(
+        (fetched_task.id,),
+        queue=settings.COMPLETION_QUEUE,
+        priority=get_broker_priority(fetched_task.priority),
+        countdown=countdown,
+    )
+    raise Retry(exc=exc, when=countdown)
+
+
+@app.task(bind=True)
+def task_complete(self, fetched_task_id):
+    fetched_task = ExternalTask.objects.get(id=fetched_task_id)
+
+    if fetched_task.status != Statuses.performed:
+        logger.warning(
+            "Task %r is %s, only performed tasks can be completed",
+            fetched_task_id,
+            fetched_task.status,
+        )
+        return
+
+    with lock_heartbeat(fetched_task), checkpoint(fetched_task):
+        _complete(
+            fetched_task,
+            reschedule=lambda exc: _reschedule_complete(fetched_task, exc, self),
+        )
+
+
+@app.task(bind=True)
+def task_fail(self, fetched_task_id, reason="", retries=0, retry_timeout=0):
+    """
+    Mark a task as failed in Camunda, rescheduling on optimistic locking conflicts.
+    """
+    fetched_task = ExternalTask.objects.get(id=fetched_task_id)
+
+    try:
+        send_failure(
+            fetched_task, reason=reason, retries=retries, retry_timeout=retry_timeout
+        )
+    except Exception as exc:
+        if not CAMUNDA_RETRY_POLICY.is_retryable(exc):
+            raise
+        raise CAMUNDA_RETRY_POLICY.retry_task(self, exc)
+
+
+def _complete(fetched_task: ExternalTask, reschedule=None) -> None:
+    fetched_task_id = fetched_task.id
+    start = time.monotonic()
+
     try:
-        complete(fetched_task)
+        complete(fetched_task, reschedule=reschedule)
+    except Retry:
+        logger.info("Completion of task %r is rescheduled", fetched_task_id)
+        raise
     except Exception as exc:
         logger.warning(
             "Task %r has failed during sending process with error: %r",
@@ -71,6 +327,8 @@ def task_execute_and_complete(fetched_task_id):
             exc,
             exc_info=True,
         )
+        record_completion(fetched_task, start, success=False)
         return
 
+    record_completion(fetched_task, start, success=True)
     logger.info("Task %r is completed", fetched_task_id)
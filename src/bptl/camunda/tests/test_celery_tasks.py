@@ -1,18 +1,44 @@
-from unittest.mock import patch
+from datetime import timedelta
+from unittest.mock import ANY, patch
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
 
+import requests
+from celery.exceptions import Retry
+
+from bptl.camunda.models import ExternalTask
 from bptl.camunda.tests.factories import ExternalTaskFactory
+from bptl.tasks.tests.factories import TaskMappingFactory
 from bptl.utils.constants import Statuses
 from bptl.utils.decorators import save_and_log
 
-from ..tasks import task_execute_and_complete, task_fetch_and_lock
+from ..completion import get_completion_metrics
+from ..tasks import (
+    task_complete,
+    task_execute_and_complete,
+    task_fail,
+    task_fetch_and_lock,
+)
+
+
+def locking_conflict() -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = 500
+    return requests.HTTPError("conflict", response=response)
 
 
 class RouteTaskTests(TestCase):
-    @patch("bptl.camunda.tasks.task_execute_and_complete.delay")
-    def test_task_fetch_and_lock(self, m_test_execute):
-        task1, task2 = ExternalTaskFactory.create_batch(2, worker_id="aWorkerId")
+    @patch("bptl.camunda.tasks.get_max_tasks", return_value=10)
+    @patch("bptl.camunda.tasks.get_broker_priority", side_effect=lambda p: p)
+    @patch("bptl.camunda.tasks.task_execute_and_complete.apply_async")
+    def test_task_fetch_and_lock(self, m_test_execute, m_priority, m_max_tasks):
+        TaskMappingFactory.create(topic_name="slow-topic", queue="slow")
+        task1 = ExternalTaskFactory.create(worker_id="aWorkerId", priority=3)
+        task2 = ExternalTaskFactory.create(
+            worker_id="aWorkerId", topic_name="slow-topic", priority=None
+        )
 
         with patch(
             "bptl.camunda.tasks.fetch_and_lock",
@@ -24,8 +50,16 @@ class RouteTaskTests(TestCase):
         self.assertEqual(result, 2)
 
         self.assertEqual(m_test_execute.call_count, 2)
-        m_test_execute.assert_any_call(task1.id)
-        m_test_execute.assert_any_call(task2.id)
+        m_test_execute.assert_any_call((task1.id,), queue=None, priority=3)
+        m_test_execute.assert_any_call((task2.id,), queue="slow", priority=None)
+
+    @patch("bptl.camunda.tasks.fetch_and_lock")
+    @patch("bptl.camunda.tasks.get_max_tasks", return_value=0)
+    def test_task_fetch_and_lock_no_capacity(self, m_max_tasks, m_fetch_and_lock):
+        result = task_fetch_and_lock()
+
+        self.assertEqual(result, 0)
+        m_fetch_and_lock.assert_not_called()
 
     @patch("bptl.camunda.tasks.complete")
     @patch("bptl.camunda.tasks.execute")
@@ -35,13 +69,34 @@ class RouteTaskTests(TestCase):
         task_execute_and_complete(task.id)
 
         m_execute.assert_called_once_with(task)
-        m_complete.assert_called_once_with(task)
+        m_complete.assert_called_once_with(task, reschedule=ANY)
 
-    @patch("bptl.camunda.tasks.fail_task")
+    @patch("bptl.camunda.tasks.complete")
+    @patch("bptl.camunda.tasks.execute")
+    def test_task_execute_and_complete_claimed_concurrently(
+        self, m_execute, m_complete
+    ):
+        task = ExternalTaskFactory.create()
+
+        # another delivery of the same message claims the task in the meantime
+        def get_task(**kwargs):
+            fetched_task = ExternalTask.objects.filter(**kwargs).get()
+            ExternalTask.objects.claim(
+                ExternalTask.objects.filter(pk=fetched_task.pk).get()
+            )
+            return fetched_task
+
+        with patch.object(ExternalTask.objects, "get", side_effect=get_task):
+            task_execute_and_complete(task.id)
+
+        m_execute.assert_not_called()
+        m_complete.assert_not_called()
+
+    @patch("bptl.camunda.tasks.send_failure")
     @patch("bptl.camunda.tasks.complete")
     @patch("bptl.camunda.tasks.execute", side_effect=Exception("execution is failed"))
     def test_task_execute_and_complete_fail_execute(
-        self, m_execute, m_complete, m_fail_task
+        self, m_execute, m_complete, m_send_failure
     ):
         @save_and_log()
         def new_execute(task):
@@ -59,13 +114,13 @@ class RouteTaskTests(TestCase):
 
         m_execute.assert_called_once_with(task)
         m_complete.assert_not_called()
-        m_fail_task.assert_called_once_with(task)
+        m_send_failure.assert_called_once_with(task, retries=0, retry_timeout=0)
 
     @patch("bptl.camunda.tasks.complete", side_effect=Exception("completion failed"))
     @patch("bptl.camunda.tasks.execute")
     def test_task_execute_and_complete_fail_complete(self, m_execute, m_complete):
         @save_and_log()
-        def new_complete(task):
+        def new_complete(task, reschedule=None):
             raise Exception("completion failed")
 
         m_complete.side_effect = new_complete
@@ -78,7 +133,139 @@ class RouteTaskTests(TestCase):
         self.assertTrue(task.execution_error.strip().endswith("completion failed"))
 
         m_execute.assert_called_once_with(task)
-        m_complete.assert_called_once_with(task)
+        m_complete.assert_called_once_with(task, reschedule=ANY)
+
+    @override_settings(COMPLETION_QUEUE="completion")
+    @patch("bptl.camunda.tasks.get_expected_latency", return_value=10.5)
+    @patch("bptl.camunda.tasks.extend_lock")
+    @patch("bptl.camunda.tasks.task_complete.apply_async")
+    @patch("bptl.camunda.tasks.complete")
+    @patch("bptl.camunda.tasks.execute")
+    def test_task_execute_hands_off_completion(
+        self, m_execute, m_complete, m_complete_async, m_extend_lock, m_latency
+    ):
+        @save_and_log()
+        def new_execute(task):
+            return {"foo": "bar"}
+
+        m_execute.side_effect = new_execute
+        task = ExternalTaskFactory.create()
+
+        task_execute_and_complete(task.id)
+
+        m_complete.assert_not_called()
+        m_complete_async.assert_called_once_with(
+            (task.id,), queue="completion", priority=ANY
+        )
+        # locked for the lock duration (10 minutes without a task mapping), plus
+        # twice the recent latency
+        m_extend_lock.assert_called_once_with(task, 600 + 21)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Statuses.performed)
+        self.assertEqual(task.result_variables, {"foo": "bar"})
+
+    @patch("bptl.camunda.tasks.complete")
+    def test_task_complete(self, m_complete):
+        cache.clear()
+
+        @save_and_log(status=Statuses.completed)
+        def new_complete(task, reschedule=None):
+            pass
+
+        m_complete.side_effect = new_complete
+        task = ExternalTaskFactory.create(status=Statuses.performed)
+
+        task_complete(task.id)
+
+        m_complete.assert_called_once_with(task, reschedule=ANY)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Statuses.completed)
+        metrics = get_completion_metrics()
+        self.assertEqual(metrics["completed"], 1)
+        self.assertEqual(metrics["failed"], 0)
+
+    @patch("bptl.camunda.tasks.complete")
+    def test_task_complete_not_performed(self, m_complete):
+        task = ExternalTaskFactory.create(status=Statuses.failed)
+
+        task_complete(task.id)
+
+        m_complete.assert_not_called()
+
+    @patch("bptl.camunda.tasks.extend_lock")
+    @patch("bptl.camunda.tasks.task_complete.apply_async")
+    @patch("bptl.camunda.api.send_completion", side_effect=locking_conflict())
+    @patch("bptl.camunda.tasks.execute")
+    def test_task_execute_reschedules_conflicting_completion(
+        self, m_execute, m_send_completion, m_complete_async, m_extend_lock
+    ):
+        cache.clear()
+
+        @save_and_log()
+        def new_execute(task):
+            return {"foo": "bar"}
+
+        m_execute.side_effect = new_execute
+        task = ExternalTaskFactory.create()
+
+        task_execute_and_complete(task.id)
+
+        # not retried in-process, but handed off to task_complete
+        m_send_completion.assert_called_once()
+        m_complete_async.assert_called_once_with(
+            (task.id,), queue=None, priority=ANY, countdown=ANY
+        )
+        m_extend_lock.assert_called_once_with(task, ANY)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Statuses.performed)
+
+    @patch("bptl.camunda.tasks.extend_lock")
+    @patch("bptl.camunda.tasks.task_complete.retry", side_effect=Retry)
+    @patch("bptl.camunda.api.send_completion", side_effect=locking_conflict())
+    def test_task_complete_reschedules_conflict(
+        self, m_send_completion, m_retry, m_extend_lock
+    ):
+        cache.clear()
+        task = ExternalTaskFactory.create(status=Statuses.performed)
+
+        with self.assertRaises(Retry):
+            task_complete(task.id)
+
+        m_send_completion.assert_called_once()
+        m_retry.assert_called_once_with(exc=ANY, countdown=ANY, max_retries=3)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Statuses.performed)
+
+    @patch("bptl.camunda.tasks.task_fail.apply_async")
+    @patch("bptl.camunda.tasks.task_complete.retry")
+    @patch("bptl.camunda.api.send_completion", side_effect=locking_conflict())
+    def test_task_complete_conflict_retries_spent(
+        self, m_send_completion, m_retry, m_fail_async
+    ):
+        cache.clear()
+        task = ExternalTaskFactory.create(status=Statuses.performed)
+
+        task_complete.apply(args=(task.id,), retries=3)
+
+        m_retry.assert_not_called()
+        m_fail_async.assert_called_once_with(
+            (task.id,), {"reason": "conflict"}, queue=None
+        )
+        task.refresh_from_db()
+        self.assertEqual(task.status, Statuses.failed)
+
+    @patch("bptl.camunda.tasks.task_fail.retry", side_effect=Retry)
+    @patch("bptl.camunda.tasks.send_failure", side_effect=locking_conflict())
+    def test_task_fail_reschedules_conflict(self, m_send_failure, m_retry):
+        task = ExternalTaskFactory.create(status=Statuses.failed)
+
+        with self.assertRaises(Retry):
+            task_fail(task.id, retries=2, retry_timeout=1000)
+
+        m_send_failure.assert_called_once_with(
+            task, reason="", retries=2, retry_timeout=1000
+        )
+        m_retry.assert_called_once_with(exc=ANY, countdown=ANY, max_retries=3)
 
     @patch("bptl.camunda.tasks.logger.warning")
     def test_task_execute_already_run(self, m_logger):
@@ -90,3 +277,78 @@ class RouteTaskTests(TestCase):
         self.assertEqual(task.status, Statuses.in_progress)
 
         m_logger.assert_called_once_with("Task %r has been already run", task.id)
+
+    @patch("bptl.camunda.tasks.execute")
+    @patch("bptl.camunda.tasks.extend_lock")
+    @patch("bptl.camunda.tasks.task_execute_and_complete.retry", side_effect=Retry)
+    def test_task_execute_max_concurrency_reached(
+        self, m_retry, m_extend_lock, m_execute
+    ):
+        TaskMappingFactory.create(
+            topic_name="some-topic", max_concurrency=1, lock_duration=300
+        )
+        ExternalTaskFactory.create(
+            topic_name="some-topic",
+            status=Statuses.in_progress,
+            lock_expires_at=timezone.now() + timedelta(minutes=5),
+        )
+        task = ExternalTaskFactory.create(topic_name="some-topic")
+
+        with self.assertRaises(Retry):
+            task_execute_and_complete(task.id)
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, Statuses.initial)
+        m_execute.assert_not_called()
+        # the task stays locked while it waits
+        m_extend_lock.assert_called_once_with(task, ANY)
+        self.assertGreaterEqual(m_extend_lock.call_args[0][1], 300)
+        self.assertIsNone(m_retry.call_args[1]["max_retries"])
+
+    @override_settings(CONCURRENCY_MAX_RETRIES=2)
+    @patch("bptl.camunda.tasks.execute")
+    @patch("bptl.camunda.tasks.unlock")
+    @patch("bptl.camunda.tasks.task_execute_and_complete.retry", side_effect=Retry)
+    def test_task_execute_max_concurrency_postponed_too_often(
+        self, m_retry, m_unlock, m_execute
+    ):
+        TaskMappingFactory.create(topic_name="some-topic", max_concurrency=1)
+        ExternalTaskFactory.create(
+            topic_name="some-topic",
+            status=Statuses.in_progress,
+            lock_expires_at=timezone.now() + timedelta(minutes=5),
+        )
+        task = ExternalTaskFactory.create(topic_name="some-topic")
+
+        task_execute_and_complete.apply(args=(task.id,), retries=2)
+
+        # the task never ran - it's fetched again as a new task
+        self.assertFalse(ExternalTask.objects.filter(pk=task.pk).exists())
+        m_unlock.assert_called_once_with(task)
+        m_retry.assert_not_called()
+        m_execute.assert_not_called()
+
+    @patch("bptl.camunda.tasks.execute")
+    @patch("bptl.camunda.tasks.unlock")
+    @patch(
+        "bptl.camunda.tasks.extend_lock",
+        side_effect=requests.ConnectionError("Camunda is down"),
+    )
+    @patch("bptl.camunda.tasks.task_execute_and_complete.retry", side_effect=Retry)
+    def test_task_execute_max_concurrency_lock_not_extended(
+        self, m_retry, m_extend_lock, m_unlock, m_execute
+    ):
+        TaskMappingFactory.create(topic_name="some-topic", max_concurrency=1)
+        ExternalTaskFactory.create(
+            topic_name="some-topic",
+            status=Statuses.in_progress,
+            lock_expires_at=timezone.now() + timedelta(minutes=5),
+        )
+        task = ExternalTaskFactory.create(topic_name="some-topic")
+
+        task_execute_and_complete(task.id)
+
+        self.assertFalse(ExternalTask.objects.filter(pk=task.pk).exists())
+        m_unlock.assert_called_once_with(task)
+        m_retry.assert_not_called()
+        m_execute.assert_not_called()
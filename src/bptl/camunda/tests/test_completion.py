@@ -6,7 +6,7 @@ https://docs.camunda.org/manual/7.12/reference/rest/external-task/post-complete/
 """
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 import requests
 import requests_mock
@@ -68,6 +68,7 @@ class CompleteTests(TestCase):
             },
         )
 
+    @override_settings(CALLBACK_TIMEOUT=10)
     def test_callback_url_called_on_completion(self, m):
         task = ExternalTask.objects.create(
             worker_id="test-worker-id",
@@ -98,6 +99,7 @@ class CompleteTests(TestCase):
 
         last_request = m.last_request
         self.assertEqual(last_request.url, "https://callback.example.com/foo")
+        self.assertEqual(last_request.timeout, 10)
 
     def test_retry_behaviour(self, m):
         task = ExternalTask.objects.create(
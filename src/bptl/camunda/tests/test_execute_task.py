@@ -141,8 +141,8 @@ class ExecuteCommandTests(TestCase):
             },
         )
 
-    @patch("bptl.camunda.tasks.fail_task")
-    def test_execute_fail(self, m, mock_fail_task):
+    @patch("bptl.camunda.tasks.send_failure")
+    def test_execute_fail(self, m, mock_send_failure):
         task = ExternalTaskFactory.create(
             topic_name="zaak-initialize",
             variables={
@@ -165,4 +165,4 @@ class ExecuteCommandTests(TestCase):
         self.assertEqual(task.status, Statuses.failed)
         self.assertTrue(task.execution_error.strip().endswith("some connection error"))
 
-        mock_fail_task.assert_called_once_with(task)
+        mock_send_failure.assert_called_once_with(task, retries=0, retry_timeout=0)
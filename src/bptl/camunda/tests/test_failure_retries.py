@@ -0,0 +1,143 @@
+"""
+Test the retries of failed external tasks.
+
+Example requests and response taken from
+https://docs.camunda.org/manual/7.12/reference/rest/external-task/post-failure/
+"""
+from unittest.mock import MagicMock
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+import requests
+import requests_mock
+from django_camunda.models import CamundaConfig
+
+from bptl.tasks import mapping_cache
+from bptl.tasks.tests.factories import TaskMappingFactory
+
+from ..utils import fail_task, get_failure_retries
+from .factories import ExternalTaskFactory
+
+
+def get_http_error(status_code: int) -> requests.HTTPError:
+    return requests.HTTPError(response=MagicMock(status_code=status_code))
+
+
+class FailureRetriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        TaskMappingFactory.create(
+            topic_name="retried",
+            max_retries=3,
+            retry_delay=60,
+            retryable_exceptions=["builtins.KeyError"],
+        )
+
+    def setUp(self):
+        super().setUp()
+        mapping_cache.clear()
+
+    def test_no_retry_policy(self):
+        task = ExternalTaskFactory.build(topic_name="not-retried")
+
+        retries = get_failure_retries(task, requests.ConnectionError())
+
+        self.assertEqual(retries, (0, 0))
+
+    def test_first_failure(self):
+        task = ExternalTaskFactory.build(topic_name="retried", retries=None)
+
+        retries, retry_timeout = get_failure_retries(task, get_http_error(503))
+
+        self.assertEqual(retries, 2)
+        self.assertLessEqual(retry_timeout, 60 * 1000)
+
+    def test_backoff(self):
+        task = ExternalTaskFactory.build(topic_name="retried", retries=1)
+
+        retries, retry_timeout = get_failure_retries(task, requests.Timeout())
+
+        self.assertEqual(retries, 0)
+        self.assertLessEqual(retry_timeout, 4 * 60 * 1000)
+
+    def test_retryable_exception(self):
+        task = ExternalTaskFactory.build(topic_name="retried", retries=None)
+
+        retries, retry_timeout = get_failure_retries(task, KeyError("foo"))
+
+        self.assertEqual(retries, 2)
+
+    def test_fatal_errors(self):
+        task = ExternalTaskFactory.build(topic_name="retried", retries=None)
+
+        for exc in [ValueError(), get_http_error(400)]:
+            with self.subTest(exc=exc):
+                self.assertEqual(get_failure_retries(task, exc), (0, 0))
+
+    def test_no_retries_left(self):
+        task = ExternalTaskFactory.build(topic_name="retried", retries=0)
+
+        retries = get_failure_retries(task, requests.ConnectionError())
+
+        self.assertEqual(retries, (0, 0))
+
+    def test_invalid_retryable_exception(self):
+        for path in ["bptl.NoSuchError", "bptl.tasks.retries.is_transient"]:
+            with self.subTest(path=path):
+                mapping = TaskMappingFactory.build(retryable_exceptions=[path])
+
+                with self.assertRaises(ValidationError):
+                    mapping.clean()
+
+    def test_unresolvable_retryable_exception(self):
+        # saved before validation, or the code changed since
+        TaskMappingFactory.create(
+            topic_name="misconfigured",
+            max_retries=3,
+            retryable_exceptions=[
+                "bptl.NoSuchError",
+                "bptl.tasks.retries.is_transient",
+                "builtins.KeyError",
+            ],
+        )
+        task = ExternalTaskFactory.build(topic_name="misconfigured", retries=None)
+
+        self.assertEqual(get_failure_retries(task, ValueError()), (0, 0))
+        self.assertEqual(get_failure_retries(task, KeyError())[0], 2)
+
+
+@requests_mock.Mocker()
+class FailTaskTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        config = CamundaConfig.get_solo()
+        config.root_url = "https://some.camunda.com"
+        config.rest_api_path = "engine-rest/"
+        config.save()
+
+    def test_fail_task_with_retries(self, m):
+        task = ExternalTaskFactory.create(
+            worker_id="test-worker-id",
+            task_id="test-task-id",
+            execution_error="Traceback\nConnectionError: boom",
+        )
+        m.post(
+            "https://some.camunda.com/engine-rest/external-task/test-task-id/failure",
+            status_code=204,
+        )
+
+        fail_task(task, retries=2, retry_timeout=30000)
+
+        self.assertEqual(
+            m.last_request.json(),
+            {
+                "workerId": "test-worker-id",
+                "errorMessage": "ConnectionError: boom",
+                "errorDetail": "Traceback\nConnectionError: boom",
+                "retries": 2,
+                "retryTimeout": 30000,
+            },
+        )
@@ -4,15 +4,24 @@ Test the fetching and locking of external tasks in Camunda.
 Example requests and response taken from
 https://docs.camunda.org/manual/7.12/reference/rest/external-task/fetch/#example-with-all-variables
 """
+from datetime import timedelta
 from unittest.mock import patch
 
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 import requests_mock
 from django_camunda.models import CamundaConfig
 
+from bptl.tasks.models import BaseTask
+from bptl.tasks.tests.factories import TaskMappingFactory
+from bptl.utils.constants import Statuses
+
 from ..models import ExternalTask
-from ..utils import fetch_and_lock
+from ..utils import LOCK_DURATION, fetch_and_lock
+from .factories import ExternalTaskFactory
 from .utils import get_fetch_and_lock_response
 
 
@@ -26,6 +35,10 @@ class FetchAndLockTests(TestCase):
         config.rest_api_path = "engine-rest/"
         config.save()
 
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
     def test_fetch_one(self, m):
         m.post(
             "https://some.camunda.com/engine-rest/external-task/fetchAndLock",
@@ -54,3 +67,63 @@ class FetchAndLockTests(TestCase):
             fetched_task.variables,
             {"orderId": {"type": "String", "value": "1234", "valueInfo": {}}},
         )
+
+    def test_fetch_many_bulk_inserted(self, m):
+        def mock_response(num_tasks: int):
+            task = get_fetch_and_lock_response()[0]
+            tasks = [{**task, "id": f"task-{i}"} for i in range(num_tasks)]
+            m.post(
+                "https://some.camunda.com/engine-rest/external-task/fetchAndLock",
+                json=tasks,
+            )
+
+        mock_response(2)
+        with CaptureQueriesContext(connection) as few_tasks:
+            fetch_and_lock(max_tasks=2)
+
+        mock_response(20)
+        with CaptureQueriesContext(connection) as many_tasks:
+            worker_id, num_tasks, fetched = fetch_and_lock(max_tasks=20)
+
+        # the number of queries does not grow with the number of tasks
+        self.assertEqual(len(few_tasks), len(many_tasks))
+        self.assertEqual(num_tasks, 20)
+        self.assertEqual(BaseTask.objects.count(), 22)
+
+        for task in fetched:
+            self.assertIsNotNone(task.pk)
+            db_task = BaseTask.objects.get(pk=task.pk)
+            self.assertIsInstance(db_task, ExternalTask)
+            self.assertEqual(db_task.worker_id, worker_id)
+            self.assertEqual(
+                [status for status, timestamp in db_task.status_history],
+                [Statuses.initial],
+            )
+
+    def test_lock_duration_per_topic(self, m):
+        m.post(
+            "https://some.camunda.com/engine-rest/external-task/fetchAndLock", json=[]
+        )
+        TaskMappingFactory.create(topic_name="default")
+        TaskMappingFactory.create(topic_name="observed")
+        TaskMappingFactory.create(topic_name="override", lock_duration=120)
+        for seconds in range(1, 21):
+            ExternalTaskFactory.create(
+                topic_name="observed", execution_duration=timedelta(seconds=seconds)
+            )
+
+        fetch_and_lock(max_tasks=1)
+
+        topics = {
+            topic["topicName"]: topic["lockDuration"]
+            for topic in m.last_request.json()["topics"]
+        }
+        self.assertEqual(
+            topics,
+            {
+                "default": LOCK_DURATION * 1000,
+                # p99 of 1..20s is 19.81s, with a margin of 30s
+                "observed": 50 * 1000,
+                "override": 120 * 1000,
+            },
+        )
@@ -0,0 +1,83 @@
+"""
+Test extending the lock of external tasks while they're being processed.
+
+Example requests and response taken from
+https://docs.camunda.org/manual/7.12/reference/rest/external-task/post-extend-lock/
+"""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+import requests
+import requests_mock
+from django_camunda.models import CamundaConfig
+
+from ..heartbeat import LockHeartbeat
+from ..models import ExternalTask
+from ..utils import extend_lock
+from .factories import ExternalTaskFactory
+
+
+@requests_mock.Mocker()
+class ExtendLockTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        config = CamundaConfig.get_solo()
+        config.root_url = "https://some.camunda.com"
+        config.rest_api_path = "engine-rest/"
+        config.save()
+
+    def test_extend_lock(self, m):
+        task = ExternalTaskFactory.create(
+            worker_id="test-worker-id", task_id="test-task-id"
+        )
+        m.post(
+            "https://some.camunda.com/engine-rest/external-task/test-task-id/extendLock",
+            status_code=204,
+        )
+
+        extend_lock(task, 60)
+
+        self.assertEqual(
+            m.last_request.json(), {"workerId": "test-worker-id", "newDuration": 60000}
+        )
+        task.refresh_from_db()
+        self.assertAlmostEqual(
+            task.lock_expires_at,
+            timezone.now() + timedelta(seconds=60),
+            delta=timedelta(seconds=5),
+        )
+
+
+@patch("bptl.camunda.heartbeat.MIN_INTERVAL", 0)
+class LockHeartbeatTests(TestCase):
+    def test_extends_lock_halfway(self):
+        task = ExternalTask(lock_expires_at=timezone.now() + timedelta(seconds=0.2))
+        heartbeat = LockHeartbeat(task, lock_duration=60)
+
+        def _extend_lock(task, duration):
+            heartbeat.finished.set()
+
+        with patch(
+            "bptl.camunda.heartbeat.extend_lock", side_effect=_extend_lock
+        ) as m_extend_lock:
+            heartbeat.start()
+            heartbeat.join(timeout=5)
+
+        m_extend_lock.assert_called_once_with(task, 60)
+
+    def test_stops_on_http_error(self):
+        task = ExternalTask(lock_expires_at=timezone.now())
+        heartbeat = LockHeartbeat(task, lock_duration=60)
+
+        with patch(
+            "bptl.camunda.heartbeat.extend_lock", side_effect=requests.HTTPError("404")
+        ) as m_extend_lock:
+            heartbeat.start()
+            heartbeat.join(timeout=5)
+
+        self.assertFalse(heartbeat.is_alive())
+        m_extend_lock.assert_called_once_with(task, 60)
@@ -0,0 +1,82 @@
+"""
+Test fetching and locking external tasks with Camunda's long polling.
+"""
+import threading
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+import requests_mock
+from django_camunda.models import CamundaConfig
+
+from ..fetcher import get_backoff, run_fetcher
+from ..models import ExternalTask
+from ..utils import fetch_and_lock
+from .utils import get_fetch_and_lock_response
+
+FETCH_AND_LOCK_URL = "https://some.camunda.com/engine-rest/external-task/fetchAndLock"
+
+
+@requests_mock.Mocker()
+@patch("bptl.camunda.fetcher.get_max_tasks", return_value=10)
+# would close the connection of the test transaction
+@patch("bptl.camunda.fetcher.close_old_connections")
+class LongPollingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        config = CamundaConfig.get_solo()
+        config.root_url = "https://some.camunda.com"
+        config.rest_api_path = "engine-rest/"
+        config.save()
+
+    def test_fetch_with_async_response_timeout(self, m, m_close, m_max_tasks):
+        m.post(FETCH_AND_LOCK_URL, json=get_fetch_and_lock_response())
+
+        fetch_and_lock(max_tasks=1, long_polling_timeout=30)
+
+        self.assertEqual(m.last_request.json()["asyncResponseTimeout"], 30000)
+        self.assertEqual(ExternalTask.objects.count(), 1)
+
+    def test_fetch_without_async_response_timeout(self, m, m_close, m_max_tasks):
+        m.post(FETCH_AND_LOCK_URL, json=[])
+
+        fetch_and_lock(max_tasks=1)
+
+        self.assertNotIn("asyncResponseTimeout", m.last_request.json())
+
+    def test_run_fetcher_schedules_tasks(self, m, m_close, m_max_tasks):
+        stop = threading.Event()
+        m.post(FETCH_AND_LOCK_URL, json=get_fetch_and_lock_response())
+
+        # stop on a backoff as well, so that a failing poll can't loop forever
+        with patch.object(stop, "wait", side_effect=lambda timeout: stop.set()):
+            with patch(
+                "bptl.camunda.fetcher.schedule_tasks",
+                side_effect=lambda tasks: stop.set(),
+            ) as m_schedule:
+                run_fetcher(stop, long_polling_timeout=10)
+
+        m_schedule.assert_called_once_with([ExternalTask.objects.get()])
+        self.assertEqual(m.last_request.json()["asyncResponseTimeout"], 10000)
+
+    def test_run_fetcher_backs_off_on_errors(self, m, m_close, m_max_tasks):
+        stop = threading.Event()
+        m.post(FETCH_AND_LOCK_URL, status_code=500)
+
+        with patch.object(
+            stop, "wait", side_effect=lambda timeout: stop.set()
+        ) as m_wait:
+            run_fetcher(stop, long_polling_timeout=10)
+
+        m_wait.assert_called_once_with(0.5)
+
+
+@override_settings(LONG_POLLING_BACKOFF=0.5, LONG_POLLING_MAX_BACKOFF=10)
+class BackoffTests(TestCase):
+    def test_backoff(self):
+        self.assertEqual(get_backoff(0), 0)
+        self.assertEqual(get_backoff(1), 0.5)
+        self.assertEqual(get_backoff(2), 1)
+        self.assertEqual(get_backoff(3), 2)
+        self.assertEqual(get_backoff(10), 10)
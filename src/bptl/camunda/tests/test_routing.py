@@ -0,0 +1,40 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from bptl.tasks.tests.factories import TaskMappingFactory
+
+from ..routing import get_broker_priority, get_queue
+
+
+class RoutingTests(TestCase):
+    @override_settings(CALLBACK_QUEUES={"bptl.dummy.tasks.dummy": "dummies"})
+    def test_get_queue(self):
+        mapping = TaskMappingFactory.build(callback="bptl.dummy.tasks.dummy")
+        self.assertEqual(get_queue(mapping), "dummies")
+
+        mapping.queue = "slow"
+        self.assertEqual(get_queue(mapping), "slow")
+
+        mapping.callback = "bptl.some.other.callback"
+        mapping.queue = ""
+        self.assertIsNone(get_queue(mapping))
+        self.assertIsNone(get_queue(None))
+
+    # the namespaced CELERY_BROKER_URL setting wins over app.conf.broker_url
+    @patch("bptl.camunda.routing.app")
+    def test_get_broker_priority_redis(self, m_app):
+        m_app.conf.broker_url = "redis://localhost:6379/0"
+
+        self.assertEqual(get_broker_priority(None), 9)
+        self.assertEqual(get_broker_priority(0), 9)
+        self.assertEqual(get_broker_priority(3), 6)
+        self.assertEqual(get_broker_priority(100), 0)
+
+    @patch("bptl.camunda.routing.app")
+    def test_get_broker_priority_amqp(self, m_app):
+        m_app.conf.broker_url = "amqp://guest@localhost//"
+
+        self.assertEqual(get_broker_priority(None), 0)
+        self.assertEqual(get_broker_priority(3), 3)
+        self.assertEqual(get_broker_priority(100), 9)
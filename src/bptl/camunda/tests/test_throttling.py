@@ -0,0 +1,92 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from bptl.tasks.tests.factories import TaskMappingFactory
+from bptl.utils.constants import Statuses
+
+from ..throttling import get_max_tasks
+from .factories import ExternalTaskFactory
+
+
+@override_settings(MAX_TASKS=100)
+@patch("bptl.camunda.throttling.get_queue_length", return_value=0)
+@patch("bptl.camunda.throttling.get_worker_concurrency", return_value=4)
+class MaxTasksTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        TaskMappingFactory.create(topic_name="fast")
+        TaskMappingFactory.create(topic_name="slow")
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_no_execution_times_known(self, *mocks):
+        self.assertEqual(get_max_tasks(), 100)
+
+    def test_capped_by_execution_time(self, *mocks):
+        # 4 workers * 600s lock / 60s per task
+        ExternalTaskFactory.create(
+            topic_name="fast",
+            status=Statuses.completed,
+            execution_duration=timedelta(seconds=1),
+        )
+        ExternalTaskFactory.create(
+            topic_name="slow",
+            status=Statuses.completed,
+            execution_duration=timedelta(seconds=60),
+        )
+
+        self.assertEqual(get_max_tasks(), 40)
+
+    def test_subtract_tasks_in_flight(self, *mocks):
+        ExternalTaskFactory.create(
+            topic_name="slow",
+            status=Statuses.completed,
+            execution_duration=timedelta(seconds=60),
+        )
+        lock_expires_at = timezone.now() + timedelta(minutes=5)
+        ExternalTaskFactory.create_batch(
+            10, status=Statuses.initial, lock_expires_at=lock_expires_at
+        )
+        ExternalTaskFactory.create_batch(
+            4, status=Statuses.in_progress, lock_expires_at=lock_expires_at
+        )
+        # expired tasks are not in flight anymore
+        ExternalTaskFactory.create_batch(
+            5,
+            status=Statuses.initial,
+            lock_expires_at=timezone.now() - timedelta(minutes=1),
+        )
+
+        self.assertEqual(get_max_tasks(), 40 - 10 - 4)
+
+    def test_queue_length_exceeds_known_tasks(self, m_concurrency, m_queue_length):
+        m_queue_length.return_value = 50
+        ExternalTaskFactory.create(
+            topic_name="slow",
+            status=Statuses.completed,
+            execution_duration=timedelta(seconds=60),
+        )
+
+        self.assertEqual(get_max_tasks(), 0)
+
+    @override_settings(MAX_TASKS=10)
+    def test_capped_by_max_tasks(self, *mocks):
+        self.assertEqual(get_max_tasks(), 10)
+
+    def test_lock_duration_override(self, *mocks):
+        TaskMappingFactory.create(topic_name="override", lock_duration=120)
+        ExternalTaskFactory.create(
+            topic_name="override",
+            status=Statuses.completed,
+            execution_duration=timedelta(seconds=60),
+        )
+
+        # 4 workers * 120s lock / 60s per task
+        self.assertEqual(get_max_tasks(), 8)
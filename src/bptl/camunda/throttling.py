@@ -0,0 +1,133 @@
+"""
+Determine how many external tasks can be fetched and locked at a given moment.
+
+Locked tasks that sit in the broker queue for too long expire before they are executed.
+Instead of always fetching ``settings.MAX_TASKS``, the size of each ``fetchAndLock``
+request is derived from live signals:
+
+* the concurrency of the Celery worker pool
+* the tasks that are already queued or being executed
+* the recent execution times and lock durations of the configured topics
+
+Only the amount of tasks that can be executed before their lock expires is fetched,
+capped at ``settings.MAX_TASKS``.
+"""
+import logging
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from bptl.tasks.models import TaskMapping
+from bptl.utils.constants import Statuses
+
+from ..celery import app
+from .models import ExternalTask
+from .routing import get_queues
+from .utils import get_lock_duration
+
+logger = logging.getLogger(__name__)
+
+WORKER_CONCURRENCY_CACHE_KEY = "camunda:worker-concurrency"
+WORKER_CONCURRENCY_CACHE_TIMEOUT = 60
+
+
+def get_worker_concurrency() -> int:
+    """
+    Retrieve the total concurrency of the running Celery workers.
+
+    Inspecting the workers is a broadcast, so the result is cached for a while. If no
+    workers reply, ``settings.WORKER_CONCURRENCY`` is used.
+    """
+    concurrency = cache.get(WORKER_CONCURRENCY_CACHE_KEY)
+    if concurrency is not None:
+        return concurrency
+
+    stats = app.control.inspect(timeout=1).stats() or {}
+    concurrency = sum(
+        worker_stats.get("pool", {}).get("max-concurrency", 0)
+        for worker_stats in stats.values()
+    )
+    if not concurrency:
+        concurrency = settings.WORKER_CONCURRENCY
+
+    cache.set(
+        WORKER_CONCURRENCY_CACHE_KEY, concurrency, WORKER_CONCURRENCY_CACHE_TIMEOUT
+    )
+    return concurrency
+
+
+def get_queue_length(queue_name: str = None) -> int:
+    """
+    Retrieve the number of messages waiting in a broker queue.
+    """
+    queue_name = queue_name or app.conf.task_default_queue
+    with app.connection_for_read() as connection:
+        try:
+            result = connection.default_channel.queue_declare(
+                queue=queue_name, passive=True
+            )
+        except connection.channel_errors:
+            # the queue does not exist (yet)
+            return 0
+    return result.message_count
+
+
+def get_max_tasks() -> int:
+    """
+    Determine how many tasks to fetch and lock in the next ``fetchAndLock`` request.
+    """
+    concurrency = get_worker_concurrency()
+
+    now = timezone.now()
+    counts = {
+        row["status"]: row["tasks"]
+        for row in ExternalTask.objects.filter(
+            status__in=[Statuses.initial, Statuses.in_progress],
+            lock_expires_at__gt=now,
+        ).annotate_status()
+    }
+    in_progress = counts.get(Statuses.in_progress, 0)
+
+    # the broker queues may contain tasks that are not known in the database (yet)
+    try:
+        queue_length = sum(get_queue_length(queue) for queue in get_queues())
+        queued = max(queue_length, counts.get(Statuses.initial, 0))
+    except Exception:
+        logger.warning("Could not determine the queue length", exc_info=True)
+        queued = counts.get(Statuses.initial, 0)
+
+    # be pessimistic and assume all tasks are of the topic that can be executed the
+    # least number of times within its lock duration
+    mappings = {
+        mapping.topic_name: mapping
+        for mapping in TaskMapping.objects.filter(active=True)
+    }
+    execution_times = ExternalTask.objects.filter(
+        topic_name__in=mappings
+    ).average_execution_times(settings.EXECUTION_TIME_SAMPLE_SIZE)
+    runs_per_lock = min(
+        (
+            get_lock_duration(mappings[topic]) / execution_time
+            for topic, execution_time in execution_times.items()
+            if execution_time
+        ),
+        default=None,
+    )
+
+    if runs_per_lock is not None:
+        executable = math.floor(concurrency * runs_per_lock)
+    else:
+        executable = settings.MAX_TASKS
+
+    max_tasks = min(executable - queued - in_progress, settings.MAX_TASKS)
+    logger.debug(
+        "Capacity: concurrency=%d, queued=%d, in_progress=%d, executable=%d -> %d",
+        concurrency,
+        queued,
+        in_progress,
+        executable,
+        max_tasks,
+    )
+    return max(max_tasks, 0)
@@ -2,29 +2,82 @@
 Module for Camunda API interaction.
 """
 import logging
-from typing import List, Optional, Tuple
+import math
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
 
 import requests
 from dateutil import parser
 from django_camunda.client import get_client
 from django_camunda.utils import serialize_variable
 
+from bptl.tasks.mapping_cache import get_task_mapping
 from bptl.tasks.models import TaskMapping
-from bptl.utils.decorators import retry
+from bptl.tasks.retries import get_retry_policy
+from bptl.utils.decorators import RetryPolicy, retry
 from bptl.utils.typing import Object, ProcessVariables
 
+from .completion import call_callback
 from .models import ExternalTask, get_worker_id
 
 logger = logging.getLogger(__name__)
 
-LOCK_DURATION = 60 * 10  # 10 minutes
+LOCK_DURATION = 60 * 10  # 10 minutes, used if the execution times are unknown
+LOCK_DURATION_MIN = 30
+LOCK_DURATION_MARGIN = 30  # seconds on top of the observed 99th percentile
+LOCK_DURATION_MIN_SAMPLES = 20
+LOCK_DURATIONS_CACHE_KEY = "camunda:lock-durations"
+LOCK_DURATIONS_CACHE_TIMEOUT = 60 * 5
+
+
+def get_observed_lock_durations() -> Dict[str, int]:
+    """
+    Derive lock durations (in seconds) per topic from the observed execution times.
+
+    The lock duration is the 99th percentile of the recent execution times, plus a
+    margin. Topics without enough samples are not included.
+    """
+    durations = cache.get(LOCK_DURATIONS_CACHE_KEY)
+    if durations is not None:
+        return durations
+
+    percentiles = ExternalTask.objects.execution_time_percentiles(
+        0.99,
+        sample_size=settings.EXECUTION_TIME_SAMPLE_SIZE,
+        min_samples=LOCK_DURATION_MIN_SAMPLES,
+    )
+    durations = {
+        topic: max(math.ceil(p99 + LOCK_DURATION_MARGIN), LOCK_DURATION_MIN)
+        for topic, p99 in percentiles.items()
+    }
+    cache.set(LOCK_DURATIONS_CACHE_KEY, durations, LOCK_DURATIONS_CACHE_TIMEOUT)
+    return durations
+
+
+def get_lock_duration(mapping: TaskMapping) -> int:
+    """
+    Determine the lock duration (in seconds) for tasks of a topic.
+    """
+    if mapping.lock_duration:
+        return mapping.lock_duration
+    return get_observed_lock_durations().get(mapping.topic_name, LOCK_DURATION)
 
 
-def fetch_and_lock(max_tasks: int) -> Tuple[str, int, list]:
+def fetch_and_lock(
+    max_tasks: int, long_polling_timeout: int = 0
+) -> Tuple[str, int, list]:
     """
     Fetch and lock a number of external tasks.
 
     API reference: https://docs.camunda.org/manual/7.12/reference/rest/external-task/fetch/
+
+    :param max_tasks: the maximum number of tasks to fetch and lock.
+    :param long_polling_timeout: if given, the number of seconds Camunda holds the
+      request open until at least one task is available (``asyncResponseTimeout``).
     """
     camunda = get_client()
 
@@ -33,34 +86,81 @@ def fetch_and_lock(max_tasks: int) -> Tuple[str, int, list]:
     topics = [
         {
             "topicName": mapping.topic_name,
-            "lockDuration": LOCK_DURATION * 1000,  # API expects miliseconds
+            # API expects miliseconds
+            "lockDuration": get_lock_duration(mapping) * 1000,
         }
         for mapping in mappings
     ]
 
     worker_id = get_worker_id()
+    body = {"workerId": worker_id, "maxTasks": max_tasks, "topics": topics}
+    if long_polling_timeout:
+        body["asyncResponseTimeout"] = long_polling_timeout * 1000  # in miliseconds
+
     external_tasks: List[Object] = camunda.request(
-        "external-task/fetchAndLock",
-        method="POST",
-        json={"workerId": worker_id, "maxTasks": max_tasks, "topics": topics,},
+        "external-task/fetchAndLock", method="POST", json=body,
     )
 
-    fetched = []
-    for task in external_tasks:
-        fetched.append(
-            ExternalTask.objects.create(
-                worker_id=worker_id,
-                topic_name=task["topic_name"],
-                priority=task["priority"],
-                task_id=task["id"],
-                lock_expires_at=parser.parse(task["lock_expiration_time"]),
-                variables=task["variables"],
-            )
+    fetched = [
+        ExternalTask(
+            worker_id=worker_id,
+            topic_name=task["topic_name"],
+            priority=task["priority"],
+            task_id=task["id"],
+            lock_expires_at=parser.parse(task["lock_expiration_time"]),
+            retries=task.get("retries"),
+            variables=task["variables"],
         )
+        for task in external_tasks
+    ]
+
+    # persist the tasks in a handful of statements, rather than a couple of inserts
+    # per task
+    if fetched:
+        ExternalTask.objects.bulk_create_tasks(fetched)
 
     return (worker_id, len(fetched), fetched)
 
 
+def extend_lock(task: ExternalTask, duration: int) -> None:
+    """
+    Extend the lock of an external task to ``duration`` seconds from now.
+
+    API reference: https://docs.camunda.org/manual/7.12/reference/rest/external-task/post-extend-lock/
+    """
+    camunda = get_client()
+    body = {
+        "workerId": task.worker_id,
+        "newDuration": duration * 1000,  # API expects miliseconds
+    }
+    camunda.post(f"external-task/{task.task_id}/extendLock", json=body)
+
+    task.lock_expires_at = timezone.now() + timedelta(seconds=duration)
+    ExternalTask.objects.filter(pk=task.pk).update(lock_expires_at=task.lock_expires_at)
+
+
+def unlock(task: ExternalTask) -> None:
+    """
+    Release the lock of an external task, so that Camunda offers it again.
+
+    API reference: https://docs.camunda.org/manual/7.12/reference/rest/external-task/post-unlock/
+    """
+    camunda = get_client()
+    camunda.post(f"external-task/{task.task_id}/unlock")
+
+
+# Camunda optimistic locking conflicts (HTTP 500) resolve quickly - retry soon, but
+# spread out so that concurrent workers don't conflict again
+CAMUNDA_RETRY_POLICY = RetryPolicy(
+    times=3,
+    exceptions=(requests.HTTPError,),
+    condition=lambda exc: exc.response.status_code == 500,
+    delay=0.5,
+    max_delay=5,
+    deadline=15,
+)
+
+
 def fail_retried_complete(
     exception: Exception,
     task: ExternalTask,
@@ -69,14 +169,21 @@ def fail_retried_complete(
     fail_task(task, reason=exception.args[0])
 
 
-@retry(
-    times=3,
-    exceptions=(requests.HTTPError,),
-    condition=lambda exc: exc.response.status_code == 500,
-    on_failure=fail_retried_complete,
-)
+@retry(policy=CAMUNDA_RETRY_POLICY, on_failure=fail_retried_complete)
 def complete_task(
     task: ExternalTask, variables: Optional[ProcessVariables] = None
+) -> None:
+    """
+    Complete an External Task, retrying optimistic locking conflicts in-process.
+
+    The Celery tasks in :mod:`bptl.camunda.tasks` reschedule the completion instead,
+    see :func:`send_completion` for the details.
+    """
+    send_completion(task, variables=variables)
+
+
+def send_completion(
+    task: ExternalTask, variables: Optional[ProcessVariables] = None
 ) -> None:
     """
     Complete an External Task, while optionally setting process variables.
@@ -91,7 +198,8 @@ def complete_task(
     Camunda performs optimistic table locking, see the `docs`_. This results in HTTP
     500 exceptions being thrown when concurrent mutations to the process instance
     happen. The recommended way to deal with this by Camunda is to retry the operation
-    to reach eventual consistency, which is why the ``@retry`` decorator applies.
+    to reach eventual consistency, with exponential backoff and jitter - see
+    :data:`CAMUNDA_RETRY_POLICY`. This function makes a single attempt.
 
     .. _docs: https://docs.camunda.org/manual/latest/user-guide/process-engine/transactions-in-processes/#common-places-where-optimistic-locking-exceptions-are-thrown  # noqa
     """
@@ -114,18 +222,52 @@ def complete_task(
     assert isinstance(callback_url, str), "URLs must be of the type string"
     if callback_url:
         logger.info("Calling callback url for task %s", task)
-        response = requests.post(callback_url)
+        response = call_callback(callback_url)
         logger.info("Callback response status code: %d", response.status_code)
         response.raise_for_status()
 
 
-def fail_task(task: ExternalTask, reason: str = "") -> None:
+def get_failure_retries(task: ExternalTask, exc: Exception) -> Tuple[int, int]:
+    """
+    Determine the retries left and the retry timeout (in ms) of a failed task.
+
+    The retry policy of the topic decides if the error is retryable and when the task
+    is tried again. Camunda keeps track of the retries left between attempts.
+    """
+    mapping = get_task_mapping(task.topic_name)
+    if mapping is None or not mapping.max_retries:
+        return 0, 0
+
+    policy = get_retry_policy(mapping)
+    remaining = mapping.max_retries if task.retries is None else task.retries
+    attempt = max(mapping.max_retries - remaining, 0)
+    if remaining < 1 or not policy.should_retry(exc, attempt):
+        return 0, 0
+
+    return remaining - 1, int(policy.get_delay(attempt) * 1000)
+
+
+@retry(policy=CAMUNDA_RETRY_POLICY)
+def fail_task(
+    task: ExternalTask, reason: str = "", retries: int = 0, retry_timeout: int = 0
+) -> None:
+    """
+    Mark an external task as failed, retrying optimistic locking conflicts in-process.
+    """
+    send_failure(task, reason=reason, retries=retries, retry_timeout=retry_timeout)
+
+
+def send_failure(
+    task: ExternalTask, reason: str = "", retries: int = 0, retry_timeout: int = 0
+) -> None:
     """
-    Mark an external task as failed.
+    Mark an external task as failed, in a single attempt.
 
     See https://docs.camunda.org/manual/7.11/reference/rest/external-task/post-failure/
 
-    When the number of retries becomes 0, an incident is created in Camunda.
+    Camunda offers the task again after ``retry_timeout`` milliseconds, as long as
+    there are ``retries`` left. When the number of retries becomes 0, an incident is
+    created in Camunda.
     """
     camunda = get_client()
 
@@ -138,8 +280,8 @@ def fail_task(task: ExternalTask, reason: str = "") -> None:
         "workerId": task.worker_id,
         "errorMessage": reason,
         "errorDetail": task.execution_error,
-        "retries": 0,  # TODO: some sort of retry policy?
-        "retryTimeout": 0,
+        "retries": retries,
+        "retryTimeout": retry_timeout,
     }
 
     camunda.post(f"external-task/{task.task_id}/failure", json=body)
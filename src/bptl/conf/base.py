@@ -41,6 +41,18 @@ DATABASES = {
     }
 }
 
+# Caching - shared between the web and worker processes
+CACHES = {
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": os.getenv("CACHE_DEFAULT", "redis://localhost:6379/1"),
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "IGNORE_EXCEPTIONS": True,
+        },
+    },
+}
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -381,18 +393,85 @@ CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
 # Add a 10 minutes timeout to all Celery tasks.
 CELERY_TASK_SOFT_TIME_LIMIT = 600
-CELERY_BEAT_SCHEDULE = {
-    "task-pull": {
-        "task": "bptl.camunda.tasks.task_fetch_and_lock",
-        "schedule": schedule(run_every=10),  # run every 10 seconds
-    },
-}
+CELERY_BEAT_SCHEDULE = {}
 CELERY_ACKS_LATE = True
+# support message priorities, see bptl.camunda.routing
+CELERY_TASK_QUEUE_MAX_PRIORITY = 10
+CELERY_BROKER_TRANSPORT_OPTIONS = {"priority_steps": list(range(10))}
 
 # project application settings
+# Upper bound of the number of tasks fetched and locked per request. The actual number
+# is derived from the available worker capacity, see bptl.camunda.throttling
 MAX_TASKS = 10
+# total concurrency of the celery workers, used if the workers can't be inspected
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", 4))
+# number of recently performed tasks used to estimate execution times
+EXECUTION_TIME_SAMPLE_SIZE = 1000
+# route tasks of particular callbacks to dedicated worker queues, e.g.
+# {"bptl.work_units.kadaster.tasks.retrieve_openbare_ruimten": "slow"}. A queue
+# configured on the task mapping takes precedence.
+CALLBACK_QUEUES = {}
+# seconds to postpone a task when the maximum concurrency of its topic is reached
+CONCURRENCY_RETRY_DELAY = 5
+# times a task is postponed before it's released to Camunda, to be fetched again later
+CONCURRENCY_MAX_RETRIES = 60
+# queue to complete performed tasks on, see bptl.camunda.completion. Tasks are completed
+# right after their execution if not set.
+COMPLETION_QUEUE = os.getenv("COMPLETION_QUEUE") or None
+# seconds to wait for the callback URL of a task to respond
+CALLBACK_TIMEOUT = 10
+# work units accepted in a single request by the batch endpoint of the work-unit API,
+# and the number of them executed at the same time
+WORK_UNIT_BATCH_MAX_SIZE = 100
+WORK_UNIT_BATCH_CONCURRENCY = int(os.getenv("WORK_UNIT_BATCH_CONCURRENCY", 10))
+
+# Camunda long polling: a dedicated fetcher process (see ``bin/fetcher.sh``) keeps a
+# ``fetchAndLock`` request open for ``LONG_POLLING_TIMEOUT`` seconds, so that tasks are
+# handed to the workers as soon as they're locked. When disabled, Celery beat polls
+# every 10 seconds instead.
+LONG_POLLING_ENABLED = os.getenv("LONG_POLLING_ENABLED", "false").lower() == "true"
+LONG_POLLING_TIMEOUT = int(os.getenv("LONG_POLLING_TIMEOUT", 30))
+# backoff (in seconds) between empty or failed polls, doubled up to the maximum
+LONG_POLLING_BACKOFF = 0.5
+LONG_POLLING_MAX_BACKOFF = 10
+
+if not LONG_POLLING_ENABLED:
+    CELERY_BEAT_SCHEDULE["task-pull"] = {
+        "task": "bptl.camunda.tasks.task_fetch_and_lock",
+        "schedule": schedule(run_every=10),  # run every 10 seconds
+    }
+
+CAMUNDA_CLIENT_CLASS = "bptl.camunda.client.CamundaClient"
 ZGW_CONSUMERS_CLIENT_CLASS = "bptl.work_units.zgw.client.ZGWClient"
 
+# logging of the outgoing API requests of tasks, see bptl.tasks.request_log
+# headers of which the values are not logged (case insensitive)
+REQUEST_LOG_REDACTED_HEADERS = ["Authorization", "Cookie", "Set-Cookie"]
+# request and response bodies are truncated to this number of characters (serialized
+# as JSON), ``None`` logs them completely
+REQUEST_LOG_MAX_BODY_SIZE = 10000
+# fraction of the successful requests logged per service base URL, e.g.
+# {"https://api.example.com": 0.1}. Failed requests are always logged.
+REQUEST_LOG_SAMPLE_RATES = {}
+
+# retention of finished tasks and their logs, see bptl.tasks.retention. The number of
+# days can be set per topic on the task mapping, tasks are kept forever if neither is
+# set.
+TASK_RETENTION_DAYS = (
+    int(os.getenv("TASK_RETENTION_DAYS")) if os.getenv("TASK_RETENTION_DAYS") else None
+)
+# number of tasks removed per batch, and the maximum number of batches per run
+TASK_RETENTION_BATCH_SIZE = 1000
+TASK_RETENTION_MAX_BATCHES = 100
+# directory to archive removed tasks to, as gzipped JSON lines files. The tasks are
+# not archived if not set.
+TASK_ARCHIVE_DIR = os.getenv("TASK_ARCHIVE_DIR") or None
+
+CELERY_BEAT_SCHEDULE["task-retention"] = {
+    "task": "bptl.tasks.tasks.task_apply_retention",
+    "schedule": schedule(run_every=60 * 60),  # run every hour
+}
+
 # api settings
 REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
@@ -1,10 +1,11 @@
 from django.urls import path
 
-from .views import AggregateView
+from .views import AggregateView, CompletionMetricsView
 
 app_name = "dashboard-api"
 
 urlpatterns = [
     # Simply show the master template.
     path("aggregate/", AggregateView.as_view(), name="aggregate"),
+    path("completion/", CompletionMetricsView.as_view(), name="completion"),
 ]
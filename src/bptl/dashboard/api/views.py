@@ -2,14 +2,14 @@ from collections import defaultdict
 from datetime import datetime, timedelta
 
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import Count
 from django.utils import timezone
 
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from timeline_logger.models import TimelineLog
 
+from bptl.camunda.completion import get_completion_metrics
 from bptl.tasks.constants import ENGINETYPE_MODEL_MAPPING
+from bptl.tasks.models import StatusCount
 from bptl.utils.constants import Statuses
 
 TASK_STATUS_HISTORY = timedelta(hours=24)
@@ -25,28 +25,14 @@ def aggregate_data(since: datetime):
         model: engine_type for engine_type, model in ENGINETYPE_MODEL_MAPPING.items()
     }
 
-    log_entries = (
-        TimelineLog.objects.filter(
-            content_type__in=content_types.values(),
-            extra_data__status__in=Statuses.values,
-            timestamp__gte=since,
-        )
-        .distinct("object_id")
-        .order_by("object_id", "-timestamp")
-    )
-
     total_data = defaultdict(int)
     items = defaultdict(lambda: defaultdict(int))
 
-    # separate qs because annotate + distinct is not possible
-    qs = (
-        TimelineLog.objects.filter(pk__in=log_entries)
-        .values("extra_data__status", "content_type_id")
-        .annotate(tasks=Count("extra_data__status"))
-    )
+    # the counts are maintained per time bucket as the tasks change status
+    qs = StatusCount.objects.filter(content_type__in=content_types.values())
 
-    for count in qs:
-        status = count["extra_data__status"]
+    for count in qs.totals(since):
+        status = count["status"]
         model = ct_id_to_model[count["content_type_id"]]
         engine_type = model_to_engine_type[model]
 
@@ -75,3 +61,12 @@ class AggregateView(APIView):
         now = timezone.now()
         data = aggregate_data(since=now - TASK_STATUS_HISTORY)
         return Response(data)
+
+
+class CompletionMetricsView(APIView):
+    swagger_schema = None
+
+    permission_classes = []
+
+    def get(self, request, format=None):
+        return Response(get_completion_metrics())
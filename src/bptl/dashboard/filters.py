@@ -4,7 +4,7 @@ from django.db.models import QuerySet
 import django_filters
 from django_filters import FilterSet
 
-from bptl.tasks.constants import ENGINETYPE_MODEL_MAPPING, EngineTypes
+from bptl.tasks.constants import EngineTypes, get_content_type_ids
 from bptl.tasks.models import BaseTask
 from bptl.utils.constants import Statuses
 
@@ -27,13 +27,5 @@ class TaskFilter(FilterSet):
     def filter_by_type(self, queryset, name, value: list) -> QuerySet:
         if not value:
             return queryset
-
-        qs = queryset.instance_of(ENGINETYPE_MODEL_MAPPING[value[0]])
-
-        if len(value) == 1:
-            return qs
-
-        for engine_type in value[1:]:
-            qs = qs | queryset.instance_of(ENGINETYPE_MODEL_MAPPING[engine_type])
-
-        return queryset
+        # filter on the content type column directly, rather than joining it
+        return queryset.filter(polymorphic_ctype__in=get_content_type_ids(value))
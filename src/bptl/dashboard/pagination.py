@@ -0,0 +1,99 @@
+"""
+Paginate the task list by primary key, rather than by page number.
+
+Offset pagination makes the database skip all the rows of the previous pages, which
+gets slow for deep pages of a large table. The pages are selected by the primary key
+of the last (or first) task on the adjacent page instead, and the total number of
+tasks is estimated by the query planner.
+"""
+from typing import List, Optional, Tuple
+
+from django.core.exceptions import EmptyResultSet
+from django.db.models import QuerySet
+from django.http import QueryDict
+
+from bptl.tasks.query import explain
+
+# below this estimate, the tasks are counted exactly
+EXACT_COUNT_THRESHOLD = 10000
+
+
+def get_approximate_count(queryset: QuerySet) -> Tuple[int, bool]:
+    """
+    Estimate the number of objects in the queryset, counting them if there are few.
+
+    Returns the count and whether it's exact.
+    """
+    try:
+        estimate = explain(queryset.order_by())["Plan Rows"]
+    except EmptyResultSet:
+        return 0, True
+    if estimate < EXACT_COUNT_THRESHOLD:
+        return queryset.count(), True
+    return int(estimate), False
+
+
+def _get_cursor(params: QueryDict, name: str) -> Optional[int]:
+    try:
+        return int(params[name])
+    except (KeyError, ValueError):
+        return None
+
+
+class KeysetPage:
+    """
+    A page of objects, ordered by descending primary key.
+
+    The page is selected with either of the ``before`` (the next, older pages) or
+    ``after`` (the previous, newer pages) query parameters.
+    """
+
+    def __init__(self, queryset: QuerySet, page_size: int, params: QueryDict):
+        self.params = params
+        before = _get_cursor(params, "before")
+        after = _get_cursor(params, "after")
+
+        if after is not None:
+            newer = queryset.filter(pk__gt=after).order_by("pk")
+            objects = list(newer[: page_size + 1])
+            self.object_list: List = objects[:page_size][::-1]
+            self.has_previous = len(objects) > page_size
+            self.has_next = queryset.filter(pk__lte=after).exists()
+        else:
+            older = queryset if before is None else queryset.filter(pk__lt=before)
+            objects = list(older.order_by("-pk")[: page_size + 1])
+            self.object_list = objects[:page_size]
+            self.has_next = len(objects) > page_size
+            self.has_previous = (
+                before is not None and queryset.filter(pk__gte=before).exists()
+            )
+
+        # an empty page has no cursors - start over from the first page
+        if not self.object_list:
+            self.has_previous = self.has_next = False
+
+    def has_other_pages(self) -> bool:
+        return self.has_previous or self.has_next
+
+    def _get_query(self, **cursor) -> str:
+        params = self.params.copy()
+        for name in ("before", "after", "page"):
+            params.pop(name, None)
+        params.update(cursor)
+        return params.urlencode()
+
+    @property
+    def first_query(self) -> str:
+        return self._get_query()
+
+    @property
+    def previous_query(self) -> str:
+        return self._get_query(after=self.object_list[0].pk)
+
+    @property
+    def next_query(self) -> str:
+        return self._get_query(before=self.object_list[-1].pk)
+
+    @property
+    def last_query(self) -> str:
+        return self._get_query(after=0)
@@ -2,7 +2,7 @@ import json
 
 from django.template import Library
 
-from bptl.tasks.constants import ENGINETYPE_MODEL_MAPPING, EngineTypes
+from bptl.tasks.constants import EngineTypes, get_engine_type
 from bptl.utils.constants import Statuses
 
 register = Library()
@@ -10,10 +10,9 @@ register = Library()
 
 @register.filter
 def task_type(task) -> str:
-    for type, model in ENGINETYPE_MODEL_MAPPING.items():
-        if isinstance(task, model):
-            return EngineTypes.values[type]
-    return ""
+    # works for non-polymorphic tasks as well
+    engine_type = get_engine_type(task.polymorphic_ctype_id)
+    return EngineTypes.values.get(engine_type, "")
 
 
 @register.filter
@@ -0,0 +1,44 @@
+"""
+Guard that the completion metrics are kept in, and served from, the shared cache.
+"""
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from bptl.camunda.completion import record_completion
+from bptl.camunda.tests.factories import ExternalTaskFactory
+from bptl.utils.constants import Statuses
+
+NOW = datetime(2020, 7, 27, 12, 30, 15, tzinfo=timezone.utc)
+MINUTE = int(NOW.timestamp() // 60)
+
+
+class CompletionMetricsCacheTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    @patch("bptl.camunda.completion.timezone.now", return_value=NOW)
+    @patch("bptl.camunda.completion.cache", wraps=cache)
+    def test_metrics_through_cache(self, m_cache, m_now):
+        task = ExternalTaskFactory.create(status=Statuses.completed)
+
+        record_completion(task, time.monotonic(), success=True)
+        response = self.client.get(reverse("dashboard:dashboard-api:completion"))
+
+        key = f"camunda:completion-metrics:{MINUTE}:completed"
+        # the counters expire after a day
+        m_cache.add.assert_any_call(key, 0, 60 * 60 * 24)
+        self.assertEqual(cache.get(key), 1)
+        # the endpoint reads the counters of the last 15 minutes at once
+        m_cache.get_many.assert_called_once()
+        keys = m_cache.get_many.call_args[0][0]
+        self.assertIn(key, keys)
+        self.assertIn(f"camunda:completion-metrics:{MINUTE - 14}:completed", keys)
+        self.assertNotIn(f"camunda:completion-metrics:{MINUTE - 15}:completed", keys)
+        self.assertEqual(response.json()["completed"], 1)
@@ -0,0 +1,49 @@
+from django.test import TestCase
+
+from bptl.activiti.models import ServiceTask
+from bptl.camunda.tests.factories import ExternalTaskFactory
+from bptl.tasks.constants import EngineTypes
+from bptl.tasks.models import BaseTask
+from bptl.utils.constants import Statuses
+
+from ..filters import TaskFilter
+
+
+class TaskFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.external_task = ExternalTaskFactory.create()
+        cls.failed_external_task = ExternalTaskFactory.create(status=Statuses.failed)
+        cls.service_task = ServiceTask.objects.create(topic_name="zaak-initialize")
+
+    def filter(self, data) -> set:
+        return set(TaskFilter(data, queryset=BaseTask.objects.all()).qs)
+
+    def test_single_engine_type(self):
+        self.assertEqual(
+            self.filter({"engine_type": [EngineTypes.activiti]}), {self.service_task}
+        )
+
+    def test_multiple_engine_types(self):
+        tasks = self.filter(
+            {"engine_type": [EngineTypes.camunda, EngineTypes.activiti]}
+        )
+
+        self.assertEqual(
+            tasks, {self.external_task, self.failed_external_task, self.service_task}
+        )
+
+    def test_engine_type_and_status(self):
+        tasks = self.filter(
+            {"engine_type": [EngineTypes.camunda], "status": [Statuses.initial]}
+        )
+
+        self.assertEqual(tasks, {self.external_task})
+
+    def test_no_join(self):
+        queryset = TaskFilter(
+            {"engine_type": [EngineTypes.camunda]}, queryset=BaseTask.objects.all()
+        ).qs
+
+        self.assertNotIn("django_content_type", str(queryset.query))
@@ -0,0 +1,91 @@
+"""
+Guard that listing tasks takes a fixed number of queries, however many are shown.
+"""
+from typing import List
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from bptl.accounts.models import User
+from bptl.activiti.models import ServiceTask
+from bptl.camunda.models import ExternalTask
+from bptl.tasks.constants import EngineTypes, get_content_type_ids
+from bptl.tasks.tests.factories import create_mixed_tasks
+from bptl.utils.constants import Statuses
+
+from ..views import TaskListView
+
+CHILD_TABLES = (ExternalTask._meta.db_table, ServiceTask._meta.db_table)
+
+
+class TaskListQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.tasks = create_mixed_tasks(1000)
+        cls.user = User.objects.create_superuser("super", "user@utrecht.nl", "letmein")
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("dashboard:task-list")
+        # fill the caches (e.g. the content types), as in a running process
+        get_content_type_ids(EngineTypes.values)
+        self.client.get(self.url)
+
+    def get_queries(self, params=None, page_size: int = 20) -> List[str]:
+        with patch.object(TaskListView, "paginate_by", page_size):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(self.url, params)
+
+        self.assertEqual(response.status_code, 200)
+        return [query["sql"] for query in context.captured_queries]
+
+    def test_no_queries_per_task(self):
+        few = self.get_queries(page_size=10)
+        many = self.get_queries(page_size=200)
+
+        self.assertEqual(len(few), len(many))
+
+    def test_child_tables_not_queried(self):
+        filters = [
+            {},
+            {"engine_type": [EngineTypes.camunda, EngineTypes.activiti]},
+            {"status": [Statuses.initial], "topic_name": "initialize-zaak"},
+        ]
+        for params in filters:
+            with self.subTest(params=params):
+                queries = self.get_queries(params, page_size=200)
+
+                for sql in queries:
+                    for table in CHILD_TABLES:
+                        self.assertNotIn(f'"{table}"', sql)
+
+    def test_engine_types_shown(self):
+        with patch.object(TaskListView, "paginate_by", 200):
+            response = self.client.get(self.url)
+
+        for engine_type in (EngineTypes.camunda, EngineTypes.activiti):
+            label = EngineTypes.values[engine_type]
+            self.assertContains(
+                response, f'<div class="task__topic">{label}</div>', html=True
+            )
+
+    def test_detail_single_query(self):
+        task = self.tasks[0]
+        url = reverse("dashboard:task-detail", args=[task.pk])
+        self.client.force_login(self.user)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+
+        self.assertEqual(type(response.context["task"]), ExternalTask)
+        self.assertContains(response, task.task_id)
+        task_queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if f'"{ExternalTask._meta.db_table}"' in query["sql"]
+        ]
+        self.assertEqual(len(task_queries), 1)
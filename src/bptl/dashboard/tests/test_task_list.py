@@ -0,0 +1,89 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.urls import reverse
+
+from bptl.camunda.tests.factories import ExternalTaskFactory
+from bptl.utils.constants import Statuses
+
+from ..pagination import get_approximate_count
+from ..views import TaskListView
+
+
+@patch.object(TaskListView, "paginate_by", 2)
+class TaskListPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.tasks = ExternalTaskFactory.create_batch(5)
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("dashboard:task-list")
+
+    def get_pks(self, response) -> list:
+        return [task.pk for task in response.context["tasks"]]
+
+    def test_first_page(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(self.get_pks(response), [self.tasks[4].pk, self.tasks[3].pk])
+        page = response.context["page_obj"]
+        self.assertFalse(page.has_previous)
+        self.assertTrue(page.has_next)
+        self.assertEqual(page.next_query, f"before={self.tasks[3].pk}")
+
+    def test_next_page(self):
+        response = self.client.get(self.url, {"before": self.tasks[3].pk})
+
+        self.assertEqual(self.get_pks(response), [self.tasks[2].pk, self.tasks[1].pk])
+        page = response.context["page_obj"]
+        self.assertTrue(page.has_previous)
+        self.assertTrue(page.has_next)
+        self.assertEqual(page.previous_query, f"after={self.tasks[2].pk}")
+
+    def test_previous_page(self):
+        response = self.client.get(self.url, {"after": self.tasks[2].pk})
+
+        self.assertEqual(self.get_pks(response), [self.tasks[4].pk, self.tasks[3].pk])
+        page = response.context["page_obj"]
+        self.assertFalse(page.has_previous)
+        self.assertTrue(page.has_next)
+
+    def test_last_page(self):
+        response = self.client.get(self.url, {"after": 0})
+
+        self.assertEqual(self.get_pks(response), [self.tasks[1].pk, self.tasks[0].pk])
+        page = response.context["page_obj"]
+        self.assertTrue(page.has_previous)
+        self.assertFalse(page.has_next)
+
+    def test_filters_are_kept(self):
+        response = self.client.get(self.url, {"status": [Statuses.initial]})
+
+        page = response.context["page_obj"]
+        self.assertEqual(
+            page.next_query, f"status={Statuses.initial}&before={self.tasks[3].pk}"
+        )
+
+    def test_large_columns_deferred(self):
+        response = self.client.get(self.url)
+
+        task = response.context["tasks"][0]
+        self.assertEqual(
+            task.get_deferred_fields(),
+            {"variables", "result_variables", "status_history", "execution_error"},
+        )
+
+    def test_count(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.context["task_count"], 5)
+        self.assertTrue(response.context["task_count_exact"])
+
+    @patch("bptl.dashboard.pagination.EXACT_COUNT_THRESHOLD", 0)
+    def test_approximate_count(self):
+        count, exact = get_approximate_count(TaskListView.queryset)
+
+        self.assertFalse(exact)
+        self.assertGreaterEqual(count, 0)
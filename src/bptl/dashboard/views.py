@@ -6,17 +6,42 @@ from django_filters.views import FilterView
 from bptl.tasks.models import BaseTask
 
 from .filters import TaskFilter
+from .pagination import KeysetPage, get_approximate_count
+
+# large columns the task list doesn't show
+LIST_DEFERRED_FIELDS = (
+    "variables",
+    "result_variables",
+    "status_history",
+    "execution_error",
+)
 
 
 class TaskListView(FilterView):
     template_name = "dashboard/task_list.html"
     filterset_class = TaskFilter
-    queryset = BaseTask.objects.all().order_by("-pk")
+    # the list only shows the common fields, don't query the child tables
+    queryset = (
+        BaseTask.objects.non_polymorphic().defer(*LIST_DEFERRED_FIELDS).order_by("-pk")
+    )
     context_object_name = "tasks"
     paginate_by = 20
 
+    def paginate_queryset(self, queryset, page_size):
+        page = KeysetPage(queryset, page_size, self.request.GET)
+        return (None, page, page.object_list, page.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        count, exact = get_approximate_count(self.object_list)
+        context.update(task_count=count, task_count_exact=exact)
+        return context
+
 
 class TaskDetailView(LoginRequiredMixin, DetailView):
     template_name = "dashboard/task_detail.html"
-    model = BaseTask
+    queryset = BaseTask.objects.select_children()
     context_object_name = "task"
+
+    def get_object(self, queryset=None):
+        return super().get_object(queryset=queryset).child_task
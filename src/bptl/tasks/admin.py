@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.utils.translation import ugettext_lazy as _
 
 from polymorphic.admin import PolymorphicChildModelFilter, PolymorphicParentModelAdmin
 
@@ -6,6 +7,7 @@ from bptl.activiti.models import ServiceTask
 from bptl.camunda.models import ExternalTask
 from bptl.work_units.zgw.models import DefaultService
 
+from .constants import EngineTypes, get_engine_type
 from .forms import AdminTaskMappingForm
 from .models import BaseTask, TaskMapping
 
@@ -27,4 +29,11 @@ class TaskMappingAdmin(admin.ModelAdmin):
 @admin.register(BaseTask)
 class BaseTaskAdmin(PolymorphicParentModelAdmin):
     child_models = (ExternalTask, ServiceTask)
+    list_display = ("__str__", "engine_type", "status")
     list_filter = (PolymorphicChildModelFilter, "status")
+
+    def engine_type(self, obj) -> str:
+        # the list is not polymorphic, see ``polymorphic_list``
+        return EngineTypes.values.get(get_engine_type(obj.polymorphic_ctype_id), "")
+
+    engine_type.short_description = _("engine type")
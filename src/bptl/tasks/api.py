@@ -6,8 +6,10 @@ import inspect
 from bptl.utils.constants import Statuses
 from bptl.utils.decorators import save_and_log
 
-from .models import BaseTask, TaskMapping
+from .mapping_cache import get_task_mapping
+from .models import BaseTask
 from .registry import WorkUnitRegistry, register
+from .request_log import task_context
 
 __all__ = [
     "TaskExpired",
@@ -47,8 +49,7 @@ def execute(task: BaseTask, registry: WorkUnitRegistry = register) -> None:
     :raises: :class:`TaskPerformed` if the task is already completed, this exception is
       raised.
     """
-    # returns at most one result because of the unique constraint on topic_name
-    task_mapping = TaskMapping.objects.filter(topic_name=task.topic_name).first()
+    task_mapping = get_task_mapping(task.topic_name)
     if task_mapping is None:
         raise NoCallback(
             f"Could not find a topic/callback mapping for topic '{task.topic_name}'."
@@ -71,9 +72,10 @@ def execute(task: BaseTask, registry: WorkUnitRegistry = register) -> None:
 
     # actually call the task
     callback = handler.callback
-    if inspect.isclass(callback):
-        result = callback(task).perform()
-    else:
-        result = callback(task)
+    with task_context(task):
+        if inspect.isclass(callback):
+            result = callback(task).perform()
+        else:
+            result = callback(task)
 
     return result
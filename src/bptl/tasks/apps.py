@@ -9,4 +9,6 @@ class TasksConfig(AppConfig):
     verbose_name = _("Task configuration")
 
     def ready(self):
+        from . import signals  # noqa
+
         register.autodiscover()
@@ -1,3 +1,7 @@
+from typing import Iterable, List
+
+from django.contrib.contenttypes.models import ContentType
+
 from djchoices import ChoiceItem, DjangoChoices
 
 from bptl.activiti.models import ServiceTask
@@ -13,3 +17,28 @@ ENGINETYPE_MODEL_MAPPING = {
     EngineTypes.camunda: ExternalTask,
     EngineTypes.activiti: ServiceTask,
 }
+
+
+def get_content_type_ids(engine_types: Iterable[str]) -> List[int]:
+    """
+    Determine the (polymorphic) content types of the tasks of the engine types.
+
+    The content types are cached by Django, this does not query the database again.
+    """
+    models = [ENGINETYPE_MODEL_MAPPING[engine_type] for engine_type in engine_types]
+    content_types = ContentType.objects.get_for_models(*models)
+    return [content_type.id for content_type in content_types.values()]
+
+
+def get_engine_type(content_type_id: int) -> str:
+    """
+    Determine the engine type of a task from its (polymorphic) content type.
+
+    The content types are cached by Django, so that the engine type of
+    non-polymorphic tasks is known without querying the child tables.
+    """
+    model = ContentType.objects.get_for_id(content_type_id).model_class()
+    for engine_type, engine_model in ENGINETYPE_MODEL_MAPPING.items():
+        if model is engine_model:
+            return engine_type
+    return ""
@@ -0,0 +1,21 @@
+from django.core.management import BaseCommand
+
+from ...retention import apply_retention
+
+
+class Command(BaseCommand):
+    help = "Remove (and archive) finished tasks and their logs past their retention"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, help="Number of tasks removed per batch"
+        )
+        parser.add_argument(
+            "--max-batches", type=int, help="Maximum number of batches to remove"
+        )
+
+    def handle(self, **options):
+        removed = apply_retention(
+            batch_size=options["batch_size"], max_batches=options["max_batches"]
+        )
+        self.stdout.write(f"Removed {removed} expired tasks")
@@ -0,0 +1,14 @@
+from django.core.management import BaseCommand
+
+from ...registry import register
+
+
+class Command(BaseCommand):
+    help = "Render the documentation of the registered tasks into the shared cache"
+
+    def handle(self, **options):
+        tasks = list(register)
+        for task in tasks:
+            task.html_documentation
+
+        self.stdout.write(f"Rendered the documentation of {len(tasks)} tasks")
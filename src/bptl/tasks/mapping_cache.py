@@ -0,0 +1,110 @@
+"""
+In-process cache of the task mapping configuration.
+
+Executing a task requires the task mapping of its topic and the default services
+configured for it, often several times per task. The configuration rarely changes, so
+every process keeps it in memory.
+
+The cached configuration is versioned - the version is kept in the shared (Django)
+cache and replaced whenever a :class:`bptl.tasks.models.TaskMapping`,
+:class:`bptl.work_units.zgw.models.DefaultService` or
+:class:`zgw_consumers.models.Service` is saved or deleted, and again once that's
+committed, see :mod:`bptl.tasks.signals`. Each process reloads its configuration when it notices a
+new version.
+"""
+import threading
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from django.core.cache import cache
+
+from bptl.work_units.zgw.models import DefaultService
+
+from .models import TaskMapping
+
+__all__ = [
+    "get_task_mapping",
+    "get_default_services",
+    "invalidate",
+    "clear",
+]
+
+VERSION_CACHE_KEY = "tasks:task-mapping-version"
+
+
+class TaskMappingCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._mappings: Dict[str, TaskMapping] = {}
+        self._default_services: Dict[str, List[DefaultService]] = {}
+
+    def _get_version(self) -> str:
+        return cache.get_or_set(VERSION_CACHE_KEY, lambda: uuid.uuid4().hex, None)
+
+    def _load(self) -> None:
+        version = self._get_version()
+        if version == self._version:
+            return
+
+        with self._lock:
+            mappings = {
+                mapping.topic_name: mapping for mapping in TaskMapping.objects.all()
+            }
+            default_services = defaultdict(list)
+            for default_service in DefaultService.objects.select_related(
+                "task_mapping", "service"
+            ):
+                topic_name = default_service.task_mapping.topic_name
+                default_services[topic_name].append(default_service)
+
+            self._mappings = mappings
+            self._default_services = dict(default_services)
+            self._version = version
+
+    def get_task_mapping(self, topic_name: str) -> Optional[TaskMapping]:
+        self._load()
+        return self._mappings.get(topic_name)
+
+    def get_default_services(self, topic_name: str) -> List[DefaultService]:
+        self._load()
+        return self._default_services.get(topic_name, [])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version = None
+            self._mappings = {}
+            self._default_services = {}
+
+
+_cache = TaskMappingCache()
+
+
+def get_task_mapping(topic_name: str) -> Optional[TaskMapping]:
+    """
+    Retrieve the task mapping for a topic, if there is one.
+    """
+    return _cache.get_task_mapping(topic_name)
+
+
+def get_default_services(topic_name: str) -> List[DefaultService]:
+    """
+    Retrieve the default services (with their service) configured for a topic.
+    """
+    return _cache.get_default_services(topic_name)
+
+
+def invalidate() -> None:
+    """
+    Mark the cached configuration as outdated, in every process.
+    """
+    cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+    _cache.clear()
+
+
+def clear() -> None:
+    """
+    Forget the cached configuration of the current process.
+    """
+    _cache.clear()
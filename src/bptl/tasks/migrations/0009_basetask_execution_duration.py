@@ -0,0 +1,23 @@
+# Generated by Django 2.2.14 on 2020-07-20 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0008_auto_20200228_1616"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="basetask",
+            name="execution_duration",
+            field=models.DurationField(
+                blank=True,
+                help_text="How long it took to perform the work unit.",
+                null=True,
+                verbose_name="execution duration",
+            ),
+        ),
+    ]
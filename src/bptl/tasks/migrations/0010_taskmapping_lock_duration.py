@@ -0,0 +1,23 @@
+# Generated by Django 2.2.14 on 2020-07-20 14:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0009_basetask_execution_duration"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskmapping",
+            name="lock_duration",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Number of seconds a fetched task stays locked for other workers. Leave empty to derive it from the observed execution times.",
+                null=True,
+                verbose_name="lock duration",
+            ),
+        ),
+    ]
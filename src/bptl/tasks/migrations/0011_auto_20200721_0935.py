@@ -0,0 +1,33 @@
+# Generated by Django 2.2.14 on 2020-07-21 09:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0010_taskmapping_lock_duration"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskmapping",
+            name="max_concurrency",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Maximum number of tasks of this topic that may be executed at the same time. Leave empty for no limit.",
+                null=True,
+                verbose_name="maximum concurrency",
+            ),
+        ),
+        migrations.AddField(
+            model_name="taskmapping",
+            name="queue",
+            field=models.CharField(
+                blank=True,
+                help_text="Name of the worker queue to route tasks of this topic to. Leave empty to use the default queue.",
+                max_length=100,
+                verbose_name="queue",
+            ),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 2.2.14 on 2020-07-23 10:12
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.utils.timezone
+
+import bptl.tasks.models
+
+BATCH_SIZE = 1000
+
+
+def backfill_status_history(apps, schema_editor):
+    """
+    Derive the status history of existing tasks from their status log entries.
+    """
+    BaseTask = apps.get_model("tasks.BaseTask")
+    TimelineLog = apps.get_model("timeline_logger.TimelineLog")
+
+    # the logs of the tasks refer to their concrete (polymorphic) model - other
+    # objects may be logged with a status as well
+    task_content_types = (
+        BaseTask.objects.order_by()
+        .values_list("polymorphic_ctype_id", flat=True)
+        .distinct()
+    )
+    status_logs = (
+        TimelineLog.objects.filter(
+            content_type_id__in=list(task_content_types), extra_data__has_key="status"
+        )
+        .order_by("object_id", "timestamp")
+        .values_list("object_id", "extra_data", "timestamp")
+    )
+
+    tasks = []
+    task = None
+    for object_id, extra_data, timestamp in status_logs.iterator():
+        if task is None or task.pk != int(object_id):
+            if len(tasks) >= BATCH_SIZE:
+                BaseTask.objects.bulk_update(
+                    tasks, ["status_history", "status_changed_at"]
+                )
+                tasks = []
+            task = BaseTask(pk=int(object_id), status_history=[])
+            tasks.append(task)
+
+        task.status_history.append([extra_data["status"], timestamp.isoformat()])
+        task.status_changed_at = timestamp
+
+    if tasks:
+        BaseTask.objects.bulk_update(tasks, ["status_history", "status_changed_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0011_auto_20200721_0935"),
+        ("timeline_logger", "0004_alter_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="basetask",
+            name="status_changed_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                help_text="When the task got its current status.",
+                verbose_name="status changed at",
+            ),
+        ),
+        migrations.AddField(
+            model_name="basetask",
+            name="status_history",
+            field=django.contrib.postgres.fields.jsonb.JSONField(
+                default=bptl.tasks.models.get_initial_status_history,
+                help_text="The statuses of the task, as [status, timestamp] pairs.",
+                verbose_name="status history",
+            ),
+        ),
+        migrations.RunPython(backfill_status_history, migrations.RunPython.noop),
+    ]
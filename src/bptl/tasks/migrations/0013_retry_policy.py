@@ -0,0 +1,52 @@
+# Generated by Django 2.2.14 on 2020-07-24 08:41
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0012_basetask_status_history"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskmapping",
+            name="max_retries",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Number of times a task of this topic that failed with a transient error is tried again, before an incident is created.",
+                verbose_name="maximum retries",
+            ),
+        ),
+        migrations.AddField(
+            model_name="taskmapping",
+            name="retry_delay",
+            field=models.PositiveIntegerField(
+                default=60,
+                help_text="Number of seconds before the first retry. The delay doubles for every next retry, with some randomness to spread the retries out.",
+                verbose_name="retry delay",
+            ),
+        ),
+        migrations.AddField(
+            model_name="taskmapping",
+            name="retry_max_delay",
+            field=models.PositiveIntegerField(
+                default=3600,
+                help_text="Upper bound of the number of seconds between retries.",
+                verbose_name="maximum retry delay",
+            ),
+        ),
+        migrations.AddField(
+            model_name="taskmapping",
+            name="retryable_exceptions",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=255),
+                blank=True,
+                default=list,
+                help_text="Dotted paths of the exception classes that are retried, next to connection errors, timeouts and HTTP 5xx responses. Any other error is fatal.",
+                size=None,
+            ),
+        ),
+    ]
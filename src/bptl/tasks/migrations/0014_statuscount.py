@@ -0,0 +1,77 @@
+# Generated by Django 2.2.14 on 2020-07-30 13:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# count the existing tasks in the bucket (of 5 minutes) of their current status
+BACKFILL_STATUS_COUNTS = """
+INSERT INTO tasks_statuscount (content_type_id, status, bucket, count)
+SELECT
+    polymorphic_ctype_id,
+    status,
+    to_timestamp(floor(extract(epoch FROM status_changed_at) / 300) * 300),
+    count(*)
+FROM tasks_basetask
+WHERE polymorphic_ctype_id IS NOT NULL
+GROUP BY 1, 2, 3
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("tasks", "0013_retry_policy"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StatusCount",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("initial", "Initial"),
+                            ("in_progress", "In progress"),
+                            ("performed", "Performed"),
+                            ("failed", "Failed"),
+                            ("completed", "Completed"),
+                        ],
+                        max_length=50,
+                        verbose_name="status",
+                    ),
+                ),
+                (
+                    "bucket",
+                    models.DateTimeField(
+                        help_text="Start of the time bucket.", verbose_name="bucket"
+                    ),
+                ),
+                ("count", models.IntegerField(default=0, verbose_name="count")),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.ContentType",
+                        verbose_name="task type",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "status count",
+                "verbose_name_plural": "status counts",
+                "unique_together": {("content_type", "status", "bucket")},
+            },
+        ),
+        migrations.RunSQL(BACKFILL_STATUS_COUNTS, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 2.2.14 on 2020-07-31 08:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("tasks", "0014_statuscount"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="basetask",
+            index=models.Index(fields=["status", "-id"], name="basetask_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="basetask",
+            index=models.Index(fields=["topic_name", "-id"], name="basetask_topic_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="basetask",
+            index=models.Index(
+                fields=["polymorphic_ctype", "-id"], name="basetask_ctype_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="basetask",
+            index=models.Index(
+                condition=models.Q(status__in=["initial", "in_progress"]),
+                fields=["topic_name", "status"],
+                name="basetask_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="basetask",
+            index=models.Index(
+                condition=models.Q(execution_duration__isnull=False),
+                fields=["-id"],
+                name="basetask_performed_idx",
+            ),
+        ),
+    ]
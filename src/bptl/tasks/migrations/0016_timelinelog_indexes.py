@@ -0,0 +1,30 @@
+# Generated by Django 2.2.14 on 2020-07-31 08:41
+
+from django.db import migrations
+
+# The request logs of a task, newest first (see ``BaseTask.request_logs``). The log
+# table is large - the index is built without locking it for writes, which can't
+# happen in a transaction.
+CREATE_REQUEST_LOGS_INDEX = """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS timelinelog_request_logs_idx
+ON timeline_logger_timelinelog (content_type_id, object_id, timestamp DESC)
+WHERE extra_data ? 'request'
+"""
+
+DROP_REQUEST_LOGS_INDEX = """
+DROP INDEX CONCURRENTLY IF EXISTS timelinelog_request_logs_idx
+"""
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("tasks", "0015_basetask_indexes"),
+        ("timeline_logger", "0004_alter_fields"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_REQUEST_LOGS_INDEX, DROP_REQUEST_LOGS_INDEX),
+    ]
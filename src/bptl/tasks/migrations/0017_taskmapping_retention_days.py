@@ -0,0 +1,23 @@
+# Generated by Django 2.2.14 on 2020-08-03 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0016_timelinelog_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskmapping",
+            name="retention_days",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Number of days finished tasks of this topic and their logs are kept. Leave empty to use the default retention.",
+                null=True,
+                verbose_name="retention",
+            ),
+        ),
+    ]
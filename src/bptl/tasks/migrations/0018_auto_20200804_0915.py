@@ -0,0 +1,25 @@
+# Generated by Django 2.2.14 on 2020-08-04 09:15
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0017_taskmapping_retention_days"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="taskmapping",
+            name="retention_days",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Number of days finished tasks of this topic and their logs are kept. Leave empty to use the default retention.",
+                null=True,
+                validators=[django.core.validators.MinValueValidator(1)],
+                verbose_name="retention",
+            ),
+        ),
+    ]
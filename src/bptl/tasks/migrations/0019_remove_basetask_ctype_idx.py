@@ -0,0 +1,14 @@
+# Generated by Django 2.2.14 on 2020-08-05 08:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0018_auto_20200804_0915"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(model_name="basetask", name="basetask_ctype_idx",),
+    ]
@@ -1,10 +1,18 @@
 """
 Database model to map task topics and python code objects to process related tasks
 """
+from datetime import datetime
+from typing import List, NamedTuple
 
 from django.contrib.contenttypes.fields import GenericRelation
-from django.contrib.postgres.fields import JSONField
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.fields import ArrayField, JSONField
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
 from django.db import models
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.module_loading import import_string
 from django.utils.translation import ugettext_lazy as _
 
 from polymorphic.managers import PolymorphicManager
@@ -13,7 +21,16 @@ from timeline_logger.models import TimelineLog
 
 from bptl.utils.constants import Statuses
 
-from .query import BaseTaskQuerySet, TaskQuerySet
+from .query import BaseTaskQuerySet, StatusCountQuerySet, TaskQuerySet
+
+
+class StatusLog(NamedTuple):
+    status: str
+    timestamp: datetime
+
+
+def get_initial_status_history() -> list:
+    return [[Statuses.initial, timezone.now().isoformat()]]
 
 
 class TaskMapping(models.Model):
@@ -35,6 +52,75 @@ class TaskMapping(models.Model):
         ),
     )
     active = models.BooleanField(_("active flag"), default=True)
+    lock_duration = models.PositiveIntegerField(
+        _("lock duration"),
+        null=True,
+        blank=True,
+        help_text=_(
+            "Number of seconds a fetched task stays locked for other workers. Leave "
+            "empty to derive it from the observed execution times."
+        ),
+    )
+    queue = models.CharField(
+        _("queue"),
+        max_length=100,
+        blank=True,
+        help_text=_(
+            "Name of the worker queue to route tasks of this topic to. Leave empty to "
+            "use the default queue."
+        ),
+    )
+    max_concurrency = models.PositiveIntegerField(
+        _("maximum concurrency"),
+        null=True,
+        blank=True,
+        help_text=_(
+            "Maximum number of tasks of this topic that may be executed at the same "
+            "time. Leave empty for no limit."
+        ),
+    )
+    max_retries = models.PositiveIntegerField(
+        _("maximum retries"),
+        default=0,
+        help_text=_(
+            "Number of times a task of this topic that failed with a transient error "
+            "is tried again, before an incident is created."
+        ),
+    )
+    retry_delay = models.PositiveIntegerField(
+        _("retry delay"),
+        default=60,
+        help_text=_(
+            "Number of seconds before the first retry. The delay doubles for every "
+            "next retry, with some randomness to spread the retries out."
+        ),
+    )
+    retry_max_delay = models.PositiveIntegerField(
+        _("maximum retry delay"),
+        default=3600,
+        help_text=_("Upper bound of the number of seconds between retries."),
+    )
+    retryable_exceptions = ArrayField(
+        models.CharField(max_length=255),
+        blank=True,
+        default=list,
+        help_text=_(
+            "Dotted paths of the exception classes that are retried, next to "
+            "connection errors, timeouts and HTTP 5xx responses. Any other error is "
+            "fatal."
+        ),
+    )
+    retention_days = models.PositiveIntegerField(
+        _("retention"),
+        null=True,
+        blank=True,
+        # finished tasks are still counted on the dashboard for a day
+        validators=[MinValueValidator(1)],
+        help_text=_(
+            "Number of days finished tasks of this topic and their logs are kept. "
+            "Leave empty to use the default retention."
+        ),
+    )
     default_services = models.ManyToManyField(
         "zgw_consumers.Service",
         related_name="task_mappings",
@@ -47,6 +133,25 @@ class TaskMapping(models.Model):
         verbose_name = _("task mapping")
         verbose_name_plural = _("task mappings")
 
+    def clean(self):
+        super().clean()
+        for path in self.retryable_exceptions:
+            try:
+                exception_class = import_string(path)
+            except ImportError:
+                exception_class = None
+            if not (
+                isinstance(exception_class, type)
+                and issubclass(exception_class, Exception)
+            ):
+                raise ValidationError(
+                    {
+                        "retryable_exceptions": _(
+                            "'{path}' is not an importable exception class."
+                        ).format(path=path)
+                    }
+                )
+
     def __str__(self):
         return f"{self.topic_name} / {self.callback}"
 
@@ -71,16 +176,52 @@ class BaseTask(PolymorphicModel):
         default=Statuses.initial,
         help_text=_("The current status of task processing"),
     )
+    status_history = JSONField(
+        _("status history"),
+        default=get_initial_status_history,
+        help_text=_("The statuses of the task, as [status, timestamp] pairs."),
+    )
+    status_changed_at = models.DateTimeField(
+        _("status changed at"),
+        default=timezone.now,
+        help_text=_("When the task got its current status."),
+    )
     result_variables = JSONField(default=dict)
     execution_error = models.TextField(
         _("execution error"),
         blank=True,
         help_text=_("The error that occurred during execution."),
     )
+    execution_duration = models.DurationField(
+        _("execution duration"),
+        null=True,
+        blank=True,
+        help_text=_("How long it took to perform the work unit."),
+    )
     logs = GenericRelation(TimelineLog, related_query_name="task")
 
     objects = PolymorphicManager.from_queryset(BaseTaskQuerySet)()
 
+    class Meta:
+        indexes = [
+            # the task list, newest first, filtered on status or topic. Filtering on
+            # the type uses the index of the polymorphic_ctype foreign key.
+            models.Index(fields=["status", "-id"], name="basetask_status_idx"),
+            models.Index(fields=["topic_name", "-id"], name="basetask_topic_idx"),
+            # the tasks being executed, per topic
+            models.Index(
+                fields=["topic_name", "status"],
+                name="basetask_active_idx",
+                condition=models.Q(status__in=[Statuses.initial, Statuses.in_progress]),
+            ),
+            # the recently performed tasks, to estimate execution times
+            models.Index(
+                fields=["-id"],
+                name="basetask_performed_idx",
+                condition=models.Q(execution_duration__isnull=False),
+            ),
+        ]
+
     def get_variables(self) -> dict:
         """
         return input variables formatted for work_unit
@@ -90,8 +231,57 @@ class BaseTask(PolymorphicModel):
     def request_logs(self) -> models.QuerySet:
         return self.logs.filter(extra_data__has_key="request").order_by("-timestamp")
 
-    def status_logs(self) -> models.QuerySet:
-        return self.logs.filter(extra_data__has_key="status").order_by("-timestamp")
+    def status_logs(self) -> List[StatusLog]:
+        return [
+            StatusLog(status=status, timestamp=parse_datetime(timestamp))
+            for status, timestamp in reversed(self.status_history)
+        ]
+
+    @property
+    def child_task(self) -> "BaseTask":
+        """
+        The child task of a non-polymorphic task, with the engine specific fields.
+
+        Use :meth:`BaseTaskQuerySet.select_children` to select the child tasks in the
+        same query.
+        """
+        model = ContentType.objects.get_for_id(self.polymorphic_ctype_id).model_class()
+        if isinstance(self, model):
+            return self
+        # the accessors replaced by polymorphic always query - read the cache of the
+        # parent link instead
+        relation = model._meta.pk.remote_field
+        if relation.is_cached(self):
+            return relation.get_cached_value(self)
+        return model._base_objects.get(pk=self.pk)
+
+    def __str__(self):
+        # the content types are cached, unlike the foreign key
+        content_type = ContentType.objects.get_for_id(self.polymorphic_ctype_id)
+        return f"{content_type}: {self.topic_name} / {self.id}"
+
+
+class StatusCount(models.Model):
+    """
+    The number of tasks of a type that got their current status in a time bucket.
+
+    The counts are maintained when tasks are created and change status, so that the
+    dashboard doesn't need to count the tasks themselves.
+    """
+
+    content_type = models.ForeignKey(
+        ContentType, on_delete=models.CASCADE, verbose_name=_("task type")
+    )
+    status = models.CharField(_("status"), max_length=50, choices=Statuses.choices)
+    bucket = models.DateTimeField(_("bucket"), help_text=_("Start of the time bucket."))
+    count = models.IntegerField(_("count"), default=0)
+
+    objects = StatusCountQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("status count")
+        verbose_name_plural = _("status counts")
+        unique_together = ("content_type", "status", "bucket")
 
     def __str__(self):
-        return f"{self.polymorphic_ctype}: {self.topic_name} / {self.id}"
+        return f"{self.content_type} / {self.status} / {self.bucket}: {self.count}"
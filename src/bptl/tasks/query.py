@@ -1,8 +1,76 @@
+import json
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+from django.contrib.contenttypes.models import ContentType
 from django.contrib.postgres.aggregates import ArrayAgg
-from django.db import models
+from django.contrib.postgres.fields import JSONField
+from django.db import connections, models, transaction
+from django.utils import timezone
 
 from polymorphic.query import PolymorphicQuerySet
 
+from bptl.utils.constants import Statuses
+
+
+class PercentileCont(models.Aggregate):
+    """
+    PostgreSQL continuous percentile of the (ordered) expression values.
+    """
+
+    function = "PERCENTILE_CONT"
+    name = "PercentileCont"
+    template = "%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+
+    def __init__(self, expression, percentile: float, **extra):
+        super().__init__(expression, percentile=float(percentile), **extra)
+
+
+class JSONBAppend(models.Func):
+    """
+    PostgreSQL concatenation of a JSONB array with the JSON encoded ``items``.
+    """
+
+    template = "%(expressions)s || %%s::jsonb"
+    output_field = JSONField()
+
+    def __init__(self, expression, items: list, **extra):
+        super().__init__(expression, **extra)
+        self.items = items
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = super().as_sql(compiler, connection, **extra_context)
+        return sql, (*params, json.dumps(self.items))
+
+
+def explain(queryset: models.QuerySet) -> dict:
+    """
+    Retrieve the plan PostgreSQL makes for a queryset, without executing it.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        (plan,) = cursor.fetchone()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+# width of the time buckets of the status counts, in seconds
+STATUS_COUNT_BUCKET_SIZE = 5 * 60
+
+# (status, when the task got the status, +1 or -1)
+StatusChange = Tuple[str, datetime, int]
+
+
+def get_bucket(timestamp: datetime) -> datetime:
+    """
+    Determine the start of the status count bucket ``timestamp`` falls in.
+    """
+    seconds = int(timestamp.timestamp()) // STATUS_COUNT_BUCKET_SIZE
+    return datetime.fromtimestamp(seconds * STATUS_COUNT_BUCKET_SIZE, tz=timezone.utc)
+
 
 class TaskQuerySet(models.QuerySet):
     def annotate_topics(self) -> "TaskQuerySet":
@@ -23,3 +91,202 @@ class BaseTaskQuerySet(PolymorphicQuerySet):
             .order_by("status")
         )
         return qs
+
+    def select_children(self) -> "BaseTaskQuerySet":
+        """
+        Select the child tasks in the same query, rather than one query per type.
+
+        The tasks are not polymorphic. Their child task, with the engine specific
+        fields, is available as ``task.child_task`` without further queries.
+        """
+        children = [
+            rel.name for rel in self.model._meta.related_objects if rel.parent_link
+        ]
+        return self.non_polymorphic().select_related(*children)
+
+    def claim(self, task: models.Model, status: str = Statuses.in_progress) -> bool:
+        """
+        Atomically move an initial task to ``status``, so that it's executed only once.
+
+        The status is checked and changed in a single conditional ``UPDATE``, without
+        locking the row. Of concurrent claims of the same task, only one succeeds.
+
+        Returns whether the task was claimed. If so, the instance is updated as well.
+        """
+        now = timezone.now()
+        entry = [status, now.isoformat()]
+
+        # update the parent table directly, rather than through the child model
+        status_model = self.model._meta.get_field("status").model
+        claimed = (
+            status_model._base_manager.using(self.db)
+            .filter(pk=task.pk, status=Statuses.initial)
+            .update(
+                status=status,
+                status_changed_at=now,
+                status_history=JSONBAppend("status_history", [entry]),
+            )
+        )
+        if not claimed:
+            return False
+
+        changes = [(task.status, task.status_changed_at, -1), (status, now, 1)]
+        task.status = status
+        task.status_history = task.status_history + [entry]
+        task.status_changed_at = now
+
+        from .models import StatusCount
+
+        StatusCount.objects.db_manager(self.db).add_changes(
+            task.polymorphic_ctype_id, changes
+        )
+        return True
+
+    def _recently_performed(self, sample_size: int) -> "BaseTaskQuerySet":
+        recent = (
+            self.filter(execution_duration__isnull=False)
+            .order_by("-pk")
+            .values("pk")[:sample_size]
+        )
+        return self.filter(pk__in=recent).order_by().values("topic_name")
+
+    def average_execution_times(self, sample_size: int = 1000) -> Dict[str, float]:
+        """
+        Determine the average execution time (in seconds) per topic.
+
+        Only the ``sample_size`` most recently performed tasks are considered.
+        """
+        qs = self._recently_performed(sample_size).annotate(
+            average=models.Avg("execution_duration")
+        )
+        return {row["topic_name"]: row["average"].total_seconds() for row in qs}
+
+    def execution_time_percentiles(
+        self, percentile: float, sample_size: int = 1000, min_samples: int = 1
+    ) -> Dict[str, float]:
+        """
+        Determine a percentile of the execution times (in seconds) per topic.
+
+        Only the ``sample_size`` most recently performed tasks are considered. Topics
+        with less than ``min_samples`` samples are left out.
+        """
+        qs = (
+            self._recently_performed(sample_size)
+            .annotate(
+                value=PercentileCont(
+                    "execution_duration",
+                    percentile,
+                    output_field=models.DurationField(),
+                ),
+                samples=models.Count("pk"),
+            )
+            .filter(samples__gte=min_samples)
+        )
+        return {row["topic_name"]: row["value"].total_seconds() for row in qs}
+
+    def bulk_create_tasks(self, tasks: List[models.Model]) -> List[models.Model]:
+        """
+        Insert a batch of (polymorphic child) task instances in a few statements.
+
+        Django's ``bulk_create`` does not support multi-table inherited models. Instead,
+        the parent rows are bulk inserted first, which returns their primary keys on
+        PostgreSQL. The child rows are then inserted in a single statement. Everything
+        happens in one transaction.
+
+        Returns the saved tasks, with their primary keys set.
+        """
+        model = self.model
+        parent_link = model._meta.pk
+        if not parent_link.remote_field:
+            raise TypeError(f"{model} is not a multi-table inherited model.")
+
+        if not tasks:
+            return tasks
+
+        parent_model = parent_link.remote_field.model
+        parent_fields = [
+            field
+            for field in parent_model._meta.concrete_fields
+            if not field.primary_key
+        ]
+        ctype = ContentType.objects.db_manager(self.db).get_for_model(
+            model, for_concrete_model=False
+        )
+
+        with transaction.atomic(using=self.db):
+            parents = []
+            for task in tasks:
+                task.polymorphic_ctype = ctype
+                parents.append(
+                    parent_model(
+                        **{
+                            field.attname: getattr(task, field.attname)
+                            for field in parent_fields
+                        }
+                    )
+                )
+            parent_model._base_manager.using(self.db).bulk_create(parents)
+
+            for task, parent in zip(tasks, parents):
+                setattr(task, parent_model._meta.pk.attname, parent.pk)
+                setattr(task, parent_link.attname, parent.pk)
+
+            model._base_manager._insert(
+                tasks, fields=model._meta.local_concrete_fields, using=self.db
+            )
+
+        for task in tasks:
+            task._state.adding = False
+            task._state.db = self.db
+
+        from .models import StatusCount
+
+        StatusCount.objects.db_manager(self.db).add_changes(
+            ctype.pk, [(task.status, task.status_changed_at, 1) for task in tasks]
+        )
+
+        return tasks
+
+
+class StatusCountQuerySet(models.QuerySet):
+    def add_changes(self, content_type_id: int, changes: Iterable[StatusChange]):
+        """
+        Apply status changes of tasks of a type to the counts of their time buckets.
+
+        The counts are incremented in a single upsert, so concurrent changes of the
+        same bucket don't get lost.
+        """
+        deltas = Counter()
+        for status, timestamp, delta in changes:
+            deltas[(status, get_bucket(timestamp))] += delta
+
+        rows = [(key, delta) for key, delta in deltas.items() if delta]
+        if not rows:
+            return
+
+        table = self.model._meta.db_table
+        values = ", ".join(["(%s, %s, %s, %s)"] * len(rows))
+        params = [
+            param
+            for (status, bucket), delta in rows
+            for param in (content_type_id, status, bucket, delta)
+        ]
+        sql = (
+            f"INSERT INTO {table} (content_type_id, status, bucket, count) "
+            f"VALUES {values} "
+            f"ON CONFLICT (content_type_id, status, bucket) "
+            f"DO UPDATE SET count = {table}.count + EXCLUDED.count"
+        )
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(sql, params)
+
+    def totals(self, since: datetime) -> "StatusCountQuerySet":
+        """
+        Sum the counts per task type and status, of the buckets since ``since``.
+        """
+        return (
+            self.filter(bucket__gte=get_bucket(since))
+            .order_by()
+            .values("content_type_id", "status")
+            .annotate(tasks=models.Sum("count"))
+        )
@@ -4,15 +4,19 @@ Manage a registry of tasks that can be used as callbacks.
 A Task is a callable which takes an external task instance as sole argument and
 performs a unit of work.
 """
+import hashlib
 import inspect
 from dataclasses import dataclass
 
+from django.core.cache import cache
 from django.utils.functional import cached_property
 from django.utils.module_loading import autodiscover_modules
 from django.utils.safestring import mark_safe
 
 from .utils import render_docstring
 
+DOCUMENTATION_CACHE_KEY = "tasks:documentation:{digest}"
+
 
 @dataclass
 class Task:
@@ -26,8 +30,19 @@ class Task:
     def html_documentation(self) -> str:
         """
         Return the docstring rendered as HTML by Sphinx.
+
+        Rendering is slow - the HTML is kept in the shared cache, by the hash of the
+        docstring. The ``render_task_documentation`` management command renders it
+        ahead of time, which only reaches the web processes if the default cache is
+        shared (Redis, not a per-process LocMem cache).
         """
-        return render_docstring(self.documentation)
+        digest = hashlib.sha256(self.documentation.encode("utf-8")).hexdigest()
+        key = DOCUMENTATION_CACHE_KEY.format(digest=digest)
+        html = cache.get(key)
+        if html is None:
+            html = render_docstring(self.documentation)
+            cache.set(key, html, None)
+        return html
 
 
 class WorkUnitRegistry:
@@ -0,0 +1,158 @@
+"""
+Log the outgoing API requests of work units for the task they're performed for.
+
+The task is kept in a context variable, so it's local to the thread (or greenlet)
+executing it - work units can be executed concurrently within a single process.
+Threads started by a work unit do not inherit the context; wrap the callables passed to
+them with :func:`bind_task`.
+
+Within a task context, the log entries are buffered and written at once when the
+context exits. Before they're stored, the values of sensitive headers are redacted and
+large bodies are truncated. The requests to a service can be sampled, failed requests
+are always logged. See the ``REQUEST_LOG_*`` settings.
+"""
+import json
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, List, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from timeline_logger.models import TimelineLog
+
+from .models import BaseTask
+
+__all__ = ["get_current_task", "task_context", "bind_task", "log_request"]
+
+REDACTED = "[redacted]"
+
+
+class RequestLog:
+    """
+    Buffer of the request log entries of a task.
+    """
+
+    def __init__(self, task: Optional[BaseTask]):
+        self.task = task
+        self.entries: List[TimelineLog] = []
+
+    def add(self, extra_data: dict) -> None:
+        self.entries.append(
+            TimelineLog(content_object=self.task, extra_data=extra_data)
+        )
+
+    def flush(self) -> None:
+        entries, self.entries = self.entries, []
+        if entries:
+            TimelineLog.objects.bulk_create(entries)
+
+
+_current_log: ContextVar[Optional[RequestLog]] = ContextVar("request_log", default=None)
+
+
+@contextmanager
+def _use_log(request_log: Optional[RequestLog]):
+    token = _current_log.set(request_log)
+    try:
+        yield request_log
+    finally:
+        _current_log.reset(token)
+
+
+def get_current_task() -> Optional[BaseTask]:
+    """
+    Retrieve the task being performed in the current context, if any.
+    """
+    request_log = _current_log.get()
+    return request_log.task if request_log is not None else None
+
+
+@contextmanager
+def task_context(task: BaseTask):
+    """
+    Log the requests made within the block for ``task``.
+
+    The log entries are written when the block exits, also if it raises.
+    """
+    request_log = RequestLog(task)
+    with _use_log(request_log):
+        try:
+            yield task
+        finally:
+            request_log.flush()
+
+
+def bind_task(func: Callable) -> Callable:
+    """
+    Bind ``func`` to the task of the current context, to run it in another thread.
+
+    The thread must finish before the task context exits.
+    """
+    request_log = _current_log.get()
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with _use_log(request_log):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def _is_sampled(extra_data: dict) -> bool:
+    if extra_data["response"]["status"] >= 400:
+        return True
+    rate = settings.REQUEST_LOG_SAMPLE_RATES.get(extra_data["service_base_url"], 1)
+    return rate >= 1 or random.random() < rate
+
+
+def _redact_headers(headers: Optional[dict]) -> Optional[dict]:
+    if not headers:
+        return headers
+    redacted = {name.lower() for name in settings.REQUEST_LOG_REDACTED_HEADERS}
+    return {
+        name: REDACTED if name.lower() in redacted else value
+        for name, value in headers.items()
+    }
+
+
+def _truncate_body(data: Any) -> Any:
+    max_size = settings.REQUEST_LOG_MAX_BODY_SIZE
+    if data is None or max_size is None:
+        return data
+    serialized = json.dumps(data, cls=DjangoJSONEncoder, default=str)
+    if len(serialized) <= max_size:
+        return data
+    return serialized[:max_size]
+
+
+def _clean(message: dict) -> dict:
+    return {
+        **message,
+        "headers": _redact_headers(message["headers"]),
+        "data": _truncate_body(message["data"]),
+    }
+
+
+def log_request(extra_data: dict, task: Optional[BaseTask] = None) -> None:
+    """
+    Log an outgoing API request, for ``task`` or the task of the current context.
+
+    :param extra_data: the ``service_base_url``, ``request`` and ``response`` details.
+    """
+    if not _is_sampled(extra_data):
+        return
+
+    extra_data = {
+        **extra_data,
+        "request": _clean(extra_data["request"]),
+        "response": _clean(extra_data["response"]),
+    }
+
+    request_log = _current_log.get()
+    if request_log is not None and task in (None, request_log.task):
+        request_log.add(extra_data)
+    else:
+        TimelineLog.objects.create(content_object=task, extra_data=extra_data)
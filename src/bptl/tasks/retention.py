@@ -0,0 +1,152 @@
+"""
+Remove finished tasks and their logs once they're past their retention.
+
+Tasks are kept for the number of days configured on the task mapping of their topic,
+or ``settings.TASK_RETENTION_DAYS``. Only finished (performed, completed or failed)
+tasks are removed, counting from their last status change. The tasks are removed in
+batches of ``settings.TASK_RETENTION_BATCH_SIZE``, each in its own transaction, so
+that the tables are never locked for long.
+
+With ``settings.TASK_ARCHIVE_DIR`` set, every batch is written to a gzipped JSON lines
+file before it's removed - one line per task, with its request logs.
+"""
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from timeline_logger.models import TimelineLog
+
+from bptl.utils.constants import Statuses
+
+from .models import BaseTask, StatusCount, TaskMapping
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["get_expired_tasks", "apply_retention"]
+
+FINISHED_STATUSES = [Statuses.performed, Statuses.completed, Statuses.failed]
+
+# the dashboard only shows the counts of the last 24 hours
+STATUS_COUNT_RETENTION = timedelta(days=7)
+
+
+def get_expired_tasks(now: Optional[datetime] = None):
+    """
+    Select the finished tasks past the retention of their topic.
+    """
+    now = now or timezone.now()
+    retentions = dict(
+        TaskMapping.objects.filter(retention_days__gte=1).values_list(
+            "topic_name", "retention_days"
+        )
+    )
+
+    expired = Q()
+    for topic_name, days in retentions.items():
+        expired |= Q(
+            topic_name=topic_name, status_changed_at__lt=now - timedelta(days=days)
+        )
+    if settings.TASK_RETENTION_DAYS is not None:
+        cutoff = now - timedelta(days=settings.TASK_RETENTION_DAYS)
+        expired |= Q(status_changed_at__lt=cutoff) & ~Q(topic_name__in=list(retentions))
+
+    queryset = BaseTask.objects.non_polymorphic()
+    if not expired:
+        return queryset.none()
+    return queryset.filter(expired, status__in=FINISHED_STATUSES)
+
+
+def _get_logs(tasks: List[BaseTask]):
+    content_types = ContentType.objects.get_for_models(*{type(task) for task in tasks})
+    return TimelineLog.objects.filter(
+        content_type__in=set(content_types.values()),
+        object_id__in=[str(task.pk) for task in tasks],
+    )
+
+
+def archive(tasks: List[BaseTask], directory: str) -> str:
+    """
+    Write the tasks and their logs to a gzipped JSON lines file in ``directory``.
+    """
+    logs = {}
+    for log in _get_logs(tasks).order_by("timestamp").values():
+        logs.setdefault(log["object_id"], []).append(log)
+
+    now = timezone.now()
+    day_directory = os.path.join(directory, now.strftime("%Y-%m-%d"))
+    os.makedirs(day_directory, exist_ok=True)
+    filename = os.path.join(
+        day_directory, f"tasks-{now.strftime('%H%M%S')}-{tasks[0].pk}.jsonl.gz"
+    )
+
+    with gzip.open(filename, "wt", encoding="utf-8") as archive_file:
+        for task in tasks:
+            line = {
+                "model": task._meta.label_lower,
+                "fields": {
+                    field.attname: field.value_from_object(task)
+                    for field in task._meta.concrete_fields
+                },
+                "logs": logs.get(str(task.pk), []),
+            }
+            archive_file.write(json.dumps(line, cls=DjangoJSONEncoder) + "\n")
+
+    return filename
+
+
+def remove(pks: List[int]) -> int:
+    """
+    Remove a batch of tasks and their logs, archiving them first if configured.
+    """
+    with transaction.atomic():
+        # the real instances, to archive and find the logs of the child tasks
+        tasks = list(BaseTask.objects.filter(pk__in=pks).order_by("pk"))
+        if not tasks:
+            return 0
+
+        if settings.TASK_ARCHIVE_DIR:
+            filename = archive(tasks, settings.TASK_ARCHIVE_DIR)
+            logger.info("Archived %d tasks to %s", len(tasks), filename)
+
+        _get_logs(tasks).delete()
+        BaseTask.objects.non_polymorphic().filter(pk__in=pks).delete()
+
+    return len(tasks)
+
+
+def apply_retention(
+    batch_size: Optional[int] = None, max_batches: Optional[int] = None
+) -> int:
+    """
+    Remove the expired tasks, in at most ``max_batches`` batches of ``batch_size``.
+
+    Returns the number of removed tasks.
+    """
+    batch_size = batch_size or settings.TASK_RETENTION_BATCH_SIZE
+    max_batches = max_batches or settings.TASK_RETENTION_MAX_BATCHES
+
+    expired = get_expired_tasks().order_by("pk").values_list("pk", flat=True)
+
+    removed = 0
+    for _ in range(max_batches):
+        pks = list(expired[:batch_size])
+        if not pks:
+            break
+        removed += remove(pks)
+
+    StatusCount.objects.filter(
+        bucket__lt=timezone.now() - STATUS_COUNT_RETENTION
+    ).delete()
+
+    logger.info("Removed %d expired tasks", removed)
+    return removed
@@ -0,0 +1,66 @@
+"""
+Classify the errors of failed tasks, and derive the retry policy of a topic.
+
+Connection errors, timeouts and HTTP 5xx responses are transient - the task may
+succeed when it's tried again. A task mapping can mark more exceptions as retryable.
+Any other error is fatal.
+"""
+import logging
+from typing import Iterable, Tuple
+
+from django.utils.module_loading import import_string
+
+import requests
+
+from bptl.utils.decorators import RetryPolicy
+
+from .models import TaskMapping
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT_EXCEPTIONS = (requests.ConnectionError, requests.Timeout)
+
+
+def is_transient(exc: Exception) -> bool:
+    if isinstance(exc, TRANSIENT_EXCEPTIONS):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code >= 500
+    return False
+
+
+def resolve_exceptions(paths: Iterable[str]) -> Tuple[type, ...]:
+    """
+    Import the exception classes by their dotted path.
+
+    Paths that can't be imported, or don't point to an exception class, are left out -
+    those exceptions are not retryable. This runs while a failure is handled, and must
+    not fail itself.
+    """
+    exceptions = []
+    for path in paths:
+        try:
+            exception_class = import_string(path)
+        except ImportError:
+            logger.warning("Could not import retryable exception %r", path)
+            continue
+        if not (
+            isinstance(exception_class, type) and issubclass(exception_class, Exception)
+        ):
+            logger.warning("Retryable exception %r is not an exception class", path)
+            continue
+        exceptions.append(exception_class)
+    return tuple(exceptions)
+
+
+def get_retry_policy(mapping: TaskMapping) -> RetryPolicy:
+    """
+    Build the retry policy configured for the tasks of a topic.
+    """
+    retryable = resolve_exceptions(mapping.retryable_exceptions)
+    return RetryPolicy(
+        times=mapping.max_retries,
+        condition=lambda exc: is_transient(exc) or isinstance(exc, retryable),
+        delay=mapping.retry_delay,
+        max_delay=mapping.retry_max_delay,
+    )
@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from zgw_consumers.models import Service
+
+from bptl.work_units.zgw.models import DefaultService
+
+from . import mapping_cache
+from .models import BaseTask, StatusCount, TaskMapping
+
+
+@receiver([post_save, post_delete], sender=TaskMapping)
+@receiver([post_save, post_delete], sender=DefaultService)
+@receiver([post_save, post_delete], sender=Service)
+def invalidate_task_mapping_cache(sender, **kwargs):
+    # Invalidate right away, so that the changes are seen in this transaction, and
+    # again on commit - other processes may have reloaded the old rows in between, and
+    # would keep them cached under the new version.
+    mapping_cache.invalidate()
+    transaction.on_commit(mapping_cache.invalidate)
+
+
+@receiver(post_save)
+def count_created_task(sender, instance, created, raw=False, **kwargs):
+    if not created or raw or not isinstance(instance, BaseTask):
+        return
+    StatusCount.objects.add_changes(
+        instance.polymorphic_ctype_id,
+        [(instance.status, instance.status_changed_at, 1)],
+    )
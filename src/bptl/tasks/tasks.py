@@ -0,0 +1,10 @@
+""" celery tasks to maintain the task tables """
+from ..celery import app
+from .retention import apply_retention
+
+__all__ = ("task_apply_retention",)
+
+
+@app.task()
+def task_apply_retention():
+    return apply_retention()
@@ -1,6 +1,9 @@
 import factory
 import factory.fuzzy
 
+from bptl.activiti.tests.factories import ServiceTaskFactory
+from bptl.camunda.tests.factories import ExternalTaskFactory
+
 
 class TaskMappingFactory(factory.django.DjangoModelFactory):
     topic_name = factory.fuzzy.FuzzyChoice(["initalize-zaak", "set-zaak-status"])
@@ -8,3 +11,16 @@ class TaskMappingFactory(factory.django.DjangoModelFactory):
 
     class Meta:
         model = "tasks.TaskMapping"
+
+
+def create_mixed_tasks(count: int, chunk_size: int = 50) -> list:
+    """
+    Create ``count`` tasks, alternating chunks of Camunda and Activiti tasks.
+    """
+    factories = [ExternalTaskFactory, ServiceTaskFactory]
+    tasks = []
+    for index, start in enumerate(range(0, count, chunk_size)):
+        task_factory = factories[index % len(factories)]
+        batch = task_factory.build_batch(min(chunk_size, count - start))
+        tasks += task_factory._meta.model.objects.bulk_create_tasks(batch)
+    return tasks
@@ -0,0 +1,41 @@
+from django.test import TestCase
+
+from bptl.camunda.models import ExternalTask
+from bptl.camunda.tests.factories import ExternalTaskFactory
+from bptl.utils.constants import Statuses
+
+
+class ClaimTests(TestCase):
+    def test_claim(self):
+        task = ExternalTaskFactory.create()
+
+        # the claim and the status count
+        with self.assertNumQueries(2):
+            claimed = ExternalTask.objects.claim(task)
+
+        self.assertTrue(claimed)
+        self.assertEqual(task.status, Statuses.in_progress)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Statuses.in_progress)
+        self.assertEqual(
+            [status for status, timestamp in task.status_history],
+            [Statuses.initial, Statuses.in_progress],
+        )
+
+    def test_claim_once(self):
+        task = ExternalTaskFactory.create()
+        # the same task, delivered twice
+        task1 = ExternalTask.objects.get(pk=task.pk)
+        task2 = ExternalTask.objects.get(pk=task.pk)
+
+        self.assertTrue(ExternalTask.objects.claim(task1))
+        self.assertFalse(ExternalTask.objects.claim(task2))
+
+        self.assertEqual(task2.status, Statuses.initial)
+        task.refresh_from_db()
+        self.assertEqual(len(task.status_history), 2)
+
+    def test_claim_not_initial(self):
+        task = ExternalTaskFactory.create(status=Statuses.failed)
+
+        self.assertFalse(ExternalTask.objects.claim(task))
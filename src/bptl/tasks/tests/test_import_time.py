@@ -0,0 +1,88 @@
+"""
+Guard the cold start of the processes executing tasks.
+
+The modules are imported in a fresh interpreter with ``-X importtime``, which reports
+every imported module and the time it took, or timed as a whole against a budget.
+"""
+import os
+import subprocess
+import sys
+from typing import Dict
+
+from django.test import SimpleTestCase
+
+# the modules a worker loads to execute tasks
+EXECUTION_PATH = """
+import django
+
+django.setup()
+
+import bptl.camunda.tasks
+import bptl.tasks.api
+from bptl.tasks.registry import register
+
+register.autodiscover()
+"""
+
+# slow to import, only needed to render documentation
+FORBIDDEN_PACKAGES = {"sphinx", "docutils"}
+
+# generous, to only catch regressions like importing Sphinx again
+REGISTRY_IMPORT_BUDGET = 1.0  # seconds
+
+
+def run_python(code: str, *options: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+
+def get_import_times(code: str) -> Dict[str, int]:
+    """
+    Import the modules in ``code`` and report their cumulative import time (in µs).
+    """
+    result = run_python(code, "-X", "importtime")
+
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _self, cumulative, name = line[len("import time:") :].split("|")
+        if not cumulative.strip().isdigit():  # the header
+            continue
+        import_times[name.strip()] = int(cumulative)
+    return import_times
+
+
+class ImportTimeTests(SimpleTestCase):
+    def test_no_documentation_dependencies(self):
+        import_times = get_import_times(EXECUTION_PATH)
+
+        forbidden = {
+            name: time
+            for name, time in import_times.items()
+            if name.split(".")[0] in FORBIDDEN_PACKAGES
+        }
+        slowest = sorted(import_times.items(), key=lambda item: -item[1])[:10]
+        self.assertEqual(
+            forbidden, {}, f"Slowest imports (cumulative µs): {slowest}",
+        )
+
+    def test_registry_import_budget(self):
+        code = (
+            "import time\n"
+            "start = time.perf_counter()\n"
+            "import bptl.tasks.registry\n"
+            "print(time.perf_counter() - start)\n"
+        )
+
+        # the best of a few runs, to even out a busy machine
+        duration = min(float(run_python(code).stdout) for _ in range(3))
+
+        self.assertLess(duration, REGISTRY_IMPORT_BUDGET)
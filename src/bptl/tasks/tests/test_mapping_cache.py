@@ -0,0 +1,90 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from zgw_consumers.constants import APITypes
+
+from bptl.work_units.zgw.tests.factories import DefaultServiceFactory
+
+from .. import mapping_cache
+from .factories import TaskMappingFactory
+
+
+class TaskMappingCacheTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        mapping_cache.clear()
+
+    def test_cached_lookups(self):
+        mapping = TaskMappingFactory.create(topic_name="some-topic")
+        default_service = DefaultServiceFactory.create(
+            task_mapping=mapping, service__api_type=APITypes.zrc, alias="ZRC"
+        )
+        # warm up
+        mapping_cache.get_task_mapping("some-topic")
+
+        with self.assertNumQueries(0):
+            cached_mapping = mapping_cache.get_task_mapping("some-topic")
+            default_services = mapping_cache.get_default_services("some-topic")
+            service = default_services[0].service
+
+        self.assertEqual(cached_mapping, mapping)
+        self.assertEqual(default_services, [default_service])
+        self.assertEqual(service.api_type, APITypes.zrc)
+        self.assertIsNone(mapping_cache.get_task_mapping("other-topic"))
+        self.assertEqual(mapping_cache.get_default_services("other-topic"), [])
+
+    def test_invalidated_on_save_and_delete(self):
+        mapping = TaskMappingFactory.create(topic_name="some-topic")
+        self.assertEqual(
+            mapping_cache.get_task_mapping("some-topic").callback, mapping.callback
+        )
+
+        mapping.callback = "bptl.some.other.callback"
+        mapping.save()
+
+        self.assertEqual(
+            mapping_cache.get_task_mapping("some-topic").callback,
+            "bptl.some.other.callback",
+        )
+
+        default_service = DefaultServiceFactory.create(task_mapping=mapping)
+        self.assertEqual(
+            mapping_cache.get_default_services("some-topic"), [default_service]
+        )
+
+        default_service.delete()
+        self.assertEqual(mapping_cache.get_default_services("some-topic"), [])
+
+        mapping.delete()
+        self.assertIsNone(mapping_cache.get_task_mapping("some-topic"))
+
+    @patch("bptl.tasks.signals.transaction.on_commit")
+    def test_invalidated_again_on_commit(self, m_on_commit):
+        mapping = TaskMappingFactory.create(topic_name="some-topic")
+        m_on_commit.reset_mock()
+
+        mapping.save()
+
+        m_on_commit.assert_called_once_with(mapping_cache.invalidate)
+
+    def test_invalidated_in_other_processes(self):
+        # the in-memory cache of another process, sharing only the Django cache
+        other_process = mapping_cache.TaskMappingCache()
+        mapping = TaskMappingFactory.create(topic_name="some-topic")
+        other_process.get_task_mapping("some-topic")
+
+        with self.assertNumQueries(0):
+            other_process.get_task_mapping("some-topic")
+
+        mapping.callback = "bptl.some.other.callback"
+        mapping.save()
+
+        self.assertNotEqual(
+            cache.get(mapping_cache.VERSION_CACHE_KEY), other_process._version
+        )
+        self.assertEqual(
+            other_process.get_task_mapping("some-topic").callback,
+            "bptl.some.other.callback",
+        )
@@ -3,6 +3,7 @@ from django.utils import timezone
 
 from bptl.camunda.tests.factories import ExternalTaskFactory
 
+from .. import mapping_cache
 from ..api import NoCallback, TaskExpired, execute
 from ..registry import WorkUnitRegistry
 from .factories import TaskMappingFactory
@@ -22,6 +23,10 @@ def task_2(task):
 
 @tag("public-api")
 class RouteTaskTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        mapping_cache.clear()
+
     def test_route_to_correct_task(self):
         # set up the routing decisions
         TaskMappingFactory.create(
@@ -0,0 +1,116 @@
+"""
+Guard that the hot task queries stay backed by indexes.
+
+The test database is tiny, so PostgreSQL would happily scan whole tables. With
+sequential scans disabled, the planner only falls back to them if no index fits the
+query - which is what happens with tens of millions of rows as well.
+"""
+from datetime import timedelta
+from typing import Iterator, List, Tuple
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase
+from django.utils import timezone
+
+from bptl.camunda.models import ExternalTask
+from bptl.camunda.tests.factories import ExternalTaskFactory
+from bptl.dashboard.filters import TaskFilter
+from bptl.dashboard.views import TaskListView
+from bptl.utils.constants import Statuses
+
+from ..constants import ENGINETYPE_MODEL_MAPPING
+from ..models import StatusCount
+from ..query import explain
+
+# (node type, table, index)
+Scan = Tuple[str, str, str]
+
+
+def _walk(node: dict) -> Iterator[Scan]:
+    if "Relation Name" in node or "Index Name" in node:
+        yield (
+            node["Node Type"],
+            node.get("Relation Name", ""),
+            node.get("Index Name", ""),
+        )
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def get_scans(queryset: QuerySet) -> List[Scan]:
+    return list(_walk(explain(queryset)))
+
+
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.task = ExternalTaskFactory.create()
+
+    def setUp(self):
+        super().setUp()
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertIndexBacked(self, queryset: QuerySet, index: str = ""):
+        """
+        Assert that no table is scanned sequentially, and that ``index`` (part of the
+        index name) is used.
+        """
+        scans = get_scans(queryset)
+        sequential = [scan for scan in scans if scan[0] == "Seq Scan"]
+        self.assertEqual(sequential, [], f"Plan: {scans}")
+        if index:
+            indexes = [scan[2] for scan in scans if index in scan[2]]
+            self.assertTrue(indexes, f"Plan: {scans}")
+
+    def test_task_list(self):
+        queryset = TaskListView.queryset
+
+        self.assertIndexBacked(queryset[:20])
+
+    def test_task_list_filtered(self):
+        filters = [
+            ({"status": [Statuses.failed]}, "basetask_status_idx"),
+            ({"topic_name": "initialize-zaak"}, "basetask_topic_idx"),
+            # the planner picks between the foreign key index and a sort
+            ({"engine_type": ["camunda"]}, ""),
+            ({"engine_type": ["camunda"], "status": [Statuses.failed]}, ""),
+        ]
+        for data, index in filters:
+            with self.subTest(data=data):
+                queryset = TaskFilter(data, queryset=TaskListView.queryset).qs
+
+                self.assertIndexBacked(queryset[:20], index)
+
+    def test_task_detail(self):
+        self.assertIndexBacked(ExternalTask.objects.filter(pk=self.task.pk))
+        self.assertIndexBacked(
+            self.task.request_logs()[:20], "timelinelog_request_logs_idx"
+        )
+
+    def test_fetched_task_lookup(self):
+        queryset = ExternalTask.objects.filter(task_id=self.task.task_id)
+
+        self.assertIndexBacked(queryset, "camunda_externaltask_task_id")
+
+    def test_running_tasks(self):
+        queryset = ExternalTask.objects.filter(
+            topic_name="initialize-zaak",
+            status=Statuses.in_progress,
+            lock_expires_at__gt=timezone.now(),
+        )
+
+        self.assertIndexBacked(queryset)
+
+    def test_aggregate(self):
+        content_types = ContentType.objects.get_for_models(
+            *ENGINETYPE_MODEL_MAPPING.values()
+        )
+        queryset = StatusCount.objects.filter(
+            content_type__in=content_types.values()
+        ).totals(timezone.now() - timedelta(hours=24))
+
+        self.assertIndexBacked(queryset)
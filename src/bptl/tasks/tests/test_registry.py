@@ -1,11 +1,14 @@
 """
 Test the expected implementation of the registry.
 """
+from unittest.mock import patch
+
+from django.core.cache import cache
 from django.test import SimpleTestCase
 
 from bptl.camunda.models import ExternalTask
 
-from ..registry import WorkUnitRegistry
+from ..registry import Task, WorkUnitRegistry
 
 # isolated registry for tests
 register = WorkUnitRegistry()
@@ -126,3 +129,34 @@ class TaskRegistryTests(SimpleTestCase):
         self.assertEqual(task.name, "sample_task")
         self.assertEqual(task.documentation, "Sample docstring.")
         self.assertEqual(task.dotted_path, dotted_path)
+
+
+class TaskDocumentationTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def _get_task(self, documentation: str) -> Task:
+        return Task(
+            dotted_path="bptl.dummy.tasks.dummy",
+            name="dummy",
+            documentation=documentation,
+            callback=lambda task: None,
+        )
+
+    @patch("bptl.tasks.registry.render_docstring", return_value="<p>Docs.</p>")
+    def test_rendered_once(self, m_render):
+        # a fresh process has fresh task instances
+        for _ in range(2):
+            html = self._get_task("Docs.").html_documentation
+            self.assertEqual(html, "<p>Docs.</p>")
+
+        m_render.assert_called_once_with("Docs.")
+
+    @patch("bptl.tasks.registry.render_docstring", return_value="<p>Docs.</p>")
+    def test_rendered_per_docstring(self, m_render):
+        self._get_task("Docs.").html_documentation
+        self._get_task("Other docs.").html_documentation
+
+        self.assertEqual(m_render.call_count, 2)
@@ -0,0 +1,177 @@
+import threading
+from concurrent import futures
+
+from django.test import TestCase, override_settings
+
+from bptl.camunda.tests.factories import ExternalTaskFactory
+from bptl.work_units.zgw.log import DBLog
+
+from ..request_log import (
+    REDACTED,
+    bind_task,
+    get_current_task,
+    log_request,
+    task_context,
+)
+
+
+def get_extra_data(status=200, **request):
+    return {
+        "service_base_url": "https://some.zrc.nl",
+        "request": {
+            "url": "https://some.zrc.nl/api/v1/zaken",
+            "method": "GET",
+            "headers": {},
+            "data": None,
+            "params": None,
+            **request,
+        },
+        "response": {"status": status, "headers": {}, "data": None},
+    }
+
+
+class TaskContextTests(TestCase):
+    def test_no_task(self):
+        self.assertIsNone(get_current_task())
+
+    def test_task_context(self):
+        task = ExternalTaskFactory.build()
+
+        with task_context(task):
+            self.assertEqual(get_current_task(), task)
+
+        self.assertIsNone(get_current_task())
+
+    def test_task_per_thread(self):
+        tasks = ExternalTaskFactory.build_batch(2)
+        barrier = threading.Barrier(2)
+        # unsaved tasks are unhashable - key by thread index
+        seen = {}
+
+        def perform(index, task):
+            with task_context(task):
+                # make sure both threads are inside their context at the same time
+                barrier.wait(timeout=5)
+                seen[index] = get_current_task()
+
+        threads = [
+            threading.Thread(target=perform, args=(index, task))
+            for index, task in enumerate(tasks)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # both threads ran to completion, each seeing its own task
+        self.assertEqual(len(seen), 2)
+        self.assertIs(seen[0], tasks[0])
+        self.assertIs(seen[1], tasks[1])
+
+    def test_bind_task(self):
+        task = ExternalTaskFactory.build()
+
+        with task_context(task):
+            with futures.ThreadPoolExecutor() as executor:
+                unbound = executor.submit(get_current_task).result()
+                bound = executor.submit(bind_task(get_current_task)).result()
+
+        self.assertIsNone(unbound)
+        self.assertEqual(bound, task)
+
+
+class DBLogTests(TestCase):
+    def _add(self, log):
+        log.add(
+            "https://some.zrc.nl",
+            "https://some.zrc.nl/api/v1/zaken",
+            "GET",
+            {},
+            None,
+            200,
+            {},
+            [],
+        )
+
+    def test_log_for_current_task(self):
+        task = ExternalTaskFactory.create()
+
+        with task_context(task):
+            self._add(DBLog())
+
+        self.assertEqual(task.logs.count(), 1)
+
+    def test_explicit_task_takes_precedence(self):
+        task, other_task = ExternalTaskFactory.create_batch(2)
+
+        with task_context(other_task):
+            self._add(DBLog(task))
+
+        self.assertEqual(task.logs.count(), 1)
+        self.assertEqual(other_task.logs.count(), 0)
+
+
+class LogRequestTests(TestCase):
+    def test_buffered_within_task_context(self):
+        task = ExternalTaskFactory.create()
+
+        with task_context(task):
+            log_request(get_extra_data())
+            log_request(get_extra_data())
+
+            self.assertEqual(task.logs.count(), 0)
+
+        self.assertEqual(task.logs.count(), 2)
+
+    def test_flushed_on_exception(self):
+        task = ExternalTaskFactory.create()
+
+        with self.assertRaises(ZeroDivisionError):
+            with task_context(task):
+                log_request(get_extra_data())
+                1 / 0
+
+        self.assertEqual(task.logs.count(), 1)
+
+    def test_single_query_per_task(self):
+        task = ExternalTaskFactory.create()
+
+        with self.assertNumQueries(1):
+            with task_context(task):
+                for _ in range(10):
+                    log_request(get_extra_data())
+
+    def test_redact_headers(self):
+        task = ExternalTaskFactory.create()
+
+        log_request(
+            get_extra_data(headers={"authorization": "Bearer 12345", "Accept": "*/*"}),
+            task=task,
+        )
+
+        log = task.logs.get()
+        self.assertEqual(
+            log.extra_data["request"]["headers"],
+            {"authorization": REDACTED, "Accept": "*/*"},
+        )
+
+    @override_settings(REQUEST_LOG_MAX_BODY_SIZE=10)
+    def test_truncate_body(self):
+        task = ExternalTaskFactory.create()
+
+        log_request(get_extra_data(data={"key": "a long value"}), task=task)
+        log_request(get_extra_data(data={"k": "v"}), task=task)
+
+        long_log, short_log = task.logs.order_by("pk")
+        self.assertEqual(long_log.extra_data["request"]["data"], '{"key": "a')
+        self.assertEqual(short_log.extra_data["request"]["data"], {"k": "v"})
+
+    @override_settings(REQUEST_LOG_SAMPLE_RATES={"https://some.zrc.nl": 0})
+    def test_sampling(self):
+        task = ExternalTaskFactory.create()
+
+        log_request(get_extra_data(), task=task)
+        log_request(get_extra_data(status=500), task=task)
+
+        log = task.logs.get()
+        self.assertEqual(log.extra_data["response"]["status"], 500)
@@ -0,0 +1,99 @@
+import gzip
+import json
+import os
+import tempfile
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from timeline_logger.models import TimelineLog
+
+from bptl.camunda.models import ExternalTask
+from bptl.camunda.tests.factories import ExternalTaskFactory
+from bptl.utils.constants import Statuses
+
+from ..retention import apply_retention, get_expired_tasks
+from .factories import TaskMappingFactory
+
+
+def create_task(days_ago: int, status=Statuses.completed, **kwargs) -> ExternalTask:
+    task = ExternalTaskFactory.create(
+        status=status,
+        status_changed_at=timezone.now() - timedelta(days=days_ago),
+        **kwargs,
+    )
+    TimelineLog.objects.create(content_object=task, extra_data={"request": {}})
+    return task
+
+
+@override_settings(TASK_RETENTION_DAYS=None)
+class RetentionTests(TestCase):
+    def test_kept_forever_by_default(self):
+        create_task(days_ago=1000)
+
+        self.assertFalse(get_expired_tasks().exists())
+
+    def test_topic_retention(self):
+        TaskMappingFactory.create(topic_name="short-lived", retention_days=7)
+        expired = create_task(days_ago=8, topic_name="short-lived")
+        create_task(days_ago=6, topic_name="short-lived")
+        create_task(days_ago=8, topic_name="short-lived", status=Statuses.in_progress)
+        create_task(days_ago=8, topic_name="other-topic")
+
+        removed = apply_retention()
+
+        self.assertEqual(removed, 1)
+        self.assertFalse(ExternalTask.objects.filter(pk=expired.pk).exists())
+        self.assertEqual(ExternalTask.objects.count(), 3)
+        self.assertEqual(TimelineLog.objects.count(), 3)
+
+    def test_retention_of_at_least_a_day(self):
+        mapping = TaskMappingFactory.build(retention_days=0)
+
+        with self.assertRaises(ValidationError) as context:
+            mapping.clean_fields()
+
+        self.assertIn("retention_days", context.exception.message_dict)
+
+    @override_settings(TASK_RETENTION_DAYS=30)
+    def test_default_retention(self):
+        TaskMappingFactory.create(topic_name="long-lived", retention_days=365)
+        create_task(days_ago=31, topic_name="other-topic", status=Statuses.failed)
+        create_task(days_ago=31, topic_name="long-lived")
+
+        removed = apply_retention()
+
+        self.assertEqual(removed, 1)
+        self.assertEqual(ExternalTask.objects.get().topic_name, "long-lived")
+
+    @override_settings(TASK_RETENTION_DAYS=30)
+    def test_batches(self):
+        for _ in range(3):
+            create_task(days_ago=31)
+
+        removed = apply_retention(batch_size=1, max_batches=2)
+
+        self.assertEqual(removed, 2)
+        self.assertEqual(ExternalTask.objects.count(), 1)
+
+    def test_archive(self):
+        TaskMappingFactory.create(topic_name="short-lived", retention_days=7)
+        task = create_task(days_ago=8, topic_name="short-lived")
+
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(TASK_ARCHIVE_DIR=directory):
+                apply_retention()
+
+            (day_directory,) = os.listdir(directory)
+            (filename,) = os.listdir(os.path.join(directory, day_directory))
+            with gzip.open(os.path.join(directory, day_directory, filename)) as f:
+                lines = [json.loads(line) for line in f]
+
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]["model"], "camunda.externaltask")
+        self.assertEqual(lines[0]["fields"]["id"], task.pk)
+        self.assertEqual(lines[0]["fields"]["task_id"], task.task_id)
+        self.assertEqual(lines[0]["fields"]["topic_name"], "short-lived")
+        self.assertEqual(lines[0]["logs"][0]["extra_data"], {"request": {}})
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from bptl.camunda.models import ExternalTask
+from bptl.camunda.tests.factories import ExternalTaskFactory
+from bptl.utils.constants import Statuses
+from bptl.utils.decorators import checkpoint, transition
+
+from ..models import StatusCount
+from ..query import get_bucket
+
+
+def get_counts(since=None) -> dict:
+    since = since or timezone.now() - timedelta(hours=1)
+    return {
+        count["status"]: count["tasks"]
+        for count in StatusCount.objects.totals(since)
+        if count["tasks"]
+    }
+
+
+class BucketTests(SimpleTestCase):
+    def test_get_bucket(self):
+        timestamp = datetime(2020, 7, 30, 13, 52, 12, tzinfo=timezone.utc)
+
+        self.assertEqual(
+            get_bucket(timestamp), datetime(2020, 7, 30, 13, 50, tzinfo=timezone.utc)
+        )
+
+
+class StatusCountTests(TestCase):
+    def test_created_task(self):
+        ExternalTaskFactory.create_batch(2)
+
+        self.assertEqual(get_counts(), {Statuses.initial: 2})
+        count = StatusCount.objects.get()
+        self.assertEqual(
+            count.content_type, ContentType.objects.get_for_model(ExternalTask)
+        )
+
+    def test_bulk_created_tasks(self):
+        tasks = ExternalTaskFactory.build_batch(3)
+
+        ExternalTask.objects.bulk_create_tasks(tasks)
+
+        self.assertEqual(get_counts(), {Statuses.initial: 3})
+
+    def test_transition(self):
+        task, _ = ExternalTaskFactory.create_batch(2)
+
+        transition(task, Statuses.in_progress)
+
+        self.assertEqual(get_counts(), {Statuses.initial: 1, Statuses.in_progress: 1})
+
+    @patch("bptl.camunda.management.commands.execute_task.task_execute_and_complete")
+    def test_forced_execution(self, m_execute):
+        task = ExternalTaskFactory.create()
+        transition(task, Statuses.failed)
+
+        call_command("execute_task", task_id=task.id, force=True, stdout=StringIO())
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, Statuses.initial)
+        self.assertEqual(get_counts(), {Statuses.initial: 1})
+
+    def test_claim(self):
+        task = ExternalTaskFactory.create()
+
+        ExternalTask.objects.claim(task)
+
+        self.assertEqual(get_counts(), {Statuses.in_progress: 1})
+
+    def test_checkpoint(self):
+        task = ExternalTaskFactory.create()
+
+        with checkpoint(task):
+            transition(task, Statuses.in_progress)
+            transition(task, Statuses.performed)
+
+        self.assertEqual(get_counts(), {Statuses.performed: 1})
+
+    def test_old_buckets_are_left_out(self):
+        now = timezone.now()
+        ExternalTaskFactory.create(status_changed_at=now - timedelta(days=2))
+        ExternalTaskFactory.create(status=Statuses.failed)
+
+        self.assertEqual(
+            get_counts(since=now - timedelta(days=1)), {Statuses.failed: 1}
+        )
+        self.assertEqual(
+            get_counts(since=now - timedelta(days=3)),
+            {Statuses.initial: 1, Statuses.failed: 1},
+        )
+
+    def test_status_change_of_old_task(self):
+        now = timezone.now()
+        task = ExternalTaskFactory.create(status_changed_at=now - timedelta(days=2))
+
+        transition(task, Statuses.in_progress)
+
+        self.assertEqual(
+            get_counts(since=now - timedelta(days=1)), {Statuses.in_progress: 1}
+        )
+        self.assertEqual(
+            get_counts(since=now - timedelta(days=3)), {Statuses.in_progress: 1}
+        )
@@ -0,0 +1,62 @@
+from typing import List, Tuple
+from unittest.mock import patch
+
+from django.contrib import admin
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from django_webtest import WebTest
+
+from bptl.accounts.models import User
+from bptl.activiti.models import ServiceTask
+from bptl.camunda.models import ExternalTask
+
+from ..constants import EngineTypes, get_content_type_ids
+from ..models import BaseTask
+from .factories import create_mixed_tasks
+
+
+class BaseTaskAdminQueryCountTests(WebTest):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        create_mixed_tasks(1000)
+        cls.user = User.objects.create_superuser("super", "user@utrecht.nl", "letmein")
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("admin:tasks_basetask_changelist")
+        # fill the caches (e.g. the content types and the session), as in a running
+        # process
+        get_content_type_ids(EngineTypes.values)
+        self.app.get(self.url, user=self.user)
+
+    def get_changelist(self, per_page: int) -> Tuple[str, List[str]]:
+        model_admin = admin.site._registry[BaseTask]
+        with patch.object(model_admin, "list_per_page", per_page):
+            with CaptureQueriesContext(connection) as context:
+                response = self.app.get(self.url, user=self.user)
+
+        self.assertEqual(response.status_code, 200)
+        return response.text, [query["sql"] for query in context.captured_queries]
+
+    def test_no_queries_per_task(self):
+        _, few = self.get_changelist(per_page=10)
+        _, many = self.get_changelist(per_page=200)
+
+        self.assertEqual(len(few), len(many))
+
+    def test_child_tables_not_queried(self):
+        _, queries = self.get_changelist(per_page=200)
+
+        for sql in queries:
+            self.assertNotIn(f'"{ExternalTask._meta.db_table}"', sql)
+            self.assertNotIn(f'"{ServiceTask._meta.db_table}"', sql)
+
+    def test_engine_types_shown(self):
+        html, _ = self.get_changelist(per_page=200)
+
+        for engine_type in (EngineTypes.camunda, EngineTypes.activiti):
+            label = EngineTypes.values[engine_type]
+            self.assertIn(f'<td class="field-engine_type">{label}</td>', html)
@@ -1,14 +1,13 @@
+"""
+Render docstrings to HTML with Sphinx.
+
+Sphinx and docutils are slow to import, and only needed to show the documentation of
+tasks. They are imported when a docstring is rendered, so that processes executing
+tasks never load them.
+"""
 import functools
 import tempfile
 
-from docutils.core import publish_doctree
-from docutils.frontend import OptionParser
-from docutils.io import StringOutput
-from sphinx.application import Sphinx
-from sphinx.util import rst
-from sphinx.util.docutils import sphinx_domains
-from sphinx.writers.html import HTMLWriter
-
 __all__ = ["render_docstring"]
 
 
@@ -22,6 +21,8 @@ def render_docstring(docstring: str) -> str:
 
 @functools.lru_cache()
 def _get_builder():
+    from sphinx.application import Sphinx
+
     _tmpdir = tempfile.mkdtemp()
     app = Sphinx(
         srcdir=".",
@@ -40,6 +41,10 @@ def _get_builder():
 
 
 def _get_doctree(docstring: str):
+    from docutils.core import publish_doctree
+    from sphinx.util import rst
+    from sphinx.util.docutils import sphinx_domains
+
     docname = "_docstring"
     builder = _get_builder()
     env = builder.env
@@ -53,6 +58,10 @@ def _get_doctree(docstring: str):
 
 
 def _write_html(document) -> str:
+    from docutils.frontend import OptionParser
+    from docutils.io import StringOutput
+    from sphinx.writers.html import HTMLWriter
+
     builder = _get_builder()
 
     destination = StringOutput(encoding="utf-8")
@@ -1,41 +1,124 @@
 import functools
 import logging
+import random
 import time
 import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Optional
 
-from timeline_logger.models import TimelineLog
+from django.utils import timezone
+
+from celery.exceptions import Retry
 
 from .constants import Statuses
 
 logger = logging.getLogger(__name__)
 
 
+class InvalidTransition(Exception):
+    pass
+
+
+# the statuses a task may move to from its current status - failing is always possible
+TRANSITIONS = {
+    Statuses.initial: {Statuses.in_progress, Statuses.performed},
+    Statuses.in_progress: {Statuses.performed},
+    Statuses.performed: {Statuses.completed},
+    Statuses.failed: {Statuses.in_progress, Statuses.performed},
+    Statuses.completed: set(),
+}
+
+
+def transition(task, status: str, force: bool = False, **fields) -> None:
+    """
+    Move the task to ``status``, recording it in the status history of the task.
+
+    Any other ``fields`` are set on the task as well. The changes are written right
+    away, unless a :func:`checkpoint` of the task is active. With ``force``, any status
+    can be set, e.g. to reset a task by hand.
+
+    :raises: :class:`InvalidTransition` if the task can't move to ``status``.
+    """
+    allowed = force or status == Statuses.failed or status in TRANSITIONS[task.status]
+    if not allowed:
+        raise InvalidTransition(
+            f"The task {task} can't move from {task.status} to {status}"
+        )
+
+    now = timezone.now()
+    status_changes = task.__dict__.setdefault("_status_changes", [])
+    status_changes += [(task.status, task.status_changed_at, -1), (status, now, 1)]
+
+    task.status = status
+    task.status_history = task.status_history + [[status, now.isoformat()]]
+    task.status_changed_at = now
+    for name, value in fields.items():
+        setattr(task, name, value)
+
+    pending = task.__dict__.setdefault("_pending_fields", set())
+    pending.update(["status", "status_history", "status_changed_at", *fields])
+
+    if not task.__dict__.get("_checkpoint", False):
+        flush(task)
+
+
+def flush(task) -> None:
+    """
+    Write the pending transitions of the task, and count its status changes.
+    """
+    from bptl.tasks.models import StatusCount
+
+    pending = task.__dict__.pop("_pending_fields", None)
+    if pending:
+        task.save(update_fields=sorted(pending))
+
+    status_changes = task.__dict__.pop("_status_changes", None)
+    if status_changes:
+        StatusCount.objects.add_changes(task.polymorphic_ctype_id, status_changes)
+
+
+@contextmanager
+def checkpoint(task):
+    """
+    Collect the transitions of the task within the block, and write them when it exits.
+    """
+    outer = task.__dict__.get("_checkpoint", False)
+    task._checkpoint = True
+    try:
+        yield task
+    finally:
+        task._checkpoint = outer
+        if not outer:
+            flush(task)
+
+
 def save_and_log(status=Statuses.performed):
     def inner(func):
         @functools.wraps(func)
         def wrapper(task, *args, **kwargs):
+            start = time.monotonic()
             try:
                 result = func(task, *args, **kwargs)
-            except Exception as exc:
-                task.status = Statuses.failed
-                task.execution_error = traceback.format_exc()
-                task.save(update_fields=["status", "execution_error"])
-
-                TimelineLog.objects.create(
-                    content_object=task, extra_data={"status": task.status}
+            except Retry:
+                # the work is rescheduled, the task keeps its status until then
+                raise
+            except Exception:
+                transition(
+                    task, Statuses.failed, execution_error=traceback.format_exc()
                 )
-
                 raise
 
             else:
-                task.status = status
+                fields = {}
                 if status == Statuses.performed:
-                    task.result_variables = result
-                task.save(update_fields=["status", "result_variables"])
-
-                TimelineLog.objects.create(
-                    content_object=task, extra_data={"status": task.status}
-                )
+                    fields = {
+                        "result_variables": result,
+                        "execution_duration": timedelta(
+                            seconds=time.monotonic() - start
+                        ),
+                    }
+                transition(task, status, **fields)
 
             return result
 
@@ -44,45 +127,140 @@ def save_and_log(status=Statuses.performed):
     return inner
 
 
+class RetryPolicy:
+    """
+    Decide if and when a failed operation is tried again.
+
+    The delay grows exponentially with every attempt, up to ``max_delay`` seconds. With
+    ``jitter``, a random delay between zero and that value is used instead, so that
+    workers failing at the same time do not retry in lockstep. Retrying stops after
+    ``times`` retries, or when the next attempt would start after ``deadline`` seconds.
+
+    :param exceptions: the exception classes that may be retried.
+    :param condition: an extra check of the exception, to decide if it may be retried.
+    """
+
+    def __init__(
+        self,
+        times: int = 3,
+        exceptions=(Exception,),
+        condition: callable = lambda exc: True,
+        delay: float = 1.0,
+        backoff: float = 2.0,
+        max_delay: float = 30.0,
+        jitter: bool = True,
+        deadline: Optional[float] = None,
+    ):
+        self.times = times
+        self.exceptions = exceptions
+        self.condition = condition
+        self.delay = delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.deadline = deadline
+
+    def is_retryable(self, exc: Exception) -> bool:
+        return isinstance(exc, self.exceptions) and self.condition(exc)
+
+    def get_delay(self, retries: int) -> float:
+        """
+        Determine the delay before the next attempt, after ``retries`` retries so far.
+        """
+        delay = min(self.delay * self.backoff ** retries, self.max_delay)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def should_retry(self, exc: Exception, retries: int, elapsed: float = 0.0) -> bool:
+        if retries >= self.times or not self.is_retryable(exc):
+            return False
+        if self.deadline is None:
+            return True
+        # the jitter-free delay is the upper bound of the next delay
+        upper_bound = min(self.delay * self.backoff ** retries, self.max_delay)
+        return elapsed + upper_bound <= self.deadline
+
+    def call(self, func: callable, *args, **kwargs):
+        """
+        Call ``func``, retrying it in-process - blocking the caller during the delays.
+        """
+        start = time.monotonic()
+        retries = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except Exception as exc:
+                if not self.should_retry(exc, retries, time.monotonic() - start):
+                    # the deadline may stop retrying before all retries are spent
+                    if self.is_retryable(exc):
+                        logger.error("Task didn't succeed after %d retries", retries)
+                    raise
+                delay = self.get_delay(retries)
+                retries += 1
+                logger.info(
+                    "Retrying %r in %.2fs (retry %d of %d) after %r",
+                    func,
+                    delay,
+                    retries,
+                    self.times,
+                    exc,
+                )
+                time.sleep(delay)
+
+    def retry_task(self, task, exc: Optional[Exception] = None):
+        """
+        Reschedule the (bound) Celery ``task`` instead of blocking the worker.
+
+        Raises :class:`celery.exceptions.Retry`, or the exception if the retries are
+        spent. Without an exception, the task is rescheduled indefinitely.
+        """
+        retries = task.request.retries
+        if exc is not None and not self.should_retry(exc, retries):
+            raise exc
+        return task.retry(
+            exc=exc,
+            countdown=self.get_delay(retries),
+            max_retries=self.times if exc is not None else None,
+        )
+
+
 def retry(
     times=3,
     exceptions=(Exception,),
     condition: callable = lambda exc: True,
     delay=1.0,
     on_failure: callable = lambda exc, *args, **kwargs: None,
+    policy: Optional[RetryPolicy] = None,
 ):
     """
     Retry the decorated callable up to ``times`` if it raises a known exception.
 
+    Pass a :class:`RetryPolicy` as ``policy`` for backoff, jitter or a deadline - the
+    other arguments then only describe a fixed delay policy.
+
     If the retries are all spent, then on_failure will be invoked.
     """
+    if policy is None:
+        policy = RetryPolicy(
+            times=times,
+            exceptions=exceptions,
+            condition=condition,
+            delay=delay,
+            backoff=1.0,
+            jitter=False,
+        )
 
     def decorator(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            tries_left = times + 1
-
-            logger.info("Tries left: %d, %r", tries_left, func)
-
-            while tries_left > 0:
-                try:
-                    return func(*args, **kwargs)
-                except exceptions as exc:
-                    # the extra exception check doesn't pass, so consider it an
-                    # unexpected exception
-                    if not condition(exc):
-                        raise
-                    else:  # expected exception, retry (if there are retries left)
-                        tries_left -= 1
-
-                    # if we've reached the maximum number of retries, raise the
-                    # exception again
-                    if tries_left < 1:
-                        logger.error("Task didn't succeed after %d retries", times)
-                        on_failure(exc, *args, **kwargs)
-                        raise
-
-                time.sleep(delay)
+            try:
+                return policy.call(func, *args, **kwargs)
+            except Exception as exc:
+                # only expected exceptions are retried - give up on those
+                if policy.is_retryable(exc):
+                    on_failure(exc, *args, **kwargs)
+                raise
 
         return wrapper
 
@@ -0,0 +1,185 @@
+from unittest.mock import ANY, MagicMock, patch
+
+from django.test import SimpleTestCase, TestCase
+
+from celery.exceptions import Retry
+
+from bptl.camunda.tests.factories import ExternalTaskFactory
+
+from ..constants import Statuses
+from ..decorators import (
+    InvalidTransition,
+    RetryPolicy,
+    checkpoint,
+    retry,
+    save_and_log,
+    transition,
+)
+
+
+def get_statuses(task) -> list:
+    return [status for status, timestamp in task.status_history]
+
+
+class TransitionTests(TestCase):
+    def test_transition_is_written(self):
+        task = ExternalTaskFactory.create()
+
+        # the task and the status count
+        with self.assertNumQueries(2):
+            transition(task, Statuses.in_progress)
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, Statuses.in_progress)
+        self.assertEqual(get_statuses(task), [Statuses.initial, Statuses.in_progress])
+
+    def test_invalid_transition(self):
+        task = ExternalTaskFactory.create(status=Statuses.completed)
+
+        with self.assertRaises(InvalidTransition):
+            transition(task, Statuses.in_progress)
+
+    def test_fail_from_any_status(self):
+        task = ExternalTaskFactory.create(status=Statuses.completed)
+
+        transition(task, Statuses.failed, execution_error="boom")
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, Statuses.failed)
+        self.assertEqual(task.execution_error, "boom")
+
+    def test_checkpoint_writes_once(self):
+        @save_and_log()
+        def execute(task):
+            return {"foo": "bar"}
+
+        @save_and_log(status=Statuses.completed)
+        def complete(task):
+            pass
+
+        task = ExternalTaskFactory.create()
+        transition(task, Statuses.in_progress)
+
+        with self.assertNumQueries(2):
+            with checkpoint(task):
+                execute(task)
+                complete(task)
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, Statuses.completed)
+        self.assertEqual(task.result_variables, {"foo": "bar"})
+        self.assertIsNotNone(task.execution_duration)
+        self.assertEqual(
+            get_statuses(task),
+            [
+                Statuses.initial,
+                Statuses.in_progress,
+                Statuses.performed,
+                Statuses.completed,
+            ],
+        )
+
+    def test_checkpoint_writes_on_exception(self):
+        @save_and_log()
+        def execute(task):
+            raise Exception("execution is failed")
+
+        task = ExternalTaskFactory.create()
+
+        with self.assertRaises(Exception):
+            with checkpoint(task):
+                execute(task)
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, Statuses.failed)
+        self.assertEqual(get_statuses(task), [Statuses.initial, Statuses.failed])
+
+
+class RetryPolicyTests(SimpleTestCase):
+    def test_exponential_delay(self):
+        policy = RetryPolicy(delay=1, backoff=2, max_delay=5, jitter=False)
+
+        delays = [policy.get_delay(retries) for retries in range(5)]
+
+        self.assertEqual(delays, [1, 2, 4, 5, 5])
+
+    def test_jitter(self):
+        policy = RetryPolicy(delay=1, backoff=2, max_delay=5)
+
+        for retries in range(5):
+            with self.subTest(retries=retries):
+                self.assertLessEqual(policy.get_delay(retries), min(2 ** retries, 5))
+
+    def test_should_retry(self):
+        policy = RetryPolicy(times=2, exceptions=(ValueError,), delay=1, deadline=5)
+
+        self.assertTrue(policy.should_retry(ValueError(), retries=0))
+        self.assertFalse(policy.should_retry(ValueError(), retries=2))
+        self.assertFalse(policy.should_retry(KeyError(), retries=0))
+        # the next attempt would start after the deadline
+        self.assertFalse(policy.should_retry(ValueError(), retries=1, elapsed=4))
+
+    @patch("bptl.utils.decorators.time.sleep")
+    def test_call(self, m_sleep):
+        policy = RetryPolicy(times=3, exceptions=(ValueError,))
+        func = MagicMock(side_effect=[ValueError(), ValueError(), "done"])
+
+        result = policy.call(func, "arg")
+
+        self.assertEqual(result, "done")
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(m_sleep.call_count, 2)
+
+    @patch("bptl.utils.decorators.time.sleep")
+    def test_retry_decorator_on_failure(self, m_sleep):
+        on_failure = MagicMock()
+
+        policy = RetryPolicy(times=2, exceptions=(ValueError,))
+
+        @retry(policy=policy, on_failure=on_failure)
+        def func(arg):
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            func("arg")
+
+        self.assertEqual(m_sleep.call_count, 2)
+        on_failure.assert_called_once()
+        self.assertEqual(on_failure.call_args[0][1], "arg")
+
+    @patch("bptl.utils.decorators.time.sleep")
+    def test_retry_decorator_logs_attempts(self, m_sleep):
+        # the deadline stops retrying after the first retry
+        policy = RetryPolicy(
+            times=3, exceptions=(ValueError,), delay=1, jitter=False, deadline=1.5
+        )
+
+        @retry(policy=policy)
+        def func():
+            raise ValueError("boom")
+
+        with self.assertLogs("bptl.utils.decorators", level="ERROR") as logs:
+            with self.assertRaises(ValueError):
+                func()
+
+        self.assertEqual(m_sleep.call_count, 1)
+        self.assertIn("Task didn't succeed after 1 retries", logs.output[0])
+
+    def test_retry_task(self):
+        policy = RetryPolicy(times=2, exceptions=(ValueError,), jitter=False)
+        task = MagicMock(**{"request.retries": 1, "retry.side_effect": Retry})
+
+        with self.assertRaises(Retry):
+            policy.retry_task(task, ValueError())
+
+        task.retry.assert_called_once_with(exc=ANY, countdown=2.0, max_retries=2)
+
+    def test_retry_task_spent(self):
+        policy = RetryPolicy(times=2, exceptions=(ValueError,))
+        task = MagicMock(**{"request.retries": 2})
+        exc = ValueError()
+
+        with self.assertRaises(ValueError):
+            policy.retry_task(task, exc)
+
+        task.retry.assert_not_called()
@@ -8,7 +8,8 @@ from django.conf import settings
 from django.utils.module_loading import import_string
 
 import requests
-from timeline_logger.models import TimelineLog
+
+from bptl.tasks.request_log import log_request
 
 from .models import BRPConfig
 
@@ -23,9 +24,9 @@ def get_client_class() -> type:
 
 
 class BRPClient:
-    task = None
-
-    def __init__(self, config=None):
+    def __init__(self, config=None, task=None):
+        # the task to log the requests for, defaults to the task being performed
+        self.task = task
         self.config = config or BRPConfig.get_solo()
         self.api_root = self.config.api_root
         self.auth = self.config.auth_header
@@ -49,11 +50,10 @@ class BRPClient:
         return response.json()
 
     def log(self, resp, params):
-        config = BRPConfig.get_solo()
         response_data = resp.json() if resp.content else None
 
         extra_data = {
-            "service_base_url": config.api_root,
+            "service_base_url": self.api_root,
             "request": {
                 "url": resp.url,
                 "method": resp.request.method,
@@ -67,4 +67,4 @@ class BRPClient:
                 "data": response_data,
             },
         }
-        TimelineLog.objects.create(content_object=self.task, extra_data=extra_data)
+        log_request(extra_data, task=self.task)
@@ -28,8 +28,7 @@ class IsAboveAge(WorkUnit):
         bsn = variables["burgerservicenummer"]
         age = variables["age"]
 
-        client = get_client_class()()
-        client.task = self.task
+        client = get_client_class()(task=self.task)
         url = f"ingeschrevenpersonen/{bsn}"
 
         response = client.get(url, params={"fields": "leeftijd"})
@@ -64,8 +63,7 @@ class DegreeOfKinship(WorkUnit):
         if bsn1 == bsn2:
             return {"kinship": None}
 
-        client = get_client_class()()
-        client.task = self.task
+        client = get_client_class()(task=self.task)
 
         # set up classes for storing parent and child relations of one node
         rel1 = Relations(bsn1)
@@ -1,23 +1,18 @@
 from zds_client.schema import get_operation_url
-from zgw_consumers.client import ZGWClient
 
 from bptl.tasks.base import BaseTask, check_variable
-from bptl.tasks.models import TaskMapping
+from bptl.tasks.mapping_cache import get_default_services
 from bptl.tasks.registry import register
+from bptl.work_units.zgw.client import ZGWClient, get_client as get_zgw_client
 
 
 def get_client(task: BaseTask, alias: str = "kownsl") -> ZGWClient:
-    default_services = TaskMapping.objects.get(
-        topic_name=task.topic_name
-    ).defaultservice_set.select_related("service")
+    default_services = get_default_services(task.topic_name)
     services_by_alias = {svc.alias: svc.service for svc in default_services}
     if alias not in services_by_alias:
         raise RuntimeError(f"Service alias '{alias}' not found.")
 
-    client = services_by_alias[alias].build_client()
-    client._log.task = task
-
-    return client
+    return get_zgw_client(services_by_alias[alias], task=task)
 
 
 @register
@@ -1,8 +1,31 @@
+import copy
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Optional, Tuple
+from urllib.parse import urljoin
+
+from django.forms.models import model_to_dict
+
+import requests
 from timeline_logger.models import TimelineLog
+from zds_client.client import ClientError, get_headers
 from zgw_consumers.client import ZGWClient as _ZGWClient
+from zgw_consumers.models import Service
+
+from bptl.utils.decorators import RetryPolicy
 
 from .log import DBLog
 
+# requests that can safely be sent again are retried on connection problems
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_POLICY = RetryPolicy(
+    times=2,
+    exceptions=(requests.ConnectionError, requests.Timeout),
+    delay=0.5,
+    max_delay=2,
+    deadline=5,
+)
+
 
 class NoService(Exception):
     pass
@@ -19,6 +42,9 @@ class NoAuth(Exception):
 class ZGWClient(_ZGWClient):
     _log = DBLog()
 
+    # set by the client pool, shared by all the clients of a service
+    session: Optional[requests.Session] = None
+
     def set_auth_value(self, auth_value):
         self.auth = None
         self.auth_value = {"Authorization": auth_value}
@@ -29,3 +55,136 @@ class ZGWClient(_ZGWClient):
         DB log entries.
         """
         return TimelineLog.objects.filter(extra_data__service_name=self.service)
+
+    def request(
+        self,
+        path: str,
+        operation: str,
+        method="GET",
+        expected_status=200,
+        request_kwargs: Optional[dict] = None,
+        **kwargs,
+    ):
+        """
+        Make the HTTP request, re-using the connections of the pooled session.
+
+        Mirrors :meth:`zds_client.client.Client.request`, which opens a new connection
+        for every request.
+        """
+        if self.session is None:
+            return super().request(
+                path,
+                operation,
+                method=method,
+                expected_status=expected_status,
+                request_kwargs=request_kwargs,
+                **kwargs,
+            )
+
+        url = urljoin(self.base_url, path)
+
+        if request_kwargs:
+            kwargs.update(request_kwargs)
+
+        headers = kwargs.pop("headers", {})
+        headers.setdefault("Accept", "application/json")
+        headers.setdefault("Content-Type", "application/json")
+        headers.update(get_headers(self.schema, operation))
+
+        if self.auth:
+            headers.update(self.auth.credentials())
+
+        kwargs["headers"] = headers
+
+        pre_id = self.pre_request(method, url, **kwargs)
+
+        if method.upper() in IDEMPOTENT_METHODS:
+            response = RETRY_POLICY.call(self.session.request, method, url, **kwargs)
+        else:
+            response = self.session.request(method, url, **kwargs)
+
+        try:
+            response_json = response.json()
+        except Exception:
+            response_json = None
+
+        self.post_response(pre_id, response_json)
+
+        self._log.add(
+            self.service,
+            url,
+            method,
+            headers,
+            copy.deepcopy(kwargs.get("data", kwargs.get("json", None))),
+            response.status_code,
+            dict(response.headers),
+            response_json,
+            params=kwargs.get("params"),
+        )
+
+        try:
+            response.raise_for_status()
+        except requests.HTTPError as exc:
+            if response.status_code >= 500:
+                raise
+            raise ClientError(response_json) from exc
+
+        assert response.status_code == expected_status, response_json
+        return response_json
+
+
+class ClientPool:
+    """
+    Per-process pool of ZGW clients, one per service.
+
+    Building a client registers its configuration and the pooled client keeps an HTTP
+    session with keep-alive connections to the service. Consumers get a shallow copy
+    of the pooled client, so the per-task state - the authorization header and the
+    task to log the requests for - is never shared, while the session and the parsed
+    API schema are.
+
+    A pooled client is replaced when the configuration of its service changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[int, Tuple[dict, ZGWClient]] = {}
+
+    def _build_client(self, service: Service) -> ZGWClient:
+        client = service.build_client()
+        client.session = requests.Session()
+        # the session is shared between tasks - never carry cookies over
+        client.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return client
+
+    def get_client(self, service: Service) -> ZGWClient:
+        config = model_to_dict(service)
+        with self._lock:
+            pooled = self._clients.get(service.pk)
+            if pooled is None or pooled[0] != config:
+                if pooled is not None:
+                    pooled[1].session.close()
+                pooled = (config, self._build_client(service))
+                self._clients[service.pk] = pooled
+
+        client = copy.copy(pooled[1])
+        client._log = DBLog()
+        return client
+
+    def clear(self) -> None:
+        with self._lock:
+            for _, client in self._clients.values():
+                client.session.close()
+            self._clients = {}
+
+
+client_pool = ClientPool()
+
+
+def get_client(service: Service, task=None) -> ZGWClient:
+    """
+    Get a client for ``service`` from the pool, logging its requests for ``task``.
+    """
+    client = client_pool.get_client(service)
+    client._log.task = task
+    return client
@@ -1,8 +1,16 @@
-from timeline_logger.models import TimelineLog
+from bptl.tasks.request_log import log_request
 
 
 class DBLog:
-    task = None
+    """
+    Log the requests of a client in the database.
+
+    The requests are logged for the task set on the log, or else for the task being
+    performed in the current context.
+    """
+
+    def __init__(self, task=None):
+        self.task = task
 
     def add(
         self,
@@ -32,4 +40,4 @@ class DBLog:
                 "data": response_data,
             },
         }
-        TimelineLog.objects.create(content_object=self.task, extra_data=extra_data)
+        log_request(extra_data, task=self.task)
@@ -1,10 +1,9 @@
 from django.conf import settings
 
 from bptl.tasks.base import WorkUnit
-from bptl.tasks.models import TaskMapping
-from bptl.work_units.zgw.models import DefaultService
+from bptl.tasks.mapping_cache import get_default_services
 
-from ..client import MultipleServices, NoAuth, NoService
+from ..client import MultipleServices, NoAuth, NoService, get_client
 
 
 class ZGWWorkUnit(WorkUnit):
@@ -12,10 +11,12 @@ class ZGWWorkUnit(WorkUnit):
         """
         create ZGW client with requested parameters
         """
-        default_services = TaskMapping.objects.get(
-            topic_name=self.task.topic_name
-        ).defaultservice_set.filter(service__api_type=service_type)
-        if default_services.count() == 0:
+        default_services = [
+            default_service
+            for default_service in get_default_services(self.task.topic_name)
+            if default_service.service.api_type == service_type
+        ]
+        if not default_services:
             raise NoService(
                 f"No {service_type} service is configured for topic {self.task.topic_name}"
             )
@@ -27,22 +28,25 @@ class ZGWWorkUnit(WorkUnit):
 
         aliases_vars = list(services_vars.keys())
         if aliases_vars:
-            default_services = default_services.filter(alias__in=aliases_vars)
+            default_services = [
+                default_service
+                for default_service in default_services
+                if default_service.alias in aliases_vars
+            ]
 
-        try:
-            default_service = default_services.get()
-        except DefaultService.DoesNotExist:
+        if not default_services:
             raise NoService(
                 f"No {service_type} service with aliases {aliases_vars} is configured for topic {self.task.topic_name}"
             )
-        except DefaultService.MultipleObjectsReturned:
+        if len(default_services) > 1:
             raise MultipleServices(
                 f"More than one {service_type} service with aliases {aliases_vars} is "
                 f"configured for topic {self.task.topic_name}"
             )
 
-        client = default_service.service.build_client()
-        client._log.task = self.task
+        default_service = default_services[0]
+
+        client = get_client(default_service.service, task=self.task)
 
         # add authorization header
         jwt = services_vars.get(default_service.alias, {}).get("jwt")
@@ -6,6 +6,7 @@ from zgw_consumers.constants import APITypes
 
 from bptl.tasks.base import check_variable
 from bptl.tasks.registry import register
+from bptl.tasks.request_log import bind_task
 
 from ..nlx import get_nlx_headers
 from ..utils import get_paginated_results
@@ -132,6 +133,7 @@ class RelatePand(ZGWWorkUnit):
 
         headers = get_nlx_headers(variables)
 
+        @bind_task
         def _api_call(body):
             zrc_client.create("zaakobject", body, request_kwargs={"headers": headers})
 
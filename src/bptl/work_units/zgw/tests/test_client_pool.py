@@ -0,0 +1,76 @@
+from django.test import TestCase
+
+import requests_mock
+from zgw_consumers.constants import APITypes
+from zgw_consumers.models import Service
+
+from bptl.camunda.tests.factories import ExternalTaskFactory
+
+from ..client import ClientPool
+from .utils import mock_service_oas_get
+
+ZRC_URL = "https://some.zrc.nl/api/v1/"
+ZAAK = f"{ZRC_URL}zaken/4f8b4811-5d7e-4e9b-8201-b35f5101f891"
+
+
+class ClientPoolTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.service = Service.objects.create(
+            api_type=APITypes.zrc, api_root=ZRC_URL, label="zrc_service"
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.pool = ClientPool()
+        self.addCleanup(self.pool.clear)
+
+    def test_clients_share_session(self):
+        client1 = self.pool.get_client(self.service)
+        client2 = self.pool.get_client(self.service)
+
+        self.assertIsNot(client1, client2)
+        self.assertIsNotNone(client1.session)
+        self.assertIs(client1.session, client2.session)
+        self.assertIsNot(client1._log, client2._log)
+
+    def test_per_client_auth(self):
+        client1 = self.pool.get_client(self.service)
+        client2 = self.pool.get_client(self.service)
+
+        client1.set_auth_value("Bearer 12345")
+        client2.set_auth_value("Bearer 67890")
+
+        self.assertEqual(client1.auth_value, {"Authorization": "Bearer 12345"})
+        self.assertEqual(client2.auth_value, {"Authorization": "Bearer 67890"})
+
+    def test_changed_service_rebuilds_client(self):
+        client1 = self.pool.get_client(self.service)
+
+        self.service.api_root = "https://other.zrc.nl/api/v1/"
+        self.service.save()
+        client2 = self.pool.get_client(self.service)
+
+        self.assertEqual(client2.base_url, "https://other.zrc.nl/api/v1/")
+        self.assertIsNot(client1.session, client2.session)
+
+    @requests_mock.Mocker()
+    def test_requests_logged_per_task(self, m):
+        mock_service_oas_get(m, ZRC_URL, "zrc")
+        m.get(ZAAK, json={"url": ZAAK})
+        task1, task2 = ExternalTaskFactory.create_batch(2)
+        client1 = self.pool.get_client(self.service)
+        client1._log.task = task1
+        client1.set_auth_value("Bearer 12345")
+        client2 = self.pool.get_client(self.service)
+        client2._log.task = task2
+        client2.set_auth_value("Bearer 67890")
+
+        client1.retrieve("zaak", ZAAK)
+        client2.retrieve("zaak", ZAAK)
+
+        self.assertEqual(m.request_history[-2].headers["Authorization"], "Bearer 12345")
+        self.assertEqual(m.request_history[-1].headers["Authorization"], "Bearer 67890")
+        self.assertEqual(task1.logs.count(), 1)
+        self.assertEqual(task2.logs.count(), 1)
@@ -6,6 +6,7 @@ from zgw_consumers.constants import APITypes
 from zgw_consumers.models import Service
 
 from bptl.camunda.tests.factories import ExternalTaskFactory
+from bptl.tasks import mapping_cache
 from bptl.tasks.tests.factories import TaskMappingFactory
 from bptl.work_units.zgw.tests.factories import DefaultServiceFactory
 
@@ -27,6 +28,12 @@ class GetZGWClientTests(TestCase):
             api_type=APITypes.zrc, api_root=ZRC_URL, label="zrc_service"
         )
 
+    def setUp(self):
+        super().setUp()
+        # default services are created per test and removed by rolling back the
+        # transaction, which does not invalidate the cache
+        mapping_cache.clear()
+
     def test_get_client_with_alias(self):
         DefaultServiceFactory.create(
             task_mapping=self.mapping, service=self.service, alias="ZRC"
@@ -66,7 +66,7 @@ class ZGWClientLogTests(TestCase):
                         "Accept-Crs": "EPSG:4326",
                         "Content-Crs": "EPSG:4326",
                         "Content-Type": "application/json",
-                        "Authorization": "Bearer 12345",
+                        "Authorization": "[redacted]",
                     },
                 },
                 "response": {"data": mock_zaak_data, "status": 200, "headers": {},},
@@ -100,7 +100,7 @@ class ZGWClientLogTests(TestCase):
                         "Accept-Crs": "EPSG:4326",
                         "Content-Crs": "EPSG:4326",
                         "Content-Type": "application/json",
-                        "Authorization": "Bearer 12345",
+                        "Authorization": "[redacted]",
                     },
                 },
                 "response": {"data": mock_zaak_data, "status": 201, "headers": {},},